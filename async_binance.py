@@ -0,0 +1,255 @@
+# src/async_binance.py
+import time, asyncio, json
+from urllib.parse import urlencode
+
+import aiohttp
+from yarl import URL
+
+from config import BINANCE_API_KEY, BASE_URL_SPOT
+from ratelimit import DEFAULT_LIMITER, request_weight, is_order_endpoint
+from resilience import DEFAULT_BREAKER, RetryPolicy, IDEMPOTENT_METHODS, TRANSIENT_STATUS
+from binance import new_client_order_id, PRICE_MAX_AGE
+from signing import DEFAULT_SIGNER
+from logger_config import logger
+from market_stream import DEFAULT_PRICE_CACHE
+
+
+def error_code(exc):
+    """Binance error code carried in a ClientResponseError raised by _request, if any."""
+    try:
+        return json.loads(exc.message).get("code")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class AsyncBinanceClient:
+    """
+    asyncio counterpart of BinanceClient with the same public/private methods.
+
+    Requests share one aiohttp session over a bounded keep-alive connection
+    pool, so many calls can be in flight at once without threads:
+
+        async with AsyncBinanceClient() as client:
+            prices = await asyncio.gather(*(client.get_ticker_price(s) for s in symbols))
+    """
+    def __init__(self, max_connections=50, keepalive_timeout=30, timeout=10, limiter=None, max_rate_limit_retries=3,
+                 retry_policy=None, breaker=None, signer=None, price_cache=None):
+        self.base = BASE_URL_SPOT.rstrip("/")
+        self.signer = signer or DEFAULT_SIGNER
+        self._first_sync = None
+        self.price_cache = price_cache or DEFAULT_PRICE_CACHE
+        self.limiter = limiter or DEFAULT_LIMITER
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or DEFAULT_BREAKER
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self):
+        # Created lazily so the session binds to the running event loop
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            headers = {"X-MBX-APIKEY": BINANCE_API_KEY} if BINANCE_API_KEY else {}
+            self.session = aiohttp.ClientSession(connector=connector, headers=headers, timeout=self.timeout)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    def _sign(self, params):
+        """Sign parameters using HMAC SHA256."""
+        params["signature"] = self.signer.sign(urlencode(params))
+        return params
+
+    async def sync_time(self):
+        """Measure the offset between the local clock and Binance server time."""
+        sent = time.time() * 1000
+        server_time = (await self._request("GET", "/v3/time"))["serverTime"]
+        self.signer.update_offset(server_time, sent, time.time() * 1000)
+        return self.signer.offset_ms
+
+    async def _sync_once(self):
+        """
+        First clock sync for a signer nobody has synced yet (the sync
+        client's background thread keeps it fresh after that). Concurrent
+        requests share one /v3/time call.
+        """
+        if self._first_sync is None:
+            self._first_sync = asyncio.ensure_future(self.sync_time())
+        try:
+            await asyncio.shield(self._first_sync)
+        except Exception as e:
+            self._first_sync = None     # let the next signed request try again
+            logger.warning(f"Server time sync failed: {e}")
+
+    async def _request(self, method, endpoint, params=None, signed=False, timeout=None, retry=None):
+        """
+        Generic request handler, with the same rate limiting, retry/backoff,
+        idempotent order resend and circuit breaking as BinanceClient._request.
+        `timeout` is a total per-call timeout in seconds.
+        """
+        if params is None:
+            params = {}
+
+        weight = request_weight(method, endpoint, params)
+        orders = 1 if is_order_endpoint(method, endpoint) else 0
+        is_new_order = (method, endpoint) == ("POST", "/v3/order")
+        unsigned = dict(params)
+        if is_new_order:
+            unsigned.setdefault("newClientOrderId", new_client_order_id())
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS or is_new_order
+        timeout = aiohttp.ClientTimeout(total=timeout) if timeout else self.timeout
+
+        if signed and self.signer.synced_at is None:
+            await self._sync_once()
+
+        rate_limited = failures = 0
+        resynced = False
+        while True:
+            trial = self.breaker.before_call()
+            try:
+                delay = self.limiter.reserve(weight, orders)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                params = dict(unsigned)
+                if signed:
+                    params["timestamp"] = self.signer.timestamp()
+                    params["recvWindow"] = 5000
+                    params = self._sign(params)
+
+                # Send the query exactly as it was signed
+                url = self.base + endpoint
+                if params:
+                    url += "?" + urlencode(params)
+
+                error = None
+                try:
+                    async with self._get_session().request(method, URL(url, encoded=True), timeout=timeout) as resp:
+                        self.limiter.update_from_headers(resp.headers)
+                        if resp.status in TRANSIENT_STATUS:
+                            self.breaker.record_failure()
+                            error = aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status,
+                                                                message=resp.reason, headers=resp.headers)
+                        else:
+                            self.breaker.record_success()
+                            # 429/418: rejected before execution, so safe to back off and resend
+                            if resp.status in (418, 429) and rate_limited < self.max_rate_limit_retries:
+                                rate_limited += 1
+                                self.limiter.pause(float(resp.headers.get("Retry-After", 1)))
+                                continue
+                            if resp.status >= 400:
+                                body = await resp.text()
+                                # -1021: clock drifted outside recvWindow; rejected, so resync and resend once
+                                if signed and not resynced and resp.status == 400 and '"code":-1021' in body.replace(" ", ""):
+                                    resynced = True
+                                    await self.sync_time()
+                                    continue
+                                # Keep Binance's {"code", "msg"} body as the error message
+                                raise aiohttp.ClientResponseError(resp.request_info, resp.history, status=resp.status,
+                                                                  message=body, headers=resp.headers)
+                            return await resp.json(content_type=None)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    error = e
+                    self.breaker.record_failure()
+            except BaseException:
+                # Cancelled or failed before recording an outcome: don't leave a half-open trial hanging
+                self.breaker.release(trial)
+                raise
+
+            # Transient failure
+            if not retry or failures >= self.retry_policy.max_retries:
+                raise error
+            failures += 1
+            await asyncio.sleep(self.retry_policy.backoff(failures))
+
+            if is_new_order:
+                existing = await self._find_order(unsigned["symbol"], unsigned["newClientOrderId"])
+                if existing is not None:
+                    return existing
+
+    async def _find_order(self, symbol, client_order_id):
+        """Order by clientOrderId, or None if the exchange has never seen it."""
+        try:
+            return await self._request("GET", "/v3/order", params={"symbol": symbol, "origClientOrderId": client_order_id}, signed=True)
+        except aiohttp.ClientResponseError as e:
+            if error_code(e) == -2013:
+                return None
+            raise
+
+    # ---------------- Public Endpoints ----------------
+    async def ping(self):
+        return await self._request("GET", "/v3/ping")
+
+    async def get_server_time(self):
+        return await self._request("GET", "/v3/time")
+
+    async def get_exchange_info(self, symbol=None, symbols=None):
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        elif symbols:
+            params["symbols"] = json.dumps(list(symbols), separators=(",", ":"))
+        return await self._request("GET", "/v3/exchangeInfo", params=params)
+
+    async def get_ticker_price(self, symbol):
+        return await self._request("GET", "/v3/ticker/price", params={"symbol": symbol})
+
+    async def get_all_ticker_prices(self):
+        return await self._request("GET", "/v3/ticker/price")
+
+    async def get_order_book(self, symbol, limit=100):
+        return await self._request("GET", "/v3/depth", params={"symbol": symbol, "limit": limit})
+
+    async def get_symbol_price(self, symbol, max_age=PRICE_MAX_AGE):
+        """Latest price as {"symbol", "price"}: from the price cache when fresh, else over REST."""
+        price = self.price_cache.price(symbol, max_age)
+        if price is not None:
+            return {"symbol": symbol, "price": str(price)}
+        ticker = await self.get_ticker_price(symbol)
+        self.price_cache.set_price(symbol, ticker["price"])
+        return ticker
+
+    # ---------------- Private Endpoints ----------------
+    async def create_order(self, **kwargs):
+        """Place a Spot order (BUY or SELL)."""
+        return await self._request("POST", "/v3/order", params=kwargs, signed=True)
+
+    async def cancel_order(self, symbol, orderId):
+        return await self._request("DELETE", "/v3/order", params={"symbol": symbol, "orderId": orderId}, signed=True)
+
+    async def cancel_open_orders(self, symbol):
+        return await self._request("DELETE", "/v3/openOrders", params={"symbol": symbol}, signed=True)
+
+    async def get_open_orders(self, symbol=None):
+        params = {"symbol": symbol} if symbol else {}
+        return await self._request("GET", "/v3/openOrders", params=params, signed=True)
+
+    async def get_order(self, symbol, orderId):
+        return await self._request("GET", "/v3/order", params={"symbol": symbol, "orderId": orderId}, signed=True)
+
+    async def get_account_balance(self):
+        return await self._request("GET", "/v3/account", signed=True)
+
+    async def create_listen_key(self):
+        return await self._request("POST", "/v3/userDataStream", retry=True)
+
+    async def keepalive_listen_key(self, listen_key):
+        return await self._request("PUT", "/v3/userDataStream", params={"listenKey": listen_key})
+
+    async def close_listen_key(self, listen_key):
+        return await self._request("DELETE", "/v3/userDataStream", params={"listenKey": listen_key})
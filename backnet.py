@@ -1,59 +1,228 @@
+import numpy as np
 import pandas as pd
 import os
+from collections import OrderedDict
 from datetime import datetime
 
+import datastore
+
+DEFAULT_DATA_PATH = r"D:\BinanceTradingBot_v2\BinanceTradingBot_v2\src\historical_data.csv"
+
+
+def _to_ms(ts):
+    """Convert a timestamp (ms int/float, datetime, Timestamp or string) to epoch ms."""
+    if isinstance(ts, (int, float, np.integer, np.floating)):
+        return int(ts)
+    return pd.Timestamp(ts).value // 1_000_000
+
+
+def _to_ms_array(timestamps):
+    """Vectorized counterpart of _to_ms for array-likes of timestamps."""
+    arr = np.asarray(timestamps)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[ms]").astype(np.int64)
+    if arr.dtype == object:
+        return pd.to_datetime(arr).values.astype("datetime64[ms]").astype(np.int64)
+    return arr.astype(np.int64)
+
+
+def _format_ts(ms):
+    """Render epoch ms the same way the fill dicts always have."""
+    return str(pd.Timestamp(int(ms), unit='ms'))
+
+
+_INTERVAL_UNITS_MS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def _interval_ms(interval):
+    """Parse a Binance-style interval ("1m", "5m", "1h", "1d", ...) or ms int."""
+    if isinstance(interval, (int, np.integer)):
+        return int(interval)
+    num, unit = interval[:-1], interval[-1]
+    if unit not in _INTERVAL_UNITS_MS or not num.isdigit() or int(num) <= 0:
+        raise ValueError(f"Invalid bar interval: {interval}")
+    return int(num) * _INTERVAL_UNITS_MS[unit]
+
+
+def _resample_ohlcv(ts, prices, qty, interval_ms):
+    """Bucket a sorted tape into OHLCV bars (only intervals that contain trades)."""
+    n = len(ts)
+    if n == 0:
+        empty_f, empty_i = np.empty(0, np.float64), np.empty(0, np.int64)
+        return {"open_time": empty_i, "open": empty_f, "high": empty_f, "low": empty_f,
+                "close": empty_f, "volume": empty_f, "trades": empty_i}
+
+    buckets = np.asarray(ts) // interval_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n]
+    prices = np.asarray(prices)
+    return {
+        "open_time": buckets[starts] * interval_ms,
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": prices[ends - 1],
+        "volume": np.add.reduceat(np.asarray(qty), starts) if qty is not None else np.full(len(starts), np.nan),
+        "trades": ends - starts,
+    }
+
+
+class _Tape:
+    """One symbol's sorted trade tape (memory-mapped columns)."""
+    __slots__ = ("symbol", "ts", "prices", "qty")
+
+    def __init__(self, symbol, ts, prices, qty=None):
+        self.symbol = symbol
+        self.ts = ts
+        self.prices = prices
+        self.qty = qty
+
+
 class BacktestEngine:
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, store_dir=None, max_resident=16):
         # Default path
         if file_path is None:
-            file_path = r"D:\BinanceTradingBot_v2\BinanceTradingBot_v2\src\historical_data.csv"
-        
-        if not os.path.exists(file_path):
+            file_path = DEFAULT_DATA_PATH
+
+        self.file_missing = True
+        self.symbols = []
+        self.max_resident = max_resident
+        self._tapes = OrderedDict()   # symbol -> _Tape, least recently used first
+        self._bars = {}               # (partition, interval_ms) -> bars dict
+        self._data = None
+
+        # The CSV is only parsed once; afterwards the columnar store is memory-mapped.
+        if store_dir is None:
+            store_dir = datastore.default_store_dir(file_path)
+            if os.path.exists(file_path) and not datastore.is_fresh(store_dir, file_path):
+                print(f"[BacktestEngine] Building columnar store for {file_path} (one-time)...")
+                datastore.ingest_csv(file_path, store_dir)
+
+        symbols = datastore.list_symbols(store_dir)
+        if not symbols:
             print(f"[BacktestEngine] Error: Historical data file not found at {file_path}. Backtesting unavailable.")
-            self.data = None
-            self.file_missing = True
             return
-        
-        # Load CSV
-        self.data = pd.read_csv(file_path)
-        # Check required columns
-        required_cols = ['Timestamp', 'Execution Price']
-        for col in required_cols:
-            if col not in self.data.columns:
-                raise ValueError(f"Missing column '{col}' in CSV")
-        
-        # Convert timestamp
-        self.data['timestamp'] = pd.to_datetime(self.data['Timestamp'], unit='ms')
-        # Sort
-        self.data = self.data.sort_values('timestamp').reset_index(drop=True)
+
+        self.store_dir = store_dir
+        self.symbols = symbols
+        self.default_symbol = datastore.DEFAULT_PARTITION if datastore.DEFAULT_PARTITION in symbols else symbols[0]
         self.file_missing = False
 
-    def get_price_at(self, ts):
-        """Return last trade price up to given timestamp"""
-        if self.file_missing or self.data is None:
+    def _tape(self, symbol=None):
+        """
+        Tape for `symbol`, opened on first use and kept in an LRU of at most
+        `max_resident` partitions. `symbol=None` uses the default tape. A
+        store built from a CSV without a Symbol column holds only that tape,
+        which then stands for any symbol; otherwise a symbol without its own
+        partition returns None rather than another symbol's prices.
+        """
+        if symbol is None:
+            key = self.default_symbol
+        elif symbol.upper() in self.symbols:
+            key = symbol.upper()
+        elif self.symbols == [datastore.DEFAULT_PARTITION]:
+            key = datastore.DEFAULT_PARTITION
+        else:
+            return None
+
+        tape = self._tapes.get(key)
+        if tape is not None:
+            self._tapes.move_to_end(key)
+            return tape
+
+        tape = _Tape(key, *datastore.open_partition(self.store_dir, key))
+        self._tapes[key] = tape
+        while len(self._tapes) > self.max_resident:
+            self._tapes.popitem(last=False)
+        return tape
+
+    @property
+    def data(self):
+        """The default tape as a DataFrame, built on first access (the engine itself works on arrays)."""
+        if self.file_missing:
+            return None
+        if self._data is None:
+            tape = self._tape()
+            self._data = pd.DataFrame({
+                "Timestamp": np.asarray(tape.ts),
+                "Execution Price": np.asarray(tape.prices),
+                "timestamp": pd.to_datetime(np.asarray(tape.ts), unit='ms'),
+            })
+        return self._data
+
+    def _no_data(self, symbol):
+        available = [s for s in self.symbols if s != datastore.DEFAULT_PARTITION]
+        return f"No historical data for symbol {symbol} (available: {', '.join(available) or 'none'})"
+
+    def _require_tape(self, symbol):
+        if self.file_missing:
             raise RuntimeError("Backtest data unavailable.")
-        if isinstance(ts, (int, float)):
-            ts = pd.to_datetime(ts, unit='ms')
-        df = self.data[self.data['timestamp'] <= ts]
-        if df.empty:
+        tape = self._tape(symbol)
+        if tape is None:
+            raise ValueError(self._no_data(symbol))
+        return tape
+
+    def get_bars(self, symbol=None, interval="1m"):
+        """
+        OHLCV bars for `symbol` at `interval` ("1m", "5m", "1h", ... or ms) as a
+        DataFrame with open_time (ms), open, high, low, close, volume, trades.
+        Bars are computed once per (symbol, interval) and cached next to the
+        partition; the cache is invalidated when the source data changes.
+        Volume is NaN when the tape has no quantity column.
+        """
+        tape = self._require_tape(symbol)
+        interval_ms = _interval_ms(interval)
+        key = (tape.symbol, interval_ms)
+
+        bars = self._bars.get(key)
+        if bars is None:
+            bars = datastore.load_bars(self.store_dir, tape.symbol, interval_ms)
+            if bars is None:
+                bars = _resample_ohlcv(tape.ts, tape.prices, tape.qty, interval_ms)
+                try:
+                    datastore.save_bars(self.store_dir, tape.symbol, interval_ms, bars)
+                except OSError as e:
+                    print(f"[BacktestEngine] Warning: could not cache bars: {e}")
+            self._bars[key] = bars
+
+        return pd.DataFrame(bars)
+
+    def get_price_at(self, ts, symbol=None):
+        """Return last trade price up to given timestamp"""
+        tape = self._require_tape(symbol)
+        idx = np.searchsorted(tape.ts, _to_ms(ts), side='right') - 1
+        if idx < 0:
             raise ValueError("No historical data before given timestamp")
-        return float(df.iloc[-1]['Execution Price'])
+        return float(tape.prices[idx])
+
+    def get_prices_at(self, timestamps, symbol=None):
+        """
+        Batch form of get_price_at.
+        Returns a float64 array with the last trade price at or before each
+        timestamp; entries before the first trade are NaN.
+        """
+        tape = self._require_tape(symbol)
+        idx = np.searchsorted(tape.ts, _to_ms_array(timestamps), side='right') - 1
+        if not len(tape.prices):
+            return np.full(idx.shape, np.nan)
+        prices = tape.prices[np.maximum(idx, 0)]
+        return np.where(idx >= 0, prices, np.nan)
 
     def simulate_market_order(self, symbol, side, qty, ts=None):
         """Market order fills at next available trade price after timestamp"""
-        if self.file_missing or self.data is None:
+        if self.file_missing:
             return {"error": "Backtest data unavailable."}
-        
+        tape = self._tape(symbol)
+        if tape is None:
+            return {"error": self._no_data(symbol)}
+
         if ts is None:
             # Use the *latest* available price, not the first one
-            trade = self.data.iloc[-1]
+            idx = len(tape.ts) - 1
         else:
-            if isinstance(ts, (int, float)):
-                ts = pd.to_datetime(ts, unit='ms')
-            df = self.data[self.data['timestamp'] >= ts]
-            if df.empty:
+            idx = np.searchsorted(tape.ts, _to_ms(ts), side='left')
+            if idx >= len(tape.ts):
                 return {"error": "No future trades available to fill market order"}
-            trade = df.iloc[0]
 
         return {
             "mode": "backtest",
@@ -61,56 +230,121 @@ class BacktestEngine:
             "symbol": symbol,
             "side": side.upper(),
             "qty": float(qty),
-            "fill_price": float(trade['Execution Price']),
+            "fill_price": float(tape.prices[idx]),
             "status": "FILLED",
-            "timestamp": str(trade['timestamp'])
+            "timestamp": _format_ts(tape.ts[idx])
         }
 
+    def _first_cross(self, prices, start, limit_price, is_buy):
+        """
+        Index of the first trade at or after `start` that crosses the limit,
+        or -1. Scans in growing chunks so an early fill never touches the
+        rest of the tape.
+        """
+        n = len(prices)
+        chunk = 4096
+        while start < n:
+            seg = prices[start:start + chunk]
+            hits = np.flatnonzero(seg <= limit_price if is_buy else seg >= limit_price)
+            if hits.size:
+                return start + int(hits[0])
+            start += chunk
+            chunk = min(chunk * 2, 1 << 20)
+        return -1
+
+    def _bulk_first_cross(self, prices, starts, limit_prices, is_buy):
+        """
+        First crossing index for many orders on one side at once.
+        The tape is walked once, segment by segment between distinct start
+        indices; within a segment the running min (BUY) / max (SELL) is
+        monotonic, so every still-open order is resolved with one searchsorted.
+        """
+        fills = np.full(len(starts), -1, dtype=np.int64)
+        if not len(starts):
+            return fills
+        order = np.argsort(starts, kind='stable')
+        sorted_starts = starts[order]
+        bounds = np.unique(sorted_starts)
+        bounds = np.append(bounds, len(prices))
+        active = np.empty(0, dtype=np.int64)
+        for i in range(len(bounds) - 1):
+            s, e = bounds[i], bounds[i + 1]
+            lo, hi = np.searchsorted(sorted_starts, [s, e])
+            active = np.concatenate([active, order[lo:hi]])
+            if not active.size or s >= e:
+                continue
+            seg = prices[s:e]
+            if is_buy:
+                key = -np.minimum.accumulate(seg)
+                pos = np.searchsorted(key, -limit_prices[active], side='left')
+            else:
+                key = np.maximum.accumulate(seg)
+                pos = np.searchsorted(key, limit_prices[active], side='left')
+            hit = pos < len(seg)
+            fills[active[hit]] = s + pos[hit]
+            active = active[~hit]
+        return fills
+
     def simulate_limit_order(self, symbol, side, qty, limit_price, ts=None):
         """Find first trade *after ts* that crosses limit price"""
-        if self.file_missing or self.data is None:
+        if self.file_missing:
             return {"error": "Backtest data unavailable."}
-        
-        df = self.data
-        if ts is not None:
-            if isinstance(ts, (int, float)):
-                ts = pd.to_datetime(ts, unit='ms')
-            df = df[df['timestamp'] >= ts]
-        
-        for _, trade in df.iterrows():
-            price = float(trade['Execution Price'])
-            if side.upper() == "BUY" and price <= limit_price:
-                return {
-                    "mode": "backtest",
-                    "orderType": "LIMIT",
-                    "symbol": symbol,
-                    "side": "BUY",
-                    "qty": float(qty),
-                    "limit_price": float(limit_price),
-                    "fill_price": price,
-                    "status": "FILLED",
-                    "timestamp": str(trade['timestamp'])
-                }
-            if side.upper() == "SELL" and price >= limit_price:
-                return {
-                    "mode": "backtest",
-                    "orderType": "LIMIT",
-                    "symbol": symbol,
-                    "side": "SELL",
-                    "qty": float(qty),
-                    "limit_price": float(limit_price),
-                    "fill_price": price,
-                    "status": "FILLED",
-                    "timestamp": str(trade['timestamp'])
-                }
+        tape = self._tape(symbol)
+        if tape is None:
+            return {"error": self._no_data(symbol)}
+
+        side = side.upper()
+        start = 0 if ts is None else int(np.searchsorted(tape.ts, _to_ms(ts), side='left'))
+        idx = -1
+        if side in ("BUY", "SELL"):
+            idx = self._first_cross(tape.prices, start, limit_price, side == "BUY")
+
+        if idx >= 0:
+            return {
+                "mode": "backtest",
+                "orderType": "LIMIT",
+                "symbol": symbol,
+                "side": side,
+                "qty": float(qty),
+                "limit_price": float(limit_price),
+                "fill_price": float(tape.prices[idx]),
+                "status": "FILLED",
+                "timestamp": _format_ts(tape.ts[idx])
+            }
 
         # Order never filled
         return {
             "mode": "backtest",
             "orderType": "LIMIT",
             "symbol": symbol,
-            "side": side.upper(),
+            "side": side,
             "qty": float(qty),
             "limit_price": float(limit_price),
             "status": "OPEN"
         }
+
+    def simulate_limit_orders(self, symbol, sides, limit_prices, ts=None):
+        """
+        Bulk form of simulate_limit_order for many resting orders.
+        `sides` is a sequence of "BUY"/"SELL", `ts` a single timestamp or one
+        per order (None = start of tape).
+        Returns (fill_index, fill_price) arrays; unfilled orders get -1 / NaN.
+        """
+        tape = self._require_tape(symbol)
+
+        sides = np.char.upper(np.asarray(sides, dtype=str))
+        limit_prices = np.asarray(limit_prices, dtype=np.float64)
+        if ts is None:
+            starts = np.zeros(len(limit_prices), dtype=np.int64)
+        else:
+            ts_ms = _to_ms_array(ts) if np.ndim(ts) else np.full(len(limit_prices), _to_ms(ts))
+            starts = np.searchsorted(tape.ts, ts_ms, side='left').astype(np.int64)
+
+        fill_idx = np.full(len(limit_prices), -1, dtype=np.int64)
+        for side in ("BUY", "SELL"):
+            sel = np.flatnonzero(sides == side)
+            fill_idx[sel] = self._bulk_first_cross(tape.prices, starts[sel], limit_prices[sel], side == "BUY")
+
+        filled = fill_idx >= 0
+        fill_price = np.where(filled, tape.prices[np.maximum(fill_idx, 0)], np.nan)
+        return fill_idx, fill_price
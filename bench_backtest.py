@@ -0,0 +1,230 @@
+# src/bench_backtest.py
+"""
+Benchmark suite for the backtest path.
+
+Generates synthetic trade tapes (random-walk prices, ~1 trade per 100ms),
+then times store load, price lookups, market fills and limit-fill searches
+on BacktestEngine at each tape length. Each phase is timed untraced, then
+run again under tracemalloc for peak Python allocations; resident set size
+is recorded too, since pages of the memory-mapped tapes only show up
+there. Results are written as JSON so runs can be diffed, and an earlier
+results file can be passed with --baseline to fail on regressions. The
+100M-row tape (about 2.4 GB of scratch disk) only runs with --large.
+
+    python src/bench_backtest.py --large --out bench_results.json
+    python src/bench_backtest.py --baseline bench_results.json --tolerance 0.25
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+import datastore
+from backnet import BacktestEngine
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+LARGE_SIZE = 100_000_000
+SYMBOL = "BTCUSDT"
+START_TS = 1_700_000_000_000
+GEN_CHUNK = 5_000_000
+
+
+def generate_tape(store_dir, rows, seed=42):
+    """Write a synthetic sorted tape of `rows` trades straight into a store partition, chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    ts, prices, qty = datastore.allocate_partition(store_dir, SYMBOL, rows, with_qty=True)
+    last_ts, last_price = START_TS, 30_000.0
+    for lo in range(0, rows, GEN_CHUNK):
+        hi = min(lo + GEN_CHUNK, rows)
+        n = hi - lo
+        ts[lo:hi] = last_ts + np.cumsum(rng.integers(0, 200, n))
+        prices[lo:hi] = last_price * np.exp(np.cumsum(rng.normal(0.0, 2e-4, n)))
+        qty[lo:hi] = rng.exponential(0.05, n)
+        last_ts, last_price = int(ts[hi - 1]), float(prices[hi - 1])
+    for col in (ts, prices, qty):
+        col.flush()
+    del ts, prices, qty
+    datastore.finalize_partition(store_dir, SYMBOL)
+
+
+def _rss_bytes():
+    """Current resident set size (mapped file pages included), or None if it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _max_rss_bytes():
+    """Peak resident set size of the process so far, or None where getrusage is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024     # bytes on macOS, KiB elsewhere
+
+
+def _measure(results, rows, phase, ops, func, reset=None):
+    """
+    Record wall time and resident memory of one untraced run of func, then
+    peak traced memory of a second run (tracing slows Python loops several
+    times over). `reset` undoes caching between the runs. Returns the
+    first run's result.
+    """
+    gc.collect()
+    rss_before = _rss_bytes()
+    t0 = time.perf_counter()
+    out = func()
+    elapsed = time.perf_counter() - t0
+    rss = _rss_bytes()
+
+    if reset is not None:
+        reset()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.append({
+        "rows": rows,
+        "phase": phase,
+        "ops": ops,
+        "seconds": elapsed,
+        "per_op_us": elapsed / ops * 1e6 if ops else None,
+        "peak_mem_bytes": peak,
+        "rss_bytes": rss,
+        "rss_delta_bytes": rss - rss_before if rss is not None else None,
+        "max_rss_bytes": _max_rss_bytes(),
+    })
+    rss_text = f"  rss {rss / 2**20:>9.1f} MiB ({(rss - rss_before) / 2**20:+.1f})" if rss is not None else ""
+    print(f"  {phase:<24} {elapsed:>10.4f}s  {results[-1]['per_op_us'] or 0:>12.2f}us/op  peak {peak / 2**20:>9.1f} MiB{rss_text}")
+    return out
+
+
+def bench_size(rows, workdir, lookups, limit_orders, csv_max, seed):
+    results = []
+    store_dir = os.path.join(workdir, f"tape_{rows}")
+    print(f"\n[{rows:,} rows]")
+    t0 = time.perf_counter()
+    generate_tape(store_dir, rows, seed)
+    print(f"  (generated in {time.perf_counter() - t0:.2f}s)")
+
+    rng = np.random.default_rng(seed + 1)
+    engine = _measure(results, rows, "open_store", 1, lambda: BacktestEngine(store_dir=store_dir))
+    tape = _measure(results, rows, "open_partition", 1, lambda: engine._tape(SYMBOL), reset=engine._tapes.clear)
+    first, last = int(tape.ts[0]), int(tape.ts[-1])
+
+    if rows <= csv_max:
+        csv_path = os.path.join(workdir, f"tape_{rows}.csv")
+        pd.DataFrame({"Timestamp": np.asarray(tape.ts), "Execution Price": np.asarray(tape.prices)}).to_csv(csv_path, index=False)
+        _measure(results, rows, "ingest_csv", 1, lambda: datastore.ingest_csv(csv_path, os.path.join(workdir, f"csv_{rows}")))
+
+    query_ts = rng.integers(first, last, lookups)
+    _measure(results, rows, "get_price_at", lookups,
+             lambda: [engine.get_price_at(int(t), SYMBOL) for t in query_ts])
+    _measure(results, rows, "get_prices_at_batch", lookups,
+             lambda: engine.get_prices_at(query_ts, SYMBOL))
+    _measure(results, rows, "simulate_market_order", lookups,
+             lambda: [engine.simulate_market_order(SYMBOL, "BUY", 1, int(t)) for t in query_ts])
+
+    # Limit prices within ~1% of the price at submission so most orders fill somewhere along the tape
+    order_ts = rng.integers(first, last, limit_orders)
+    ref = engine.get_prices_at(order_ts, SYMBOL)
+    sides = np.where(rng.random(limit_orders) < 0.5, "BUY", "SELL")
+    offsets = rng.uniform(0.0, 0.01, limit_orders)
+    limits = np.where(sides == "BUY", ref * (1 - offsets), ref * (1 + offsets))
+    n_single = min(limit_orders, 200)
+    _measure(results, rows, "simulate_limit_order", n_single,
+             lambda: [engine.simulate_limit_order(SYMBOL, sides[i], 1, limits[i], int(order_ts[i])) for i in range(n_single)])
+    _measure(results, rows, "simulate_limit_orders", limit_orders,
+             lambda: engine.simulate_limit_orders(SYMBOL, sides, limits, order_ts))
+
+    del engine, tape
+    shutil.rmtree(store_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Return the phases that got slower than the baseline by more than `tolerance` (fraction)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["rows"], r["phase"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["rows"], r["phase"]))
+        if base and base["seconds"] > 0 and r["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append({**r, "baseline_seconds": base["seconds"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BacktestEngine on synthetic trade tapes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Tape lengths in rows")
+    parser.add_argument("--large", action="store_true", help=f"Also run {LARGE_SIZE:,} rows (~2.4 GB scratch disk)")
+    parser.add_argument("--lookups", type=int, default=10_000, help="Random lookups / market fills per size")
+    parser.add_argument("--limit-orders", type=int, default=2_000, help="Limit orders for the bulk fill search")
+    parser.add_argument("--csv-max", type=int, default=1_000_000, help="Also time CSV ingest up to this many rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=None, help="Scratch directory for tapes (default: temp dir)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (fraction)")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench_backtest_")
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    try:
+        for rows in args.sizes + ([LARGE_SIZE] if args.large and LARGE_SIZE not in args.sizes else []):
+            results.extend(bench_size(rows, workdir, args.lookups, args.limit_orders, args.csv_max, args.seed))
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "lookups": args.lookups,
+            "limit_orders": args.limit_orders,
+        },
+        "results": results,
+    }
+    # Compare before writing, in case --out points at the baseline file
+    regressions = compare(results, args.baseline, args.tolerance) if args.baseline else []
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    for r in regressions:
+        print(f"REGRESSION {r['phase']} @ {r['rows']:,} rows: {r['seconds']:.4f}s vs {r['baseline_seconds']:.4f}s")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
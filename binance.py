@@ -1,49 +1,227 @@
 # src/binance_client.py
-import requests, time, hmac, hashlib
+import requests, time, uuid, json
 from urllib.parse import urlencode
-from config import BINANCE_API_KEY, BINANCE_API_SECRET, BASE_URL_SPOT
+from config import BINANCE_API_KEY, BASE_URL_SPOT, BASE_URL_WS
+from ratelimit import DEFAULT_LIMITER, request_weight, is_order_endpoint
+from resilience import DEFAULT_BREAKER, RetryPolicy, IDEMPOTENT_METHODS, TRANSIENT_STATUS
+from market_stream import DEFAULT_PRICE_CACHE, shared_stream
+from order_book import OrderBookSync
+from user_stream import shared_user_stream, active_user_stream
+from exchange_info import shared_cache
+from signing import RequestSigner, DEFAULT_SIGNER, TIME_SYNC_INTERVAL
+
+# (connect, read) seconds; override per endpoint or per call
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {"/v3/exchangeInfo": (3.05, 30)}
+# Cached prices older than this (seconds) are refreshed over REST
+PRICE_MAX_AGE = 10
+
+
+def new_client_order_id():
+    """Unique newClientOrderId (Binance allows up to 36 chars of [.A-Za-z0-9:/_-])."""
+    return "x-" + uuid.uuid4().hex
+
+
+def error_code(resp):
+    """Binance error code from an error response body, if any."""
+    try:
+        return resp.json().get("code")
+    except ValueError:
+        return None
+
 
 class BinanceClient:
-    def __init__(self):
+    def __init__(self, limiter=None, max_rate_limit_retries=3, timeout=DEFAULT_TIMEOUT,
+                 retry_policy=None, breaker=None, signer=None, price_cache=None):
         self.base = BASE_URL_SPOT.rstrip("/")
+        self.signer = signer or DEFAULT_SIGNER
+        self.price_cache = price_cache or DEFAULT_PRICE_CACHE
+        self.order_books = {}
         self.session = requests.Session()
+        self.limiter = limiter or DEFAULT_LIMITER
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.timeout = timeout
+        self.endpoint_timeouts = dict(ENDPOINT_TIMEOUTS)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or DEFAULT_BREAKER
         if BINANCE_API_KEY:
             self.session.headers.update({"X-MBX-APIKEY": BINANCE_API_KEY})
 
     def _sign(self, params):
         """Sign parameters using HMAC SHA256."""
-        query_string = urlencode(params)
-        signature = hmac.new(
-            BINANCE_API_SECRET.encode(), query_string.encode(), hashlib.sha256
-        ).hexdigest()
-        params["signature"] = signature
+        params["signature"] = self.signer.sign(urlencode(params))
         return params
 
-    def _request(self, method, endpoint, params=None, signed=False):
-        """Generic request handler."""
+    # ---------------- Time Sync ----------------
+    def sync_time(self):
+        """Measure the offset between the local clock and Binance server time."""
+        sent = time.time() * 1000
+        server_time = self._request("GET", "/v3/time")["serverTime"]
+        self.signer.update_offset(server_time, sent, time.time() * 1000)
+        return self.signer.offset_ms
+
+    def start_time_sync(self, interval=TIME_SYNC_INTERVAL):
+        """
+        Sync the clock offset now and then every `interval` seconds in a
+        daemon thread. One thread per signer (so one per process for
+        DEFAULT_SIGNER); the first signed request starts it automatically.
+        """
+        self.signer.start_sync(self.sync_time, interval)
+
+    def stop_time_sync(self):
+        self.signer.stop_sync()
+
+    def _request(self, method, endpoint, params=None, signed=False, timeout=None, retry=None):
+        """
+        Generic request handler.
+
+        Waits for rate-limit budget, then sends the request with a timeout.
+        Transient failures (timeouts, connection errors, 5xx) are retried with
+        jittered exponential backoff when `retry` is true, which defaults to
+        idempotent methods and new orders. New orders always carry a
+        newClientOrderId; before resending one, the order is looked up by that
+        ID so an order that did reach the exchange is never placed twice.
+        Every outcome feeds the circuit breaker, which fails fast with
+        CircuitOpenError while the exchange is degraded.
+        """
         url = self.base + endpoint
         if params is None:
             params = {}
 
-        if signed:
-            params["timestamp"] = int(time.time() * 1000)
-            params["recvWindow"] = 5000
-            params = self._sign(params)
+        weight = request_weight(method, endpoint, params)
+        orders = 1 if is_order_endpoint(method, endpoint) else 0
+        is_new_order = (method, endpoint) == ("POST", "/v3/order")
+        unsigned = dict(params)
+        if is_new_order:
+            unsigned.setdefault("newClientOrderId", new_client_order_id())
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS or is_new_order
+        timeout = timeout or self.endpoint_timeouts.get(endpoint, self.timeout)
+
+        if signed and not self.signer.sync_started:
+            self.start_time_sync()
+
+        rate_limited = failures = 0
+        resynced = False
+        while True:
+            trial = self.breaker.before_call()
+            try:
+                # Wait for budget before stamping, so the timestamp is fresh when sent
+                self.limiter.acquire(weight, orders)
+                params = dict(unsigned)
+                if signed:
+                    params["timestamp"] = self.signer.timestamp()
+                    params["recvWindow"] = 5000
+                    params = self._sign(params)
+
+                resp, error = None, None
+                try:
+                    resp = self.session.request(method, url, params=params, timeout=timeout)
+                except requests.RequestException as e:
+                    error = e
+                    self.breaker.record_failure()
+                else:
+                    self.limiter.update_from_headers(resp.headers)
+                    if resp.status_code in TRANSIENT_STATUS:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                        # 429/418: rejected before execution, so safe to back off and resend
+                        if resp.status_code in (418, 429) and rate_limited < self.max_rate_limit_retries:
+                            rate_limited += 1
+                            self.limiter.pause(float(resp.headers.get("Retry-After", 1)))
+                            continue
+                        # -1021: our clock drifted outside recvWindow; rejected, so resync and resend once
+                        if signed and not resynced and resp.status_code == 400 and error_code(resp) == -1021:
+                            resynced = True
+                            self.sync_time()
+                            continue
+                        resp.raise_for_status()
+                        return resp.json()
+            except BaseException:
+                # Interrupted or failed before recording an outcome: don't leave a half-open trial hanging
+                self.breaker.release(trial)
+                raise
+
+            # Transient failure
+            if not retry or failures >= self.retry_policy.max_retries:
+                if error is not None:
+                    raise error
+                resp.raise_for_status()
+            failures += 1
+            time.sleep(self.retry_policy.backoff(failures))
 
-        resp = self.session.request(method, url, params=params)
-        resp.raise_for_status()
-        return resp.json()
+            if is_new_order:
+                existing = self._find_order(unsigned["symbol"], unsigned["newClientOrderId"])
+                if existing is not None:
+                    return existing
+
+    def _find_order(self, symbol, client_order_id):
+        """Order by clientOrderId, or None if the exchange has never seen it."""
+        try:
+            return self._request("GET", "/v3/order", params={"symbol": symbol, "origClientOrderId": client_order_id}, signed=True)
+        except requests.HTTPError as e:
+            if e.response is not None and error_code(e.response) == -2013:
+                return None
+            raise
 
     # ---------------- Public Endpoints ----------------
     def ping(self):
         return self._request("GET", "/v3/ping")
 
-    def get_exchange_info(self):
-        return self._request("GET", "/v3/exchangeInfo")
+    def get_server_time(self):
+        return self._request("GET", "/v3/time")
+
+    def get_exchange_info(self, symbol=None, symbols=None):
+        """Full exchangeInfo, or just `symbol` / the `symbols` list."""
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        elif symbols:
+            params["symbols"] = json.dumps(list(symbols), separators=(",", ":"))
+        return self._request("GET", "/v3/exchangeInfo", params=params)
+
+    @property
+    def exchange_info(self):
+        """Process-wide lazy, disk-backed ExchangeInfoCache."""
+        return shared_cache(lambda symbols=None: self.get_exchange_info(symbols=symbols), self.base,
+                            limiter=self.limiter)
 
     def get_ticker_price(self, symbol):
         return self._request("GET", "/v3/ticker/price", params={"symbol": symbol})
 
+    def get_all_ticker_prices(self):
+        """Last price of every symbol in one request (weight 4)."""
+        return self._request("GET", "/v3/ticker/price")
+
+    def get_order_book(self, symbol, limit=100):
+        """REST depth snapshot; weight grows with `limit` (5/25/50/250)."""
+        return self._request("GET", "/v3/depth", params={"symbol": symbol, "limit": limit})
+
+    # ---------------- Streamed Prices ----------------
+    def watch_prices(self, symbols):
+        """Stream prices for `symbols` into the shared price cache (no-op without a WebSocket URL)."""
+        if BASE_URL_WS and symbols:
+            shared_stream().watch(symbols)
+
+    def get_symbol_price(self, symbol, max_age=PRICE_MAX_AGE):
+        """Latest price as {"symbol", "price"}: from the price cache when fresh, else over REST."""
+        price = self.price_cache.price(symbol, max_age)
+        if price is not None:
+            return {"symbol": symbol, "price": str(price)}
+        ticker = self.get_ticker_price(symbol)
+        self.price_cache.set_price(symbol, ticker["price"])
+        return ticker
+
+    def watch_order_book(self, symbol, **kwargs):
+        """Start (once) and return the OrderBookSync keeping a local book for `symbol`."""
+        sync = self.order_books.get(symbol)
+        if sync is None:
+            if not BASE_URL_WS:
+                raise RuntimeError("Order books need the depth stream; set BINANCE_WS_URL")
+            sync = self.order_books[symbol] = OrderBookSync(symbol, self, **kwargs).start()
+        return sync
+
     # ---------------- Private Endpoints ----------------
     def create_order(self, **kwargs):
         """Place a Spot order (BUY or SELL)."""
@@ -52,6 +230,10 @@ class BinanceClient:
     def cancel_order(self, symbol, orderId):
         return self._request("DELETE", "/v3/order", params={"symbol": symbol, "orderId": orderId}, signed=True)
 
+    def cancel_open_orders(self, symbol):
+        """Cancel every open order on `symbol` in one request; -2011 if there are none."""
+        return self._request("DELETE", "/v3/openOrders", params={"symbol": symbol}, signed=True)
+
     def get_open_orders(self, symbol=None):
         params = {"symbol": symbol} if symbol else {}
         return self._request("GET", "/v3/openOrders", params=params, signed=True)
@@ -62,3 +244,25 @@ class BinanceClient:
     def get_account_balance(self):
         return self._request("GET", "/v3/account", signed=True)
 
+    # ---------------- User Data Stream ----------------
+    def create_listen_key(self):
+        # Returns the account's existing key if one is open, so resending is safe
+        return self._request("POST", "/v3/userDataStream", retry=True)
+
+    def keepalive_listen_key(self, listen_key):
+        return self._request("PUT", "/v3/userDataStream", params={"listenKey": listen_key})
+
+    def close_listen_key(self, listen_key):
+        return self._request("DELETE", "/v3/userDataStream", params={"listenKey": listen_key})
+
+    def start_user_stream(self):
+        """Start (once per process) and return the UserDataStream tracking live orders and balances."""
+        if not BASE_URL_WS:
+            raise RuntimeError("The user data stream needs a WebSocket URL; set BINANCE_WS_URL")
+        return shared_user_stream(self)
+
+    def live_account_state(self):
+        """AccountState kept current by the user data stream, or None if it is not connected."""
+        stream = active_user_stream()
+        return stream.state if stream is not None and stream.is_live() else None
+
@@ -1,23 +1,22 @@
 import os
 import sys
 import json
-import websocket
 import threading
 from time import sleep
 from datetime import datetime
 import time
 
 # --- Add src to path ---
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # --- Project Imports ---
-from src.binance import BinanceClient
-from src import order, utils
-from src.backnet import BacktestEngine
-from src.advanced import strategies
-from src.advanced.bots import GridTradingBot
-from src.portfolio import PortfolioManager
-from src.logger_config import logger
+from binance import BinanceClient
+import order, utils
+from backnet import BacktestEngine
+from advanced import strategies
+from advanced.bots import GridTradingBot
+from portfolio import PortfolioManager
+from logger_config import logger
 
 # --- Rich Library Imports ---
 from rich.console import Console
@@ -281,8 +280,20 @@ class TradingTerminal:
         with Live(layout, screen=True, redirect_stderr=False) as live:
             live.console.print(f"[{self.theme['warning']}]Loading dashboard... Press Ctrl+C to exit.[/]")
             try:
+                # Live orders/balances over the user data stream instead of polling /v3/account
+                try:
+                    self.client.start_user_stream()
+                except RuntimeError as e:
+                    logger.info(f"User data stream unavailable, polling REST: {e}")
+                watched = set()
                 while True:
                     self.portfolio.fetch_data()
+                    # Stream prices for held assets (including ones bought since the last
+                    # refresh) so later refreshes read the local cache
+                    new_symbols = set(self.portfolio.price_symbols()) - watched
+                    if new_symbols:
+                        self.client.watch_prices(sorted(new_symbols))
+                        watched |= new_symbols
                     pnl_color = "green" if self.portfolio.total_unrealized_pnl >= 0 else "red"
                     header_text = Align.center(f"[{self.theme['title']}]Live Dashboard[/] | Total PNL: [{pnl_color}]${self.portfolio.total_unrealized_pnl:,.2f}[/{pnl_color}]")
                     layout['header'].update(Panel(header_text, border_style=self.theme['panel_border']))
@@ -296,7 +307,8 @@ class TradingTerminal:
                     pos_table = self.portfolio.display_positions()
                     layout['positions'].update(Panel(pos_table or "[dim]No open positions.[/dim]", title="Positions", border_style=self.theme['panel_border']))
 
-                    layout['status'].update(Panel(f"API Status: [green]OK[/green] | Bots Active: {sum(1 for b in self.active_bots.values() if b.is_running)}", border_style=self.theme['panel_border']))
+                    account_feed = "[green]LIVE[/green]" if self.client.live_account_state() is not None else "[yellow]REST[/yellow]"
+                    layout['status'].update(Panel(f"API Status: [green]OK[/green] | Account: {account_feed} | Bots Active: {sum(1 for b in self.active_bots.values() if b.is_running)}", border_style=self.theme['panel_border']))
                     layout['clock'].update(get_time_panel())
                     sleep(5)
             except KeyboardInterrupt:
@@ -309,31 +321,33 @@ class TradingTerminal:
         if not Confirm.ask("[bold red]Are you ABSOLUTELY SURE you want to close ALL positions and cancel ALL open orders?[/bold red]"):
             return
 
-        self.console.print(f"[{self.theme['warning']}]Fetching open positions...[/]")
-        self.portfolio.fetch_data()
-        open_positions = [p for p in self.portfolio.positions_data if float(p['positionAmt']) != 0]
+        # No prompts from here on: cancels and closes all run concurrently
+        self.console.print(f"[{self.theme['warning']}]Cancelling open orders and closing positions...[/]")
+        try:
+            report = order.flatten_all()
+        except Exception as e:
+            self.console.print(f"[{self.theme['error']}]Panic sequence failed: {e}[/]")
+            logger.error(f"Panic sequence failed: {e}")
+            Prompt.ask("\n[dim]Press Enter to continue...[/dim]")
+            return
 
-        if not open_positions:
+        for message in report["errors"]:
+            self.console.print(f"[{self.theme['warning']}]{message}[/]")
+        for symbol, message in report["cancel_errors"].items():
+            self.console.print(f"[{self.theme['error']}]Cancel failed on {symbol}: {message}[/]")
+        for o, res in report["closes"]:
+            if "error" in res:
+                self.console.print(f"[{self.theme['error']}]Close {o['symbol']} failed: {res['error']}[/]")
+            else:
+                self.console.print(f"[green]Closed {o['symbol']}: sold {res.get('executedQty', o['qty'])}[/green]")
+        if not report["closes"]:
             self.console.print("[green]No open positions to close.[/green]")
-        else:
-            for pos in open_positions:
-                symbol = pos['symbol']
-                qty = abs(float(pos['positionAmt']))
-                side = "SELL" if float(pos['positionAmt']) > 0 else "BUY"
-                self.console.print(f"\nClosing {symbol} position...")
-                self.handle_api_call(order.place_market, symbol, side, qty)
-
-        self.console.print(f"\n[{self.theme['warning']}]Cancelling all open orders...[/]")
-        all_symbols = utils.get_all_symbols()
-        cancelled_count = 0
-        for symbol in all_symbols:
-            try:
-                res = self.client.cancel_all_open_orders(symbol)
-                if res:
-                    cancelled_count += len(res)
-            except Exception:
-                pass
-        self.console.print(f"[green]Panic sequence complete. {cancelled_count} orders cancelled.[/green]")
+
+        self.console.print(
+            f"[green]Panic sequence complete in {report['seconds']:.2f}s. "
+            f"{report['cancelled']} orders cancelled on {len(report['symbols'])} symbols, "
+            f"{len(report['closes'])} positions closed.[/green]"
+        )
         logger.warning("PANIC BUTTON USED.")
         Prompt.ask("\n[dim]Press Enter to continue...[/dim]")
 
@@ -37,7 +37,23 @@ BASE_URL_SPOT = (
     else "https://api.binance.com"
 )
 
-logging.info(f"Using {'Spot Testnet' if USE_TESTNET else 'Spot Mainnet'}: {BASE_URL_SPOT}")
+# Spot WebSocket market streams (combined streams live under <BASE_URL_WS>/stream)
+BASE_URL_WS = os.getenv("BINANCE_WS_URL") or (
+    "wss://stream.testnet.binance.vision" if USE_TESTNET
+    else "wss://stream.binance.com:9443"
+)
+
+# Local mock server (src/mock_server.py) for offline load/latency testing
+USE_MOCK_SERVER = os.getenv("USE_MOCK_SERVER", "false").lower() == "true"
+MOCK_SERVER_URL = os.getenv("MOCK_SERVER_URL", "http://127.0.0.1:8765/api")
+
+if USE_MOCK_SERVER:
+    BASE_URL_SPOT = MOCK_SERVER_URL
+    # The mock has no WebSocket side; streams stay off unless BINANCE_WS_URL is set
+    BASE_URL_WS = os.getenv("BINANCE_WS_URL", "")
+    logging.info(f"Using Mock Server: {BASE_URL_SPOT}")
+else:
+    logging.info(f"Using {'Spot Testnet' if USE_TESTNET else 'Spot Mainnet'}: {BASE_URL_SPOT}")
 
 # For backward compatibility with Futures, if needed
 BASE_URL_FUTURES = (
@@ -49,4 +65,5 @@ if __name__ == "__main__":
     logging.info(f"BINANCE_API_KEY: {BINANCE_API_KEY[:5]}... (hidden)")
     logging.info(f"BINANCE_API_SECRET: {BINANCE_API_SECRET[:5]}... (hidden)")
     logging.info(f"BASE_URL_SPOT: {BASE_URL_SPOT}")
+    logging.info(f"BASE_URL_WS: {BASE_URL_WS}")
     logging.info(f"BASE_URL_FUTURES: {BASE_URL_FUTURES}")
@@ -0,0 +1,117 @@
+# src/conversion.py
+"""
+Asset conversion routes over the exchange's trading pairs.
+
+ConversionGraph links two assets whenever a TRADING symbol pairs them, and
+finds for every asset the shortest chain of symbols into a quote asset
+(BTC, BNB, ETH, then stablecoins are preferred as bridges when routes are
+equally short). Routes to a quote are worked out once, by a single
+breadth-first search from that quote, and kept. Rates for many assets are
+then one vectorized product over a (assets x hops) matrix of prices:
+
+    plan = graph.plan(["ETH", "XRP"], "USDT")
+    rates = plan.rates(prices)      # prices: {symbol: last price}
+"""
+from collections import deque
+
+import numpy as np
+
+# Bridges tried first when several routes are equally short
+PREFERRED_BRIDGES = ("BTC", "BNB", "ETH", "USDT", "USDC", "FDUSD")
+
+
+class ConversionPlan:
+    """
+    Routes for a fixed list of assets into one quote, as index arrays.
+    `symbols` lists every symbol any route needs; row i of `index` holds the
+    positions in `symbols` of asset i's hops (padded), `invert` marks hops
+    taken against the symbol's direction and `mask` the real ones.
+    Assets with no route have `routed` False and rate NaN.
+    """
+    def __init__(self, assets, quote_asset, routes):
+        self.assets = list(assets)
+        self.quote_asset = quote_asset
+        self.routed = np.array([r is not None for r in routes], dtype=bool)
+        self.symbols = sorted({symbol for r in routes if r for symbol, _ in r})
+        position = {s: i for i, s in enumerate(self.symbols)}
+        hops = max((len(r) for r in routes if r), default=0)
+        n = len(routes)
+        self.index = np.zeros((n, hops), dtype=np.intp)
+        self.invert = np.zeros((n, hops), dtype=bool)
+        self.mask = np.zeros((n, hops), dtype=bool)
+        for i, route in enumerate(routes):
+            for j, (symbol, inverted) in enumerate(route or ()):
+                self.index[i, j] = position[symbol]
+                self.invert[i, j] = inverted
+                self.mask[i, j] = True
+        self.routes = [tuple(r) if r is not None else None for r in routes]
+
+    def rates(self, prices):
+        """
+        Value of one unit of each asset in the quote asset. `prices` maps
+        symbol -> price; a missing price, or a zero price on an inverted hop,
+        makes that asset's rate NaN.
+        """
+        p = np.array([prices.get(s, np.nan) for s in self.symbols], dtype=float)
+        if not len(p):
+            return np.where(self.routed, 1.0, np.nan)
+        hop = p[self.index]
+        with np.errstate(divide="ignore"):
+            factors = np.where(self.mask, np.where(self.invert, 1.0 / hop, hop), 1.0)
+        rates = factors.prod(axis=1)
+        return np.where(self.routed & np.isfinite(rates), rates, np.nan)
+
+    @classmethod
+    def direct(cls, assets, quote_asset):
+        """
+        Plan that values each asset only on its <ASSET><quote> pair, for when
+        the exchange's symbol list (and so the graph) is not available.
+        """
+        return cls(assets, quote_asset,
+                   [() if a == quote_asset else ((a + quote_asset, False),) for a in assets])
+
+
+class ConversionGraph:
+    def __init__(self, symbols_info):
+        """`symbols_info`: exchangeInfo symbol entries; only TRADING symbols are used."""
+        self.edges = {}     # asset -> [(other asset, symbol, asset is base)]
+        for s in symbols_info:
+            if s.get("status", "TRADING") != "TRADING":
+                continue
+            base, quote = s["baseAsset"], s["quoteAsset"]
+            self.edges.setdefault(base, []).append((quote, s["symbol"], True))
+            self.edges.setdefault(quote, []).append((base, s["symbol"], False))
+        rank = {a: i for i, a in enumerate(PREFERRED_BRIDGES)}
+        for links in self.edges.values():
+            links.sort(key=lambda link: (rank.get(link[0], len(rank)), link[0]))
+        self._routes = {}   # quote asset -> {asset: route}
+
+    def routes_to(self, quote_asset):
+        """
+        {asset: route} for every asset that can reach `quote_asset`; a route
+        is a tuple of (symbol, inverted) hops, empty for the quote itself.
+        `inverted` means the hop divides by the symbol's price.
+        """
+        routes = self._routes.get(quote_asset)
+        if routes is not None:
+            return routes
+        routes = {quote_asset: ()}
+        queue = deque([quote_asset])
+        while queue:
+            target = queue.popleft()
+            for asset, symbol, target_is_base in self.edges.get(target, ()):
+                if asset in routes:
+                    continue
+                # asset -> target: sell asset on asset/target, or buy target on target/asset
+                routes[asset] = ((symbol, target_is_base),) + routes[target]
+                queue.append(asset)
+        self._routes[quote_asset] = routes
+        return routes
+
+    def route(self, asset, quote_asset):
+        """Hops from `asset` to `quote_asset`, or None if they are not connected."""
+        return self.routes_to(quote_asset).get(asset)
+
+    def plan(self, assets, quote_asset):
+        routes = self.routes_to(quote_asset)
+        return ConversionPlan(assets, quote_asset, [routes.get(a) for a in assets])
@@ -0,0 +1,300 @@
+# src/datastore.py
+"""
+Columnar on-disk store for backtest trade tapes.
+
+A CSV is ingested once into a directory of per-symbol partitions:
+
+    <store>/manifest.json
+    <store>/<SYMBOL>/timestamp.npy   int64 epoch ms, sorted
+    <store>/<SYMBOL>/price.npy       float64
+    <store>/<SYMBOL>/qty.npy         float64 (only if the CSV has a Quantity column)
+
+Partitions are opened with np.load(mmap_mode='r'), so opening a store is
+near-instant and tapes larger than RAM are paged in on demand.
+"""
+import os
+import json
+import hashlib
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+STORE_VERSION = 1
+MANIFEST = "manifest.json"
+# Partition used when the CSV has no Symbol column
+DEFAULT_PARTITION = "_default"
+
+TIMESTAMP_COL = "Timestamp"
+PRICE_COL = "Execution Price"
+QTY_COL = "Quantity"
+SYMBOL_COL = "Symbol"
+
+
+def default_store_dir(csv_path):
+    """Store directory that sits next to the CSV it was built from."""
+    return os.path.splitext(csv_path)[0] + "_store"
+
+
+def _source_info(csv_path):
+    st = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "mtime": st.st_mtime, "size": st.st_size}
+
+
+def read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(store_dir, manifest):
+    tmp = os.path.join(store_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(store_dir, MANIFEST))
+
+
+def is_fresh(store_dir, csv_path):
+    """True if the store exists and was built from the CSV as it is now."""
+    manifest = read_manifest(store_dir)
+    if not manifest or manifest.get("version") != STORE_VERSION:
+        return False
+    src, cur = manifest.get("source") or {}, _source_info(csv_path)
+    return src.get("mtime") == cur["mtime"] and src.get("size") == cur["size"]
+
+
+def _check_replaceable(store_dir):
+    """Refuse to overwrite a path that is neither missing, an empty directory nor a store."""
+    if not os.path.exists(store_dir):
+        return
+    if not os.path.isdir(store_dir) or (os.listdir(store_dir) and read_manifest(store_dir) is None):
+        raise ValueError(f"{store_dir} exists and is not a backtest store; refusing to overwrite it")
+
+
+def list_symbols(store_dir):
+    manifest = read_manifest(store_dir)
+    return sorted(manifest["symbols"]) if manifest else []
+
+
+def write_partition(store_dir, symbol, timestamps, prices, quantities=None):
+    """
+    Write one symbol's tape, sorting by timestamp if needed.
+    Returns the partition's manifest entry; the caller records it.
+    """
+    part_dir = os.path.join(store_dir, symbol)
+    os.makedirs(part_dir, exist_ok=True)
+
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    if quantities is not None:
+        quantities = np.asarray(quantities, dtype=np.float64)
+
+    if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, prices = timestamps[order], prices[order]
+        if quantities is not None:
+            quantities = quantities[order]
+
+    np.save(os.path.join(part_dir, "timestamp.npy"), timestamps)
+    np.save(os.path.join(part_dir, "price.npy"), prices)
+    if quantities is not None:
+        np.save(os.path.join(part_dir, "qty.npy"), quantities)
+
+    return {
+        "rows": int(len(timestamps)),
+        "first_ts": int(timestamps[0]) if len(timestamps) else None,
+        "last_ts": int(timestamps[-1]) if len(timestamps) else None,
+        "has_qty": quantities is not None,
+    }
+
+
+def allocate_partition(store_dir, symbol, rows, with_qty=False):
+    """
+    Create writable memory-mapped columns for a partition of `rows` rows, for
+    producers that generate data in chunks rather than holding it in memory.
+    Fill them in timestamp order, flush, then call finalize_partition.
+    Returns (timestamps, prices, qty-or-None).
+    """
+    part_dir = os.path.join(store_dir, symbol)
+    os.makedirs(part_dir, exist_ok=True)
+    open_memmap = np.lib.format.open_memmap
+    ts = open_memmap(os.path.join(part_dir, "timestamp.npy"), mode="w+", dtype=np.int64, shape=(rows,))
+    prices = open_memmap(os.path.join(part_dir, "price.npy"), mode="w+", dtype=np.float64, shape=(rows,))
+    qty = None
+    if with_qty:
+        qty = open_memmap(os.path.join(part_dir, "qty.npy"), mode="w+", dtype=np.float64, shape=(rows,))
+    return ts, prices, qty
+
+
+def finalize_partition(store_dir, symbol, source=None):
+    """Record a partition written via allocate_partition in the store manifest."""
+    ts, _, qty = open_partition(store_dir, symbol)
+    manifest = read_manifest(store_dir) or {"version": STORE_VERSION, "source": source, "symbols": {}}
+    manifest["symbols"][symbol] = {
+        "rows": int(len(ts)),
+        "first_ts": int(ts[0]) if len(ts) else None,
+        "last_ts": int(ts[-1]) if len(ts) else None,
+        "has_qty": qty is not None,
+    }
+    _write_manifest(store_dir, manifest)
+
+
+def open_partition(store_dir, symbol):
+    """Memory-map one partition. Returns (timestamps, prices, qty-or-None)."""
+    part_dir = os.path.join(store_dir, symbol)
+    ts = np.load(os.path.join(part_dir, "timestamp.npy"), mmap_mode="r")
+    prices = np.load(os.path.join(part_dir, "price.npy"), mmap_mode="r")
+    qty_path = os.path.join(part_dir, "qty.npy")
+    qty = np.load(qty_path, mmap_mode="r") if os.path.exists(qty_path) else None
+    return ts, prices, qty
+
+
+def partition_fingerprint(store_dir, symbol):
+    """
+    Identifies the exact data a partition was built from (source file
+    size/mtime plus row count and time range), for keying derived caches.
+    """
+    manifest = read_manifest(store_dir) or {}
+    entry = dict(manifest.get("symbols", {}).get(symbol) or {})
+    entry.setdefault("source", manifest.get("source"))
+    return hashlib.sha1(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+
+
+def load_bars(store_dir, symbol, interval_ms):
+    """Cached OHLCV bars for a partition as a dict of arrays, or None if missing/stale."""
+    path = os.path.join(store_dir, symbol, f"bars_{interval_ms}.npz")
+    try:
+        with np.load(path) as cached:
+            if str(cached["fingerprint"]) != partition_fingerprint(store_dir, symbol):
+                return None
+            return {k: cached[k] for k in cached.files if k != "fingerprint"}
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        return None
+
+
+def save_bars(store_dir, symbol, interval_ms, bars):
+    path = os.path.join(store_dir, symbol, f"bars_{interval_ms}.npz")
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, fingerprint=np.array(partition_fingerprint(store_dir, symbol)), **bars)
+    os.replace(tmp, path)
+
+
+def _spool_csv(csv_path, build_dir, chunksize, symbol=None):
+    """
+    Stream a CSV into per-symbol partitions under build_dir and return their
+    manifest entries. Chunks are spooled to raw per-symbol column files, so
+    only one partition at a time needs to fit in memory for the final sort.
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    for col in (TIMESTAMP_COL, PRICE_COL):
+        if col not in header:
+            raise ValueError(f"Missing column '{col}' in CSV")
+    has_qty = QTY_COL in header
+    by_symbol = symbol is None and SYMBOL_COL in header
+    usecols = [c for c in (TIMESTAMP_COL, PRICE_COL, QTY_COL, SYMBOL_COL) if c in header]
+
+    spools = {}
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize):
+        if by_symbol:
+            missing = int(chunk[SYMBOL_COL].isna().sum())
+            if missing:
+                raise ValueError(f"{missing} row(s) in {csv_path} have no {SYMBOL_COL}")
+            groups = ((str(sym).upper(), part) for sym, part in chunk.groupby(SYMBOL_COL, sort=False))
+        else:
+            groups = [(symbol or DEFAULT_PARTITION, chunk)]
+        for sym, part in groups:
+            if sym not in spools:
+                spools[sym] = {
+                    name: open(os.path.join(build_dir, f"{sym}.{name}.raw"), "wb")
+                    for name in (("ts", "price", "qty") if has_qty else ("ts", "price"))
+                }
+            files = spools[sym]
+            pd.to_numeric(part[TIMESTAMP_COL]).to_numpy(np.int64).tofile(files["ts"])
+            part[PRICE_COL].to_numpy(np.float64).tofile(files["price"])
+            if has_qty:
+                part[QTY_COL].to_numpy(np.float64).tofile(files["qty"])
+
+    symbols = {}
+    for sym, files in spools.items():
+        for f in files.values():
+            f.close()
+        raw = {name: np.fromfile(f.name, dtype=np.int64 if name == "ts" else np.float64)
+               for name, f in files.items()}
+        symbols[sym] = write_partition(build_dir, sym, raw["ts"], raw["price"], raw.get("qty"))
+        for f in files.values():
+            os.remove(f.name)
+    return symbols
+
+
+def ingest_csv(csv_path, store_dir=None, chunksize=5_000_000):
+    """
+    Convert a trade CSV into a columnar store (one partition per Symbol, or
+    DEFAULT_PARTITION if the CSV has no Symbol column). An existing store at
+    `store_dir` is replaced; any other existing, non-empty path is refused.
+    """
+    store_dir = os.path.abspath(store_dir or default_store_dir(csv_path))
+    _check_replaceable(store_dir)
+    # Built beside the target and swapped in, so a failed ingest leaves the old store intact
+    parent = os.path.dirname(store_dir)
+    os.makedirs(parent, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(store_dir)}.building-", dir=parent)
+    try:
+        symbols = _spool_csv(csv_path, build_dir, chunksize)
+        _write_manifest(build_dir, {
+            "version": STORE_VERSION,
+            "source": _source_info(csv_path),
+            "symbols": symbols,
+        })
+        if os.path.exists(store_dir):
+            old_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(store_dir)}.old-", dir=parent)
+            os.replace(store_dir, os.path.join(old_dir, "store"))
+            os.replace(build_dir, store_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.replace(build_dir, store_dir)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return store_dir
+
+
+def ingest_symbol_csv(csv_path, store_dir, symbol, chunksize=5_000_000):
+    """
+    Add (or replace) a single symbol's partition from a per-symbol CSV,
+    leaving the store's other partitions untouched.
+    """
+    symbol = symbol.upper()
+    _check_replaceable(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f".{symbol}.building-", dir=store_dir)
+    try:
+        entry = _spool_csv(csv_path, build_dir, chunksize, symbol=symbol)[symbol]
+        entry["source"] = _source_info(csv_path)
+        part_dir = os.path.join(store_dir, symbol)
+        shutil.rmtree(part_dir, ignore_errors=True)
+        os.replace(os.path.join(build_dir, symbol), part_dir)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    manifest = read_manifest(store_dir) or {"version": STORE_VERSION, "source": None, "symbols": {}}
+    manifest["symbols"][symbol] = entry
+    _write_manifest(store_dir, manifest)
+    return store_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest a trade CSV into a columnar backtest store.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--out", dest="store_dir", default=None, help="Store directory (default: <csv>_store)")
+    parser.add_argument("--symbol", default=None, help="Add the CSV as this symbol's partition of an existing store")
+    args = parser.parse_args()
+    if args.symbol:
+        if not args.store_dir:
+            parser.error("--symbol requires --out")
+        out = ingest_symbol_csv(args.csv_path, args.store_dir, args.symbol)
+    else:
+        out = ingest_csv(args.csv_path, args.store_dir)
+    print(f"Ingested {args.csv_path} -> {out} ({', '.join(list_symbols(out))})")
@@ -0,0 +1,237 @@
+# src/exchange_info.py
+"""
+Shared, lazily loaded cache of /v3/exchangeInfo symbol data.
+
+Nothing is downloaded until a symbol is asked for. Single symbols (or a
+handful) are fetched on their own with the `symbol`/`symbols` parameters;
+the full list is only fetched when something needs every symbol. Entries
+are persisted to a JSON-lines file per API host and reused by later processes
+until they are older than `ttl`. If a refresh fails, stale entries are
+served with a warning rather than failing the caller.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urlsplit
+
+from logger_config import logger
+
+DEFAULT_TTL = 6 * 3600
+COMPACT_AFTER = 200         # disk log records before it is rewritten as one snapshot
+CACHE_DIR = os.getenv("EXCHANGE_INFO_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache"))
+
+
+def default_cache_path(base_url):
+    """One cache file per API host, so testnet and mainnet data never mix."""
+    host = urlsplit(base_url).netloc or "default"
+    tag = hashlib.sha1(base_url.encode()).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"exchange_info_{host.replace(':', '_')}_{tag}.jsonl")
+
+
+class ExchangeInfoCache:
+    """
+    `fetch(symbols=None)` returns an exchangeInfo response: for every
+    symbol when `symbols` is None, otherwise for just those symbols.
+    If a `limiter` is given, the `rateLimits` published with the response
+    are applied to it whenever they are loaded.
+
+    Fetches run outside the lock, so readers of cached symbols never wait
+    on the network; concurrent requests for the same symbols share one
+    fetch. The disk file is an append-only log of JSON records: a partial
+    fetch appends just the symbols it got, and the file is only rewritten
+    by a full fetch, invalidate(), or once `compact_after` records pile up.
+    """
+    def __init__(self, fetch, path=None, ttl=DEFAULT_TTL, limiter=None, compact_after=COMPACT_AFTER):
+        self.fetch = fetch
+        self.path = path
+        self.ttl = ttl
+        self.limiter = limiter
+        self.compact_after = compact_after
+        self._symbols = {}          # symbol -> (fetched_at, info)
+        self._filters = {}          # symbol -> {filterType: filter}, built on demand
+        self._full_at = 0.0         # when the complete symbol list was last fetched
+        self.rate_limits = []
+        self._lock = threading.RLock()
+        self._inflight = {}         # symbol (None for the full list) -> Event set when its fetch ends
+        self._disk_loaded = False
+        self._records = 0           # records in the disk log
+
+    # ---------------- Disk ----------------
+    def _load_disk(self):
+        self._disk_loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue            # a write cut short by a crash
+            self._apply_record(record)
+            self._records += 1
+
+    def _apply_record(self, record):
+        if record.get("reset"):
+            self._symbols, self._filters = {}, {}
+            self._full_at = record.get("full_at", 0.0)
+        for s, (t, info) in record.get("symbols", {}).items():
+            self._symbols[s] = (t, info)
+            self._filters.pop(s, None)
+        if record.get("rateLimits"):
+            self._set_rate_limits(record["rateLimits"])
+
+    def _write_disk(self, record, append):
+        if not self.path:
+            return
+        line = json.dumps(record) + "\n"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if append:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                self._records += 1
+                return
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(line)
+            os.replace(tmp, self.path)
+            self._records = 1
+        except OSError as e:
+            logger.warning(f"Could not persist exchange info cache: {e}")
+
+    def _snapshot(self):
+        return {"reset": True, "full_at": self._full_at, "rateLimits": self.rate_limits,
+                "symbols": self._symbols}
+
+    # ---------------- Fetching ----------------
+    def _store(self, info, full):
+        now = time.time()
+        record = {"reset": full, "symbols": {s["symbol"]: (now, s) for s in info.get("symbols", [])}}
+        if full:
+            record["full_at"] = now
+        if info.get("rateLimits"):
+            record["rateLimits"] = info["rateLimits"]
+        self._apply_record(record)
+        if full or self._records >= self.compact_after:
+            self._write_disk(self._snapshot(), append=False)
+        else:
+            self._write_disk(record, append=True)
+
+    def _set_rate_limits(self, rate_limits):
+        self.rate_limits = rate_limits
+        if rate_limits and self.limiter is not None:
+            self.limiter.configure(rate_limits)
+
+    def _fresh(self, fetched_at):
+        return time.time() - fetched_at < self.ttl
+
+    def _stale(self, key):
+        if key is None:
+            return not self._fresh(self._full_at)
+        return key not in self._symbols or not self._fresh(self._symbols[key][0])
+
+    def _refresh(self, keys):
+        """
+        Fetch whichever of `keys` (symbols, or [None] for the full list) are
+        missing or stale. Keys another thread is already fetching are waited
+        for instead, then checked again.
+        """
+        while keys:
+            with self._lock:
+                if not self._disk_loaded:
+                    self._load_disk()
+                missing = [k for k in keys if self._stale(k)]
+                waits = {self._inflight[k] for k in missing if k in self._inflight}
+                mine = [k for k in missing if k not in self._inflight]
+                done = threading.Event()
+                for k in mine:
+                    self._inflight[k] = done
+            if mine:
+                try:
+                    self._fetch(mine)
+                finally:
+                    with self._lock:
+                        for k in mine:
+                            if self._inflight.get(k) is done:
+                                del self._inflight[k]
+                    done.set()
+            for event in waits:
+                event.wait()
+            keys = [k for k in missing if k not in mine]
+
+    def _fetch(self, keys):
+        full = keys == [None]
+        try:
+            info = self.fetch(symbols=None if full else keys)
+        except Exception as e:
+            with self._lock:
+                cached = self._full_at if full else all(k in self._symbols for k in keys)
+            if cached:
+                logger.warning(f"Exchange info refresh failed, using cached data: {e}")
+                return
+            raise
+        with self._lock:
+            self._store(info, full=full)
+
+    # ---------------- Reads ----------------
+    def symbol_info(self, symbol):
+        """exchangeInfo entry for `symbol` (the exchange rejects unknown symbols with -1121)."""
+        self._refresh([symbol])
+        with self._lock:
+            return self._symbols[symbol][1]
+
+    def filters(self, symbol):
+        """{filterType: filter} for `symbol`."""
+        # Under the lock: a concurrent refresh or invalidate() swaps both tables
+        with self._lock:
+            cached = self._filters.get(symbol)
+            if cached is not None and self._fresh(self._symbols[symbol][0]):
+                return cached
+        info = self.symbol_info(symbol)
+        with self._lock:
+            # Build from the newest entry, in case another refresh landed meanwhile
+            info = self._symbols.get(symbol, (None, info))[1]
+            cached = self._filters[symbol] = {f["filterType"]: f for f in info["filters"]}
+            return cached
+
+    def prefetch(self, symbols):
+        """Fetch several symbols in one request ahead of use."""
+        self._refresh(list(symbols))
+
+    def load(self, info):
+        """Store an exchangeInfo response fetched elsewhere (e.g. by the async client)."""
+        with self._lock:
+            if not self._disk_loaded:
+                self._load_disk()
+            self._store(info, full=False)
+
+    def all_symbols(self):
+        """Every symbol's exchangeInfo entry."""
+        self._refresh([None])
+        with self._lock:
+            return [info for _, info in self._symbols.values()]
+
+    def invalidate(self):
+        with self._lock:
+            self._symbols, self._filters, self._full_at = {}, {}, 0.0
+            self._disk_loaded = True
+            self._write_disk(self._snapshot(), append=False)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache(fetch, base_url, limiter=None):
+    """The process-wide ExchangeInfoCache, created with `fetch` (and `limiter`) on first use."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ExchangeInfoCache(fetch, path=default_cache_path(base_url), limiter=limiter)
+        return _shared_cache
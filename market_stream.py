@@ -0,0 +1,305 @@
+# src/market_stream.py
+"""
+Streaming market data over Binance's combined WebSocket streams.
+
+MarketDataStream connects to /stream, subscribes to <symbol>@bookTicker
+and <symbol>@miniTicker for every watched symbol and writes each update
+into a PriceCache, so price reads cost no network round trip. A new
+connection is opened for every 1024 streams (Binance's per-connection
+limit). Dropped connections (including Binance's 24h cutoff) are
+re-opened with backoff and their streams resubscribed.
+
+Other stream types register a handler for their stream name with
+subscribe(); the handler gets the event's `data` payload:
+
+    stream = MarketDataStream(["BTCUSDT", "ETHUSDT"]).start()
+    DEFAULT_PRICE_CACHE.price("BTCUSDT")
+"""
+import json
+import time
+import random
+import itertools
+import threading
+
+import websocket
+
+from config import BASE_URL_WS
+from logger_config import logger
+
+PRICE_STREAMS = ("bookTicker", "miniTicker")
+# Binance limit on streams per WebSocket connection
+MAX_STREAMS_PER_CONNECTION = 1024
+
+
+class Quote:
+    """Latest top-of-book and last price for one symbol."""
+    __slots__ = ("symbol", "bid", "bid_qty", "ask", "ask_qty", "last", "updated")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bid = self.bid_qty = self.ask = self.ask_qty = self.last = None
+        self.updated = 0.0
+
+    @property
+    def mid(self):
+        if self.bid is None or self.ask is None:
+            return None
+        return (self.bid + self.ask) / 2
+
+    @property
+    def price(self):
+        """Last trade price, or the book mid if no trade has been seen yet."""
+        return self.last if self.last is not None else self.mid
+
+
+class PriceCache:
+    """
+    Symbol -> Quote table written by the stream thread and read by anyone.
+    Each update replaces single attributes, so readers never need a lock.
+    """
+    def __init__(self):
+        self._quotes = {}
+
+    def _quote(self, symbol):
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            quote = self._quotes.setdefault(symbol, Quote(symbol))
+        return quote
+
+    def on_book_ticker(self, data):
+        quote = self._quote(data["s"])
+        quote.bid, quote.bid_qty = float(data["b"]), float(data["B"])
+        quote.ask, quote.ask_qty = float(data["a"]), float(data["A"])
+        quote.updated = time.time()
+
+    def on_mini_ticker(self, data):
+        quote = self._quote(data["s"])
+        quote.last = float(data["c"])
+        quote.updated = time.time()
+
+    def set_price(self, symbol, price):
+        """Seed or overwrite the last price (e.g. from a REST response)."""
+        quote = self._quote(symbol)
+        quote.last = float(price)
+        quote.updated = time.time()
+
+    def get(self, symbol, max_age=None):
+        """Quote for `symbol`, or None if unknown or older than `max_age` seconds."""
+        quote = self._quotes.get(symbol)
+        if quote is None or (max_age is not None and time.time() - quote.updated > max_age):
+            return None
+        return quote
+
+    def price(self, symbol, max_age=None):
+        quote = self.get(symbol, max_age)
+        return quote.price if quote is not None else None
+
+    def prices(self, max_age=None):
+        """{symbol: price} for every fresh symbol with a price."""
+        now = time.time()
+        return {s: q.price for s, q in list(self._quotes.items())
+                if q.price is not None and (max_age is None or now - q.updated <= max_age)}
+
+    def __contains__(self, symbol):
+        return symbol in self._quotes
+
+
+# Shared by every client and stream in the process
+DEFAULT_PRICE_CACHE = PriceCache()
+
+
+class MarketDataStream:
+    """
+    Combined-stream WebSocket connections with automatic reconnect.
+    `handlers` maps stream names (e.g. "btcusdt@bookTicker") to callbacks.
+    Binance caps a connection at 1024 streams, so streams are spread over
+    as many connections as needed, each resubscribing its own set on every
+    (re)connect.
+    """
+    def __init__(self, symbols=(), cache=None, url=None, price_streams=PRICE_STREAMS,
+                 max_backoff=30.0, ping_interval=20, ping_timeout=10,
+                 max_streams=MAX_STREAMS_PER_CONNECTION):
+        self.cache = cache or DEFAULT_PRICE_CACHE
+        self.url = (url or BASE_URL_WS).rstrip("/") + "/stream"
+        self.price_streams = tuple(price_streams)
+        self.max_backoff = max_backoff
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.max_streams = max_streams
+        self.handlers = {}
+        self.connections = []
+        self._connection_of = {}    # stream name -> _Connection carrying it
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._running = False
+        self.watch(symbols)
+
+    @property
+    def connected(self):
+        """True once every connection is open."""
+        return bool(self.connections) and all(c.connected.is_set() for c in self.connections)
+
+    # ---------------- Subscriptions ----------------
+    def _price_handler(self, kind):
+        return self.cache.on_book_ticker if kind == "bookTicker" else self.cache.on_mini_ticker
+
+    def watch(self, symbols):
+        """Stream prices for `symbols` into the cache."""
+        self.subscribe_many({f"{s.lower()}@{kind}": self._price_handler(kind)
+                             for s in symbols for kind in self.price_streams})
+
+    def unwatch(self, symbols):
+        self.unsubscribe([f"{s.lower()}@{kind}" for s in symbols for kind in self.price_streams])
+
+    def subscribe(self, stream, handler):
+        """Route events of `stream` to handler(data), subscribing live if connected."""
+        self.subscribe_many({stream: handler})
+
+    def subscribe_many(self, handlers):
+        """subscribe() for a {stream: handler} dict, one SUBSCRIBE message per connection."""
+        added = {}
+        with self._lock:
+            for stream, handler in handlers.items():
+                if stream not in self.handlers:
+                    connection = self._connection_with_room()
+                    connection.streams.add(stream)
+                    self._connection_of[stream] = connection
+                    added.setdefault(connection, []).append(stream)
+                self.handlers[stream] = handler
+        for connection, streams in added.items():
+            connection.send_method("SUBSCRIBE", streams)
+
+    def unsubscribe(self, streams):
+        removed = {}
+        with self._lock:
+            for stream in streams:
+                if self.handlers.pop(stream, None) is not None:
+                    connection = self._connection_of.pop(stream)
+                    connection.streams.discard(stream)
+                    removed.setdefault(connection, []).append(stream)
+        for connection, names in removed.items():
+            connection.send_method("UNSUBSCRIBE", names)
+
+    def _connection_with_room(self):
+        # Caller holds self._lock. Freed slots on existing connections are reused first.
+        for connection in self.connections:
+            if len(connection.streams) < self.max_streams:
+                return connection
+        connection = _Connection(self, len(self.connections))
+        self.connections.append(connection)
+        if self._running:
+            connection.start()
+        return connection
+
+    # ---------------- Connection ----------------
+    def start(self):
+        with self._lock:
+            self._running = True
+            for connection in self.connections:
+                connection.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            connections = list(self.connections)
+        for connection in connections:
+            connection.stop()
+
+    def _dispatch(self, message):
+        msg = json.loads(message)
+        stream = msg.get("stream")
+        if stream is None:
+            if msg.get("error"):
+                logger.error(f"Market stream error reply: {msg['error']}")
+            return  # SUBSCRIBE/UNSUBSCRIBE acknowledgement
+        handler = self.handlers.get(stream)
+        if handler is not None:
+            try:
+                handler(msg["data"])
+            except Exception as e:
+                logger.error(f"Market stream handler for {stream} failed: {e}")
+
+
+class _Connection:
+    """One /stream WebSocket carrying up to `max_streams` of a MarketDataStream's streams."""
+    def __init__(self, owner, number):
+        self.owner = owner
+        self.name = f"market-stream-{number}"
+        self.streams = set()        # guarded by owner._lock
+        self.connected = threading.Event()
+        self._ws = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def send_method(self, method, streams):
+        ws = self._ws
+        if ws is None or not self.connected.is_set():
+            return  # picked up by the subscribe-all in _on_open
+        try:
+            ws.send(json.dumps({"method": method, "params": streams, "id": next(self.owner._ids)}))
+        except websocket.WebSocketException as e:
+            logger.warning(f"{self.name} {method} failed, will resubscribe on reconnect: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        owner = self.owner
+        failures = 0
+        while not self._stop.is_set():
+            opened = time.monotonic()
+            self._ws = websocket.WebSocketApp(
+                owner.url, on_open=self._on_open, on_message=self._on_message,
+                on_error=self._on_error, on_close=self._on_close,
+            )
+            self._ws.run_forever(ping_interval=owner.ping_interval, ping_timeout=owner.ping_timeout)
+            self.connected.clear()
+            if self._stop.is_set():
+                break
+            # A connection that stayed up for a while resets the backoff
+            failures = 0 if time.monotonic() - opened > 60 else failures + 1
+            delay = random.uniform(0, min(owner.max_backoff, 2 ** failures))
+            logger.warning(f"{self.name} disconnected; reconnecting in {delay:.1f}s")
+            self._stop.wait(delay)
+
+    def _on_open(self, ws):
+        self.connected.set()
+        with self.owner._lock:
+            streams = sorted(self.streams)
+        if streams:
+            ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams, "id": next(self.owner._ids)}))
+        logger.info(f"{self.name} connected ({len(streams)} streams)")
+
+    def _on_message(self, ws, message):
+        self.owner._dispatch(message)
+
+    def _on_error(self, ws, error):
+        logger.warning(f"{self.name} error: {error}")
+
+    def _on_close(self, ws, status, reason):
+        self.connected.clear()
+
+
+_shared_stream = None
+_shared_lock = threading.Lock()
+
+
+def shared_stream():
+    """The process-wide MarketDataStream feeding DEFAULT_PRICE_CACHE, started on first use."""
+    global _shared_stream
+    with _shared_lock:
+        if _shared_stream is None:
+            _shared_stream = MarketDataStream().start()
+        return _shared_stream
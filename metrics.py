@@ -0,0 +1,132 @@
+# src/metrics.py
+"""
+Vectorized performance metrics for backtest fills.
+
+Works on the fill dicts produced by BacktestEngine / BacktestSimulator
+(side, qty, fill_price, optional fee, ts or timestamp). Fills are turned
+into arrays once; position, cash and equity are cumulative sums over them,
+so scoring a run is a handful of NumPy passes regardless of fill count.
+"""
+import numpy as np
+
+from backnet import _interval_ms, _to_ms_array
+
+YEAR_MS = 365 * 86_400_000
+
+
+def fills_to_arrays(fills, fee_rate=0.0):
+    """
+    Convert fill dicts to sorted arrays: (ts_ms, signed_qty, price, fee).
+    Non-filled entries and error dicts are skipped. Fees default to
+    fee_rate * notional when a fill does not carry its own `fee`.
+    """
+    fills = [f for f in fills if isinstance(f, dict) and f.get("status") == "FILLED"]
+    if not fills:
+        empty = np.empty(0, dtype=np.float64)
+        return np.empty(0, dtype=np.int64), empty, empty, empty
+
+    if all("ts" in f for f in fills):
+        ts = np.fromiter((f["ts"] for f in fills), dtype=np.int64, count=len(fills))
+    else:
+        ts = _to_ms_array(np.array([f["timestamp"] for f in fills], dtype=object))
+    qty = np.fromiter((f["qty"] for f in fills), dtype=np.float64, count=len(fills))
+    sign = np.fromiter((1.0 if f["side"].upper() == "BUY" else -1.0 for f in fills),
+                       dtype=np.float64, count=len(fills))
+    price = np.fromiter((f["fill_price"] for f in fills), dtype=np.float64, count=len(fills))
+    fee = np.fromiter((f.get("fee", np.nan) for f in fills), dtype=np.float64, count=len(fills))
+    fee = np.where(np.isnan(fee), np.abs(qty * price) * fee_rate, fee)
+
+    order = np.argsort(ts, kind="stable")
+    return ts[order], (sign * qty)[order], price[order], fee[order]
+
+
+def _curve(arrays, mark_ts, mark_prices, initial_cash, initial_position):
+    f_ts, f_qty, f_price, f_fee = arrays
+    position = initial_position + np.cumsum(f_qty)
+    cash = initial_cash - np.cumsum(f_qty * f_price + f_fee)
+
+    if mark_ts is None:
+        return f_ts, cash + position * f_price
+
+    mark_ts = np.asarray(mark_ts, dtype=np.int64)
+    mark_prices = np.asarray(mark_prices, dtype=np.float64)
+    k = np.searchsorted(f_ts, mark_ts, side="right") - 1
+    has_fill = k >= 0
+    pos_at = np.where(has_fill, position[np.maximum(k, 0)] if len(position) else 0.0, initial_position)
+    cash_at = np.where(has_fill, cash[np.maximum(k, 0)] if len(cash) else 0.0, initial_cash)
+    return mark_ts, cash_at + pos_at * mark_prices
+
+
+def equity_curve(fills, mark_ts=None, mark_prices=None, initial_cash=0.0, initial_position=0.0, fee_rate=0.0):
+    """
+    Equity (quote asset) over time. With marks, equity is evaluated at each
+    mark timestamp using the position/cash after the last fill at or before
+    it; without marks, at every fill, marked at the fill price.
+    Returns (ts_ms, equity) arrays.
+    """
+    return _curve(fills_to_arrays(fills, fee_rate), mark_ts, mark_prices, initial_cash, initial_position)
+
+
+def compute_metrics(fills, mark_ts=None, mark_prices=None, initial_cash=0.0, initial_position=0.0,
+                    fee_rate=0.0, periods_per_year=None):
+    """
+    Standard risk/return statistics for one run, as a flat dict:
+    final_equity, pnl, total_return, max_drawdown, sharpe, volatility,
+    turnover, fees, n_fills.
+
+    `periods_per_year` annualizes Sharpe/volatility; by default it is inferred
+    from the median spacing of the equity curve.
+    """
+    arrays = fills_to_arrays(fills, fee_rate)
+    f_ts, f_qty, f_price, f_fee = arrays
+    ts, equity = _curve(arrays, mark_ts, mark_prices, initial_cash, initial_position)
+
+    if mark_prices is not None and len(mark_prices):
+        start_equity = initial_cash + initial_position * float(np.asarray(mark_prices)[0])
+    elif len(f_price):
+        start_equity = initial_cash + initial_position * f_price[0]
+    else:
+        start_equity = initial_cash
+    final_equity = float(equity[-1]) if len(equity) else start_equity
+
+    metrics = {
+        "final_equity": final_equity,
+        "pnl": float(final_equity - start_equity),
+        "total_return": float(final_equity / start_equity - 1.0) if start_equity else np.nan,
+        "max_drawdown": 0.0,
+        "sharpe": np.nan,
+        "volatility": np.nan,
+        "turnover": np.nan,
+        "fees": float(f_fee.sum()),
+        "n_fills": int(len(f_ts)),
+    }
+    if len(equity) < 2:
+        return metrics
+
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, equity / peak - 1.0, 0.0)
+        returns = np.diff(equity) / equity[:-1]
+    returns = returns[np.isfinite(returns)]
+    metrics["max_drawdown"] = float(drawdown.min())
+
+    if periods_per_year is None:
+        step = np.median(np.diff(ts))
+        periods_per_year = YEAR_MS / step if step > 0 else np.nan
+    if len(returns) > 1:
+        std = returns.std(ddof=1)
+        metrics["volatility"] = float(std * np.sqrt(periods_per_year))
+        metrics["sharpe"] = float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else np.nan
+
+    mean_equity = abs(equity.mean())
+    if mean_equity:
+        metrics["turnover"] = float(np.abs(f_qty * f_price).sum() / mean_equity)
+    return metrics
+
+
+def score_run(engine, symbol, fills, interval="1h", initial_cash=0.0, initial_position=0.0, fee_rate=0.0):
+    """compute_metrics with equity marked at the close of each `interval` bar of the symbol's tape."""
+    bars = engine.get_bars(symbol, interval)
+    mark_ts = bars["open_time"].to_numpy() + _interval_ms(interval) - 1
+    return compute_metrics(fills, mark_ts, bars["close"].to_numpy(), initial_cash, initial_position,
+                           fee_rate, periods_per_year=YEAR_MS / _interval_ms(interval))
@@ -0,0 +1,544 @@
+# src/mock_server.py
+"""
+Local stand-in for the Binance Spot REST API, for offline load and latency
+testing of BinanceClient.
+
+Implements /v3/ping, /v3/time, /v3/exchangeInfo, /v3/ticker/price,
+/v3/depth, /v3/order, /v3/openOrders, /v3/account and /v3/userDataStream
+(listen keys only; no WebSocket side) with HMAC signature and recvWindow
+checks, Binance-style error bodies, request-weight / order-count headers
+and 429s when limits are exceeded, plus configurable latency, error
+injection and server clock skew.
+
+Run it and point the client at it with USE_MOCK_SERVER=true:
+
+    python src/mock_server.py --port 8765 --latency-ms 20 --jitter-ms 10 --error-rate 0.01
+"""
+import json
+import hmac
+import time
+import random
+import hashlib
+import secrets
+import argparse
+import itertools
+import threading
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import BINANCE_API_KEY, BINANCE_API_SECRET
+from ratelimit import request_weight
+
+DEFAULT_PRICES = {
+    "BTCUSDT": 30000.0,
+    "ETHUSDT": 2000.0,
+    "BNBUSDT": 250.0,
+    "ETHBTC": 0.066,
+    "BNBBTC": 0.0083,
+}
+DEFAULT_BALANCES = {"USDT": 100000.0, "BTC": 1.0, "ETH": 10.0, "BNB": 50.0}
+
+WEIGHT_LIMIT_1M = 6000
+ORDER_LIMIT_10S = 100
+ORDER_LIMIT_1D = 200000
+
+
+class MockAPIError(Exception):
+    def __init__(self, status, code, msg, headers=None):
+        super().__init__(msg)
+        self.status = status
+        self.code = code
+        self.msg = msg
+        self.headers = headers or {}
+
+
+def _split_symbol(symbol):
+    for quote in ("USDT", "BTC", "BNB", "ETH"):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise ValueError(f"Cannot split symbol {symbol}")
+
+
+class MockExchange:
+    """In-memory exchange state: prices, balances, orders and rate-limit counters."""
+    def __init__(self, prices=None, balances=None):
+        self.lock = threading.RLock()
+        self.prices = dict(prices or DEFAULT_PRICES)
+        self.balances = {a: {"free": v, "locked": 0.0} for a, v in (balances or DEFAULT_BALANCES).items()}
+        self.orders = {}                    # orderId -> order dict
+        self._ids = itertools.count(1)
+        self.update_id = 1                  # book lastUpdateId, bumped on every price move
+        self.listen_keys = {}               # listenKey -> expiry (epoch seconds)
+        self._weight = (0, 0)               # (minute, used weight)
+        self._orders_10s = (0, 0)           # (10s window, count)
+        self._orders_1d = (0, 0)            # (day, count)
+
+    # ---------------- Rate limits ----------------
+    def charge(self, weight, is_order):
+        """Count a request; returns the rate-limit headers or raises a 429."""
+        now = time.time()
+        with self.lock:
+            minute, used = self._weight
+            if minute != int(now // 60):
+                minute, used = int(now // 60), 0
+            used += weight
+            self._weight = (minute, used)
+
+            headers = {"X-MBX-USED-WEIGHT-1M": str(used)}
+            if used > WEIGHT_LIMIT_1M:
+                retry = 60 - int(now % 60)
+                raise MockAPIError(429, -1003, "Too much request weight used; please use the websocket for live updates to avoid polling the API.",
+                                   {**headers, "Retry-After": str(retry)})
+
+            if is_order:
+                win, n10 = self._orders_10s
+                if win != int(now // 10):
+                    win, n10 = int(now // 10), 0
+                day, n1d = self._orders_1d
+                if day != int(now // 86400):
+                    day, n1d = int(now // 86400), 0
+                n10, n1d = n10 + 1, n1d + 1
+                self._orders_10s, self._orders_1d = (win, n10), (day, n1d)
+                headers["X-MBX-ORDER-COUNT-10S"] = str(n10)
+                headers["X-MBX-ORDER-COUNT-1D"] = str(n1d)
+                if n10 > ORDER_LIMIT_10S or n1d > ORDER_LIMIT_1D:
+                    raise MockAPIError(429, -1015, "Too many new orders.", {**headers, "Retry-After": "10"})
+            return headers
+
+    # ---------------- Market data ----------------
+    def exchange_info(self, symbols=None):
+        out = []
+        for symbol in sorted(symbols or self.prices):
+            if symbol not in self.prices:
+                raise MockAPIError(400, -1121, "Invalid symbol.")
+            base, quote = _split_symbol(symbol)
+            out.append({
+                "symbol": symbol,
+                "status": "TRADING",
+                "baseAsset": base,
+                "quoteAsset": quote,
+                "baseAssetPrecision": 8,
+                "quoteAssetPrecision": 8,
+                "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT", "TAKE_PROFIT_LIMIT"],
+                "isSpotTradingAllowed": True,
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": "0.00000100", "maxPrice": "1000000.00000000", "tickSize": "0.00000100" if quote == "BTC" else "0.01000000"},
+                    {"filterType": "LOT_SIZE", "minQty": "0.00001000", "maxQty": "9000.00000000", "stepSize": "0.00001000"},
+                    {"filterType": "NOTIONAL", "minNotional": "0.00010000" if quote == "BTC" else "5.00000000", "applyMinToMarket": True,
+                     "maxNotional": "9000000.00000000", "applyMaxToMarket": False, "avgPriceMins": 5},
+                    {"filterType": "PERCENT_PRICE_BY_SIDE", "bidMultiplierUp": "5", "bidMultiplierDown": "0.2",
+                     "askMultiplierUp": "5", "askMultiplierDown": "0.2", "avgPriceMins": 5},
+                    {"filterType": "MAX_NUM_ORDERS", "maxNumOrders": 200},
+                ],
+            })
+        return {
+            "timezone": "UTC",
+            "serverTime": int(time.time() * 1000),
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": WEIGHT_LIMIT_1M},
+                {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": ORDER_LIMIT_10S},
+                {"rateLimitType": "ORDERS", "interval": "DAY", "intervalNum": 1, "limit": ORDER_LIMIT_1D},
+            ],
+            "exchangeFilters": [],
+            "symbols": out,
+        }
+
+    def ticker_price(self, symbol=None):
+        with self.lock:
+            if symbol is None:
+                return [{"symbol": s, "price": f"{p:.8f}"} for s, p in sorted(self.prices.items())]
+            if symbol not in self.prices:
+                raise MockAPIError(400, -1121, "Invalid symbol.")
+            return {"symbol": symbol, "price": f"{self.prices[symbol]:.8f}"}
+
+    def depth(self, symbol, limit=100):
+        """Synthetic book: `limit` levels a step apart on each side of the price, thinning out with distance."""
+        with self.lock:
+            if symbol not in self.prices:
+                raise MockAPIError(400, -1121, "Invalid symbol.")
+            price, update_id = self.prices[symbol], self.update_id
+        limit = min(int(limit), 5000)
+        step = price * 1e-4
+        return {
+            "lastUpdateId": update_id,
+            "bids": [[f"{price - step * (i + 1):.8f}", f"{1.0 / (i + 1):.8f}"] for i in range(limit)],
+            "asks": [[f"{price + step * (i + 1):.8f}", f"{1.0 / (i + 1):.8f}"] for i in range(limit)],
+        }
+
+    def set_price(self, symbol, price):
+        """Move a market's price and fill any resting limit orders it crosses."""
+        with self.lock:
+            self.prices[symbol] = float(price)
+            self.update_id += 1
+            for order in list(self.orders.values()):
+                if order["symbol"] == symbol and order["status"] == "NEW" and self._crosses(order, price):
+                    self._fill(order, float(order["price"]))
+
+    # ---------------- Orders ----------------
+    def _crosses(self, order, price):
+        limit = float(order["price"])
+        return price <= limit if order["side"] == "BUY" else price >= limit
+
+    def _balance(self, asset):
+        return self.balances.setdefault(asset, {"free": 0.0, "locked": 0.0})
+
+    def _fill(self, order, price):
+        base, quote = _split_symbol(order["symbol"])
+        qty = float(order["origQty"])
+        if order["type"] == "LIMIT":
+            # release the reservation made at placement
+            if order["side"] == "BUY":
+                reserved = qty * float(order["price"])
+                self._balance(quote)["locked"] -= reserved
+                self._balance(quote)["free"] += reserved - qty * price
+            else:
+                self._balance(base)["locked"] -= qty
+        else:
+            if order["side"] == "BUY":
+                self._balance(quote)["free"] -= qty * price
+            else:
+                self._balance(base)["free"] -= qty
+        if order["side"] == "BUY":
+            self._balance(base)["free"] += qty
+        else:
+            self._balance(quote)["free"] += qty * price
+        order.update({
+            "status": "FILLED",
+            "executedQty": f"{qty:.8f}",
+            "cummulativeQuoteQty": f"{qty * price:.8f}",
+            "updateTime": int(time.time() * 1000),
+        })
+
+    def create_order(self, params):
+        symbol = params.get("symbol")
+        if symbol not in self.prices:
+            raise MockAPIError(400, -1121, "Invalid symbol.")
+        side, otype = params.get("side"), params.get("type")
+        if side not in ("BUY", "SELL"):
+            raise MockAPIError(400, -1117, "Invalid side.")
+        if otype not in ("MARKET", "LIMIT"):
+            raise MockAPIError(400, -1116, "Invalid orderType.")
+        try:
+            qty = float(params["quantity"])
+        except (KeyError, ValueError):
+            raise MockAPIError(400, -1102, "Mandatory parameter 'quantity' was not sent, was empty/null, or malformed.")
+        if otype == "LIMIT" and "price" not in params:
+            raise MockAPIError(400, -1102, "Mandatory parameter 'price' was not sent, was empty/null, or malformed.")
+
+        with self.lock:
+            client_id = params.get("newClientOrderId") or f"mock{next(self._ids):016d}"
+            if any(o["clientOrderId"] == client_id and o["status"] == "NEW" for o in self.orders.values()):
+                raise MockAPIError(400, -2010, "Duplicate order sent.")
+
+            base, quote = _split_symbol(symbol)
+            market = self.prices[symbol]
+            price = float(params["price"]) if otype == "LIMIT" else market
+            if side == "BUY":
+                asset, need = quote, qty * price
+            else:
+                asset, need = base, qty
+            if self._balance(asset)["free"] < need:
+                raise MockAPIError(400, -2010, "Account has insufficient balance for requested action.")
+
+            now = int(time.time() * 1000)
+            order = {
+                "symbol": symbol,
+                "orderId": next(self._ids),
+                "orderListId": -1,
+                "clientOrderId": client_id,
+                "transactTime": now,
+                "price": f"{price:.8f}" if otype == "LIMIT" else "0.00000000",
+                "origQty": f"{qty:.8f}",
+                "executedQty": "0.00000000",
+                "cummulativeQuoteQty": "0.00000000",
+                "status": "NEW",
+                "timeInForce": params.get("timeInForce", "GTC") if otype == "LIMIT" else "GTC",
+                "type": otype,
+                "side": side,
+                "time": now,
+                "updateTime": now,
+            }
+            self.orders[order["orderId"]] = order
+
+            if otype == "MARKET":
+                self._fill(order, market)
+            else:
+                self._balance(asset)["free"] -= need
+                self._balance(asset)["locked"] += need
+                if self._crosses(order, market):
+                    self._fill(order, market)
+            return {k: v for k, v in order.items() if k not in ("time", "updateTime")}
+
+    def _find(self, params):
+        with self.lock:
+            if "orderId" in params:
+                order = self.orders.get(int(params["orderId"]))
+            elif "origClientOrderId" in params:
+                order = next((o for o in self.orders.values() if o["clientOrderId"] == params["origClientOrderId"]), None)
+            else:
+                raise MockAPIError(400, -1102, "Param 'origClientOrderId' or 'orderId' must be sent, but both were empty/null!")
+            if order is None or order["symbol"] != params.get("symbol"):
+                raise MockAPIError(400, -2013, "Order does not exist.")
+            return order
+
+    def get_order(self, params):
+        return dict(self._find(params))
+
+    def cancel_order(self, params):
+        with self.lock:
+            order = self._find(params)
+            if order["status"] != "NEW":
+                raise MockAPIError(400, -2011, "Unknown order sent.")
+            base, quote = _split_symbol(order["symbol"])
+            qty = float(order["origQty"])
+            if order["side"] == "BUY":
+                asset, amount = quote, qty * float(order["price"])
+            else:
+                asset, amount = base, qty
+            self._balance(asset)["locked"] -= amount
+            self._balance(asset)["free"] += amount
+            order["status"] = "CANCELED"
+            order["updateTime"] = int(time.time() * 1000)
+            return {**{k: v for k, v in order.items() if k not in ("time", "updateTime")},
+                    "origClientOrderId": order["clientOrderId"]}
+
+    def cancel_open_orders(self, params):
+        with self.lock:
+            open_ids = [o["orderId"] for o in self.open_orders(params.get("symbol"))]
+            if not open_ids:
+                raise MockAPIError(400, -2011, "Unknown order sent.")
+            return [self.cancel_order({"symbol": params["symbol"], "orderId": oid}) for oid in open_ids]
+
+    def open_orders(self, symbol=None):
+        with self.lock:
+            return [dict(o) for o in self.orders.values()
+                    if o["status"] == "NEW" and (symbol is None or o["symbol"] == symbol)]
+
+    def account(self):
+        with self.lock:
+            return {
+                "makerCommission": 10,
+                "takerCommission": 10,
+                "canTrade": True,
+                "canWithdraw": True,
+                "canDeposit": True,
+                "updateTime": int(time.time() * 1000),
+                "accountType": "SPOT",
+                "balances": [{"asset": a, "free": f"{b['free']:.8f}", "locked": f"{b['locked']:.8f}"}
+                             for a, b in sorted(self.balances.items())],
+                "permissions": ["SPOT"],
+            }
+
+
+    # ---------------- User data stream ----------------
+    def create_listen_key(self):
+        with self.lock:
+            key = next(iter(self.listen_keys), None) or secrets.token_hex(32)
+            self.listen_keys[key] = time.time() + 3600
+            return {"listenKey": key}
+
+    def keepalive_listen_key(self, params):
+        with self.lock:
+            key = params.get("listenKey")
+            if self.listen_keys.get(key, 0) < time.time():
+                self.listen_keys.pop(key, None)
+                raise MockAPIError(400, -1125, "This listenKey does not exist.")
+            self.listen_keys[key] = time.time() + 3600
+            return {}
+
+    def close_listen_key(self, params):
+        with self.lock:
+            if self.listen_keys.pop(params.get("listenKey"), None) is None:
+                raise MockAPIError(400, -1125, "This listenKey does not exist.")
+            return {}
+
+
+class MockBinanceServer(ThreadingHTTPServer):
+    """
+    HTTP front end for MockExchange.
+    latency_ms/jitter_ms delay every response; error_rate is the probability
+    of answering with a 503 instead of processing the request.
+    clock_offset_ms skews the server clock (serverTime and recvWindow checks)
+    relative to the local one.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, host="127.0.0.1", port=8765, api_key=None, api_secret=None, exchange=None,
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, prefix="/api", clock_offset_ms=0):
+        self.reset(exchange)
+        self.api_key = api_key if api_key is not None else BINANCE_API_KEY
+        self.api_secret = api_secret if api_secret is not None else BINANCE_API_SECRET
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.clock_offset_ms = clock_offset_ms
+        self.prefix = prefix.rstrip("/")
+        super().__init__((host, port), _Handler)
+
+    def reset(self, exchange=None):
+        """Serve a fresh (or the given) MockExchange from now on, e.g. between tests."""
+        self.exchange = exchange or MockExchange()
+        self.routes = _route_table(self.exchange)
+        self.routes[("GET", "/v3/time")] = (lambda p: {"serverTime": self.server_time()}, lambda p: 1, False, False)
+        return self.exchange
+
+    def server_time(self):
+        return int(time.time() * 1000) + int(self.clock_offset_ms)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def start(self):
+        """Serve in a background thread (for tests/benchmarks); returns the thread."""
+        thread = threading.Thread(target=self.serve_forever, name="mock-binance", daemon=True)
+        thread.start()
+        return thread
+
+
+def _route_table(ex):
+    """
+    (method, path) -> (handler(params), weight(params), signed, counts_as_order)
+    `signed` is True for HMAC-signed endpoints and "KEY" for API-key-only ones.
+    """
+    return {
+        ("GET", "/v3/ping"): (lambda p: {}, lambda p: 1, False, False),
+        ("GET", "/v3/exchangeInfo"): (
+            lambda p: ex.exchange_info([p["symbol"]] if "symbol" in p else json.loads(p["symbols"]) if "symbols" in p else None),
+            lambda p: 20, False, False),
+        ("GET", "/v3/ticker/price"): (lambda p: ex.ticker_price(p.get("symbol")),
+                                      lambda p: 2 if "symbol" in p else 4, False, False),
+        ("GET", "/v3/depth"): (lambda p: ex.depth(p["symbol"], p.get("limit", 100)),
+                               lambda p: request_weight("GET", "/v3/depth", p), False, False),
+        ("POST", "/v3/order"): (ex.create_order, lambda p: 1, True, True),
+        ("GET", "/v3/order"): (ex.get_order, lambda p: 4, True, False),
+        ("DELETE", "/v3/order"): (ex.cancel_order, lambda p: 1, True, False),
+        ("GET", "/v3/openOrders"): (lambda p: ex.open_orders(p.get("symbol")),
+                                    lambda p: 6 if "symbol" in p else 80, True, False),
+        ("DELETE", "/v3/openOrders"): (ex.cancel_open_orders, lambda p: 1, True, False),
+        ("GET", "/v3/account"): (lambda p: ex.account(), lambda p: 20, True, False),
+        ("POST", "/v3/userDataStream"): (lambda p: ex.create_listen_key(), lambda p: 2, "KEY", False),
+        ("PUT", "/v3/userDataStream"): (ex.keepalive_listen_key, lambda p: 2, "KEY", False),
+        ("DELETE", "/v3/userDataStream"): (ex.close_listen_key, lambda p: 2, "KEY", False),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MockBinance/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client timed out and hung up
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _check_api_key(self):
+        server = self.server
+        if self.headers.get("X-MBX-APIKEY") != server.api_key or not server.api_key:
+            raise MockAPIError(401, -2015, "Invalid API-key, IP, or permissions for action.")
+
+    def _check_signature(self, raw):
+        server = self.server
+        self._check_api_key()
+        payload, sep, signature = raw.rpartition("&signature=")
+        if not sep:
+            raise MockAPIError(400, -1102, "Mandatory parameter 'signature' was not sent, was empty/null, or malformed.")
+        expected = hmac.new((server.api_secret or "").encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature):
+            raise MockAPIError(400, -1022, "Signature for this request is not valid.")
+
+        params = dict(parse_qsl(payload))
+        try:
+            ts = int(params["timestamp"])
+        except (KeyError, ValueError):
+            raise MockAPIError(400, -1102, "Mandatory parameter 'timestamp' was not sent, was empty/null, or malformed.")
+        recv_window = int(params.get("recvWindow", 5000))
+        now = server.server_time()
+        if ts > now + 1000 or now - ts > recv_window:
+            raise MockAPIError(400, -1021, "Timestamp for this request is outside of the recvWindow.")
+
+    def _dispatch(self, method):
+        server = self.server
+        delay = server.latency_ms + (random.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+        parts = urlsplit(self.path)
+        raw = parts.query
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode()
+            raw = f"{raw}&{body}" if raw else body
+
+        path = parts.path
+        if server.prefix and path.startswith(server.prefix):
+            path = path[len(server.prefix):]
+
+        try:
+            route = server.routes.get((method, path))
+            if route is None:
+                raise MockAPIError(404, -1100, f"Unknown endpoint {method} {path}")
+            handler, weight, signed, is_order = route
+            params = dict(parse_qsl(raw))
+            headers = server.exchange.charge(weight(params), is_order)
+
+            if server.error_rate and random.random() < server.error_rate:
+                raise MockAPIError(503, -1001, "Internal error; unable to process your request. Please try again.", headers)
+            if signed == "KEY":
+                self._check_api_key()
+            elif signed:
+                self._check_signature(raw)
+                params.pop("signature", None)
+            self._send(200, handler(params), headers)
+        except MockAPIError as e:
+            self._send(e.status, {"code": e.code, "msg": e.msg}, e.headers)
+        except Exception as e:
+            self._send(500, {"code": -1000, "msg": f"An unknown error occurred while processing the request. ({e})"})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock Binance Spot REST server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Extra uniform random delay, 0..jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of answering with a 503")
+    parser.add_argument("--clock-offset-ms", type=int, default=0, help="Skew the server clock by this many ms")
+    args = parser.parse_args()
+
+    server = MockBinanceServer(args.host, args.port, latency_ms=args.latency_ms,
+                               jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                               clock_offset_ms=args.clock_offset_ms)
+    print(f"Mock Binance listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
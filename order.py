@@ -1,10 +1,32 @@
 # order.py
-from src.binance import BinanceClient   # make sure correct import path
-from src.validation import validate            # ensure validate handles qty & price
-from src.logger_config import logger
+import time
+import asyncio
+import aiohttp
+from binance import BinanceClient, new_client_order_id
+from async_binance import AsyncBinanceClient, error_code
+from validation import validate, validate_batch  # ensure validate handles qty & price
+from order_manager import OrderManager
+from resilience import CircuitBreaker
+from logger_config import logger
 
 # Initialize Binance client
 client = BinanceClient()
+# Every order placed here is tracked; the user data stream keeps it current
+manager = OrderManager(client)
+# The panic path must reach the exchange even while the shared breaker is open
+# or half-open (exactly when a panic is likely), so it uses one that never opens
+PANIC_BREAKER = CircuitBreaker(failure_threshold=float("inf"))
+
+
+def _live_context(symbol):
+    """
+    Reference price and open-order count for the PERCENT_PRICE/NOTIONAL and
+    MAX_NUM_ORDERS checks, from the streamed caches only (None if not running).
+    """
+    ref_price = client.price_cache.price(symbol, max_age=60)
+    state = client.live_account_state()
+    open_orders = len(state.open_orders(symbol)) if state is not None else None
+    return ref_price, open_orders
 
 def place_market(symbol: str, side: str, qty: float):
     """
@@ -15,7 +37,8 @@ def place_market(symbol: str, side: str, qty: float):
     """
     try:
         # Adjust quantity according to exchange rules
-        qty_adj = validate(symbol, qty)
+        ref_price, open_orders = _live_context(symbol)
+        qty_adj = validate(symbol, qty, side=side, ref_price=ref_price, open_orders=open_orders)
 
         # Create market order
         resp = client.create_order(
@@ -25,6 +48,7 @@ def place_market(symbol: str, side: str, qty: float):
             quantity=qty_adj
         )
 
+        manager.track(resp)
         logger.info(f"✅ Spot Market Order placed: {resp}")
         return resp
 
@@ -44,7 +68,8 @@ def place_limit(symbol: str, side: str, qty: float, price: float, tif: str = "GT
     """
     try:
         # Adjust both quantity and price for precision
-        qty_adj, price_adj = validate(symbol, qty, price)
+        ref_price, open_orders = _live_context(symbol)
+        qty_adj, price_adj = validate(symbol, qty, price, side=side, ref_price=ref_price, open_orders=open_orders)
 
         # Create limit order
         resp = client.create_order(
@@ -56,9 +81,225 @@ def place_limit(symbol: str, side: str, qty: float, price: float, tif: str = "GT
             timeInForce=tif
         )
 
+        manager.track(resp)
         logger.info(f"✅ Spot Limit Order placed: {resp}")
         return resp
 
     except Exception as e:
         logger.error(f"❌ Error placing limit order: {e}")
         return {"error": str(e)}
+
+
+def _spec_error(o):
+    """Why an order spec passed to place_batch is malformed, or None."""
+    if not isinstance(o, dict):
+        return "order spec must be a dict"
+    missing = [k for k in ("symbol", "side", "qty") if o.get(k) is None]
+    if missing:
+        return f"order spec missing {', '.join(missing)}"
+    if str(o["side"]).upper() not in ("BUY", "SELL"):
+        return f"side must be BUY or SELL, not {o['side']!r}"
+    for key in ("qty", "price"):
+        try:
+            if o.get(key) is not None:
+                float(o[key])
+        except (TypeError, ValueError):
+            return f"{key} is not a number: {o[key]!r}"
+    return None
+
+
+def _prefetch(symbols):
+    """
+    Load exchange info for `symbols` in one request, or one request per
+    symbol if that fails (a single unknown symbol fails the combined one).
+    Returns {symbol: error} for the symbols that could not be loaded.
+    """
+    try:
+        client.exchange_info.prefetch(symbols)
+        return {}
+    except Exception:
+        failed = {}
+        for symbol in symbols:
+            try:
+                client.exchange_info.prefetch([symbol])
+            except Exception as e:
+                failed[symbol] = f"{symbol}: no exchange info: {e}"
+        return failed
+
+
+async def place_batch_async(orders, max_concurrency=20, breaker=None):
+    """
+    Async core of place_batch(); use it directly from inside an event loop.
+    `breaker` overrides the shared circuit breaker for the sends.
+    """
+    if not orders:
+        return []
+    results = [None] * len(orders)
+    client_ids = [(o.get("clientOrderId") if isinstance(o, dict) else None) or new_client_order_id() for o in orders]
+    for i, o in enumerate(orders):
+        error = _spec_error(o)
+        if error:
+            results[i] = {"error": error, "clientOrderId": client_ids[i]}
+
+    # One exchangeInfo request for every symbol not cached yet, off the event loop
+    unknown = await asyncio.to_thread(_prefetch, sorted({o["symbol"] for o, r in zip(orders, results) if r is None}))
+    for i, o in enumerate(orders):
+        if results[i] is None and o["symbol"] in unknown:
+            results[i] = {"error": unknown[o["symbol"]], "clientOrderId": client_ids[i]}
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    symbols = [orders[i]["symbol"] for i in pending]
+    prices = [float(orders[i]["price"]) if orders[i].get("price") is not None else float("nan") for i in pending]
+    ref_prices = [_live_context(s)[0] for s in symbols]
+    state = client.live_account_state()
+    open_orders = {s: len(state.open_orders(s)) for s in set(symbols)} if state is not None else None
+
+    # Validate everything before sending anything
+    checked = await asyncio.to_thread(
+        validate_batch,
+        symbols, [float(orders[i]["qty"]) for i in pending], prices,
+        sides=[str(orders[i]["side"]).upper() for i in pending],
+        ref_prices=[r if r is not None else float("nan") for r in ref_prices],
+        open_orders=open_orders,
+    ) if pending else None
+
+    to_send = []
+    for j, i in enumerate(pending):
+        o, client_id = orders[i], client_ids[i]
+        if checked["rejected"][j]:
+            results[i] = {"error": checked["reason"][j], "clientOrderId": client_id}
+            continue
+        params = {
+            "symbol": o["symbol"],
+            "side": str(o["side"]).upper(),
+            "quantity": checked["qty_str"][j],
+            "newClientOrderId": client_id,
+        }
+        if checked["price_str"][j] is None:
+            params["type"] = "MARKET"
+        else:
+            params.update(type="LIMIT", price=checked["price_str"][j], timeInForce=o.get("tif", "GTC"))
+        to_send.append((i, params))
+
+    if not to_send:
+        return results
+    # One pooled session; the shared rate limiter spaces sends to the order-count budget
+    async with AsyncBinanceClient(max_connections=max_concurrency, breaker=breaker) as aclient:
+        async def send(i, params):
+            try:
+                results[i] = await aclient.create_order(**params)
+                manager.track(results[i])
+            except aiohttp.ClientResponseError as e:
+                results[i] = {"error": e.message, "clientOrderId": params["newClientOrderId"]}
+            except Exception as e:
+                results[i] = {"error": str(e), "clientOrderId": params["newClientOrderId"]}
+        await asyncio.gather(*(send(i, params) for i, params in to_send))
+    return results
+
+
+def place_batch(orders, max_concurrency=20):
+    """
+    Validate and place many orders concurrently.
+    :param orders: list of dicts with "symbol", "side", "qty" and, for limit
+        orders, "price" (optional "tif", "clientOrderId"); no price means MARKET
+    :param max_concurrency: maximum orders in flight at once
+    :return: one result per order, in submission order: the exchange response,
+        or {"error": ..., "clientOrderId": ...} for malformed specs, unknown
+        symbols and orders rejected by validation or by the exchange
+    """
+    t0 = time.perf_counter()
+    results = asyncio.run(place_batch_async(orders, max_concurrency))
+    failed = sum(1 for r in results if "error" in r)
+    logger.info(f"✅ Batch of {len(orders)} orders placed in {time.perf_counter() - t0:.2f}s ({failed} failed)")
+    return results
+
+
+async def flatten_all_async(quote_asset="USDT", max_concurrency=20):
+    """
+    Async core of flatten_all(); use it directly from inside an event loop.
+    """
+    t0 = time.perf_counter()
+    report = {"symbols": [], "cancelled": 0, "cancel_errors": {}, "closes": [], "errors": [], "seconds": 0.0}
+
+    def failed(what, e):
+        message = e.message if isinstance(e, aiohttp.ClientResponseError) else str(e)
+        report["errors"].append(f"{what}: {message}")
+        logger.error(f"❌ Flatten: {what} failed: {message}")
+
+    async with AsyncBinanceClient(max_connections=max_concurrency, breaker=PANIC_BREAKER) as aclient:
+        # One account-wide call finds the only symbols worth a cancel-all
+        try:
+            report["symbols"] = sorted({o["symbol"] for o in await aclient.get_open_orders()})
+        except Exception as e:
+            failed("open orders", e)
+            state = client.live_account_state()
+            known = manager.open_orders() + (state.open_orders() if state is not None else [])
+            report["symbols"] = sorted({o["symbol"] for o in known})
+
+        async def cancel(symbol):
+            try:
+                for cancelled in await aclient.cancel_open_orders(symbol):
+                    manager.track(cancelled)
+                    report["cancelled"] += 1
+            except aiohttp.ClientResponseError as e:
+                if error_code(e) != -2011:      # -2011: already nothing open (e.g. filled meanwhile)
+                    report["cancel_errors"][symbol] = e.message
+            except Exception as e:
+                report["cancel_errors"][symbol] = str(e)
+        await asyncio.gather(*(cancel(s) for s in report["symbols"]))
+
+        # Balances after the cancels (funds they held are free again) and every price, concurrently
+        account, tickers = await asyncio.gather(aclient.get_account_balance(), aclient.get_all_ticker_prices(),
+                                                return_exceptions=True)
+        if isinstance(account, BaseException):
+            failed("account balances", account)
+            state = client.live_account_state()
+            account = {"balances": state.balance_list() if state is not None else []}
+        if isinstance(tickers, BaseException):
+            failed("ticker prices", tickers)
+            tickers = [{"symbol": s, "price": p} for s, p in client.price_cache.prices(max_age=60).items()]
+
+        prices = {t["symbol"]: t["price"] for t in tickers}
+        closes = []
+        for b in account["balances"]:
+            symbol = b["asset"] + quote_asset
+            if b["asset"] != quote_asset and float(b["free"]) > 0 and symbol in prices:
+                # Seeds the reference price, so dust below minNotional is rejected locally
+                client.price_cache.set_price(symbol, prices[symbol])
+                closes.append({"symbol": symbol, "side": "SELL", "qty": float(b["free"])})
+
+        # Filters for the closes through this client too, so validation needs no other request
+        if closes:
+            try:
+                client.exchange_info.load(await aclient.get_exchange_info(symbols=sorted({o["symbol"] for o in closes})))
+            except Exception as e:
+                failed("exchange info", e)
+
+    try:
+        results = await place_batch_async(closes, max_concurrency, breaker=PANIC_BREAKER)
+    except Exception as e:
+        failed("closing positions", e)
+        results = [{"error": str(e)} for _ in closes]
+    report["closes"] = list(zip(closes, results))
+    report["seconds"] = time.perf_counter() - t0
+    return report
+
+
+def flatten_all(quote_asset="USDT", max_concurrency=20):
+    """
+    Cancel every open order and sell every balance into `quote_asset`,
+    without prompting. Open orders are fetched once, so cancel-all requests
+    go only to symbols that have some; cancels, then market closes, run
+    concurrently.
+    :return: {"symbols": symbols that had open orders, "cancelled": count,
+        "cancel_errors": {symbol: message}, "closes": [(order, result)],
+        "errors": failed reads that were worked around, "seconds": total
+        wall-clock time}
+    """
+    report = asyncio.run(flatten_all_async(quote_asset, max_concurrency))
+    failed = sum(1 for _, r in report["closes"] if "error" in r)
+    logger.warning(
+        f"Flattened: {report['cancelled']} orders cancelled on {len(report['symbols'])} symbols, "
+        f"{len(report['closes'])} positions closed ({failed} failed) in {report['seconds']:.2f}s"
+    )
+    return report
@@ -0,0 +1,227 @@
+# src/order_book.py
+"""
+Local order-book replicas kept in sync from Binance's diff-depth stream.
+
+OrderBook stores each side in a SortedDict of price -> qty (bids keyed
+descending), so level updates are O(log n) and the best bid/ask is the
+first item. OrderBookSync follows Binance's documented procedure:
+
+1. subscribe to <symbol>@depth@100ms and buffer events,
+2. fetch a REST /v3/depth snapshot (refetching it while it is too old to
+   bridge to the first buffered event),
+3. drop buffered events with u <= lastUpdateId and apply the rest,
+4. from then on every event must start no later than the previous
+   event's u + 1; a gap throws the book away and goes back to step 2.
+
+    sync = OrderBookSync("BTCUSDT", client).start()
+    sync.best_bid(), sync.vwap("BUY", 0.5)
+"""
+import time
+import threading
+from itertools import islice
+from operator import neg
+
+from sortedcontainers import SortedDict
+
+from logger_config import logger
+from market_stream import shared_stream
+
+SNAPSHOT_LIMIT = 1000
+
+
+class OrderBook:
+    """One symbol's price levels. Not thread-safe on its own; OrderBookSync holds the lock."""
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bids = SortedDict(neg)     # highest price first
+        self.asks = SortedDict()        # lowest price first
+        self.last_update_id = 0
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.last_update_id = 0
+
+    @staticmethod
+    def _apply_levels(side, levels):
+        for price, qty in levels:
+            price, qty = float(price), float(qty)
+            if qty == 0:
+                side.pop(price, None)
+            else:
+                side[price] = qty
+
+    def load_snapshot(self, snapshot):
+        self.clear()
+        self._apply_levels(self.bids, snapshot["bids"])
+        self._apply_levels(self.asks, snapshot["asks"])
+        self.last_update_id = snapshot["lastUpdateId"]
+
+    def apply_diff(self, event):
+        self._apply_levels(self.bids, event["b"])
+        self._apply_levels(self.asks, event["a"])
+        self.last_update_id = event["u"]
+
+    # ---------------- Queries ----------------
+    def best_bid(self):
+        """(price, qty) of the best bid, or None."""
+        return self.bids.peekitem(0) if self.bids else None
+
+    def best_ask(self):
+        return self.asks.peekitem(0) if self.asks else None
+
+    def mid(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def spread(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def top(self, n=10):
+        """Best `n` levels per side as {"bids": [(price, qty)...], "asks": [...]}."""
+        return {
+            "bids": list(islice(self.bids.items(), n)),
+            "asks": list(islice(self.asks.items(), n)),
+        }
+
+    def vwap(self, side, qty):
+        """
+        Average price to fill `qty` by walking the book (BUY takes asks,
+        SELL takes bids). Returns None if the visible depth is too thin.
+        """
+        qty = float(qty)
+        if not qty > 0:
+            raise ValueError(f"vwap quantity must be positive, got {qty}")
+        levels = self.asks if side.upper() == "BUY" else self.bids
+        remaining, cost = qty, 0.0
+        for price, level_qty in levels.items():
+            take = min(remaining, level_qty)
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                return cost / qty
+        return None
+
+
+class OrderBookSync:
+    """
+    Keeps an OrderBook in step with the diff-depth stream.
+    `client` needs get_order_book(symbol, limit); `stream` is a
+    MarketDataStream (the shared one by default).
+    """
+    def __init__(self, symbol, client, stream=None, limit=SNAPSHOT_LIMIT, speed="100ms", retry_wait=0.5):
+        self.symbol = symbol.upper()
+        self.client = client
+        self.stream = stream
+        self.limit = limit
+        self.retry_wait = retry_wait
+        self.stream_name = f"{self.symbol.lower()}@depth@{speed}" if speed else f"{self.symbol.lower()}@depth"
+        self.book = OrderBook(self.symbol)
+        self.synced = threading.Event()
+        self.lock = threading.Lock()
+        self._buffer = []
+        self._prev_u = None
+        self._loading = False
+        self._stopped = False
+
+    def start(self):
+        self._stopped = False
+        if self.stream is None:
+            self.stream = shared_stream()
+        self.stream.subscribe(self.stream_name, self.on_event)
+        self._resync()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        self.stream.unsubscribe([self.stream_name])
+        self.synced.clear()
+
+    def on_event(self, event):
+        """depthUpdate handler: buffer while syncing, otherwise apply in sequence."""
+        with self.lock:
+            if not self.synced.is_set():
+                self._buffer.append(event)
+                return
+            if event["u"] <= self._prev_u:
+                return
+            if event["U"] > self._prev_u + 1:
+                logger.warning(f"{self.symbol} depth gap ({self._prev_u} -> {event['U']}); resyncing")
+                self._buffer = [event]
+                self._start_resync_locked()
+                return
+            self.book.apply_diff(event)
+            self._prev_u = event["u"]
+
+    def _resync(self):
+        with self.lock:
+            self._start_resync_locked()
+
+    def _start_resync_locked(self):
+        self.synced.clear()
+        self._prev_u = None
+        if not self._loading:
+            self._loading = True
+            # Off the stream thread so events keep getting buffered meanwhile
+            threading.Thread(target=self._load_snapshot, name=f"depth-{self.symbol}", daemon=True).start()
+
+    def _load_snapshot(self):
+        failures = 0
+        while not self._stopped:
+            try:
+                snapshot = self.client.get_order_book(self.symbol, limit=self.limit)
+            except Exception as e:
+                failures += 1
+                logger.error(f"{self.symbol} depth snapshot failed: {e}")
+                time.sleep(min(30.0, 2 ** failures))
+                continue
+            with self.lock:
+                if self._apply_snapshot_locked(snapshot):
+                    self._loading = False
+                    self.synced.set()
+                    return
+            # Snapshot older than the buffered events: give the REST side time to catch up
+            time.sleep(self.retry_wait)
+        with self.lock:
+            self._loading = False
+
+    def _apply_snapshot_locked(self, snapshot):
+        """Load `snapshot` and replay the buffer onto it; False if it is too old to bridge the buffer."""
+        last_id = snapshot["lastUpdateId"]
+        pending = [e for e in self._buffer if e["u"] > last_id]
+        # The first event applied must start at or before lastUpdateId + 1
+        if pending and pending[0]["U"] > last_id + 1:
+            return False
+        self.book.load_snapshot(snapshot)
+        self._prev_u = last_id
+        for i, event in enumerate(pending):
+            if event["U"] > self._prev_u + 1:
+                # Gap inside the buffer: keep what follows it and refetch
+                self._buffer = pending[i:]
+                return False
+            self.book.apply_diff(event)
+            self._prev_u = event["u"]
+        self._buffer = []
+        return True
+
+    # ---------------- Locked reads ----------------
+    def best_bid(self):
+        with self.lock:
+            return self.book.best_bid() if self.synced.is_set() else None
+
+    def best_ask(self):
+        with self.lock:
+            return self.book.best_ask() if self.synced.is_set() else None
+
+    def top(self, n=10):
+        with self.lock:
+            return self.book.top(n) if self.synced.is_set() else None
+
+    def vwap(self, side, qty):
+        with self.lock:
+            return self.book.vwap(side, qty) if self.synced.is_set() else None
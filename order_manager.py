@@ -0,0 +1,157 @@
+# src/order_manager.py
+"""
+In-memory index of the orders this process knows about.
+
+Every order is held once (REST /v3/order shape) and indexed by orderId,
+clientOrderId and, while it is open, by symbol, so "what's open on X" is a
+dict lookup. Updates come from order placement responses, the user data
+stream (via AccountState listeners) and reconcile(), which makes one
+/v3/openOrders call per symbol. The first query reconciles against a
+single account-wide /v3/openOrders call, so orders left open by an
+earlier run are known. Status changes are checked against the order
+lifecycle and recorded per order.
+"""
+import time
+import threading
+
+from logger_config import logger
+from user_stream import DEFAULT_ACCOUNT_STATE, FINAL_STATUSES
+
+# Allowed status changes; final statuses allow none
+TRANSITIONS = {
+    "NEW": {"PARTIALLY_FILLED", "FILLED", "CANCELED", "PENDING_CANCEL", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH"},
+    "PARTIALLY_FILLED": {"PARTIALLY_FILLED", "FILLED", "CANCELED", "PENDING_CANCEL", "EXPIRED", "EXPIRED_IN_MATCH"},
+    "PENDING_CANCEL": {"CANCELED", "FILLED", "PARTIALLY_FILLED"},
+    "PENDING_NEW": {"NEW", "PARTIALLY_FILLED", "FILLED", "REJECTED", "EXPIRED"},
+}
+
+
+class OrderManager:
+    def __init__(self, client, account_state=DEFAULT_ACCOUNT_STATE):
+        self.client = client
+        self.lock = threading.RLock()
+        self.by_id = {}                 # orderId -> order
+        self.by_client_id = {}          # clientOrderId -> order
+        self.open_by_symbol = {}        # symbol -> {orderId: order}, open orders only
+        self.history = {}               # orderId -> [(status, updateTime)]
+        self._reconciled = False        # startup reconcile done
+        self._startup_lock = threading.Lock()
+        if account_state is not None:
+            account_state.listeners.append(self.apply)
+
+    # ---------------- Updates ----------------
+    def track(self, response):
+        """Record an order from a create_order/get_order response; error results are ignored."""
+        if not isinstance(response, dict) or "orderId" not in response:
+            return None
+        order = dict(response)
+        order.setdefault("updateTime", order.get("transactTime", int(time.time() * 1000)))
+        return self.apply(order)
+
+    def apply(self, order):
+        """Merge an order update (REST shape), enforcing the lifecycle; returns the stored order."""
+        with self.lock:
+            order_id = order["orderId"]
+            current = self.by_id.get(order_id)
+            if current is not None:
+                if order.get("updateTime", 0) < current.get("updateTime", 0):
+                    return current
+                old, new = current["status"], order["status"]
+                if old != new and new not in TRANSITIONS.get(old, ()):
+                    logger.warning(f"Ignoring order {order_id} status change {old} -> {new}")
+                    return current
+                current.update(order)
+                order = current
+            else:
+                self.by_id[order_id] = order
+
+            self.by_client_id[order["clientOrderId"]] = order
+            entries = self.history.setdefault(order_id, [])
+            if not entries or entries[-1][0] != order["status"]:
+                entries.append((order["status"], order.get("updateTime")))
+
+            symbol_open = self.open_by_symbol.setdefault(order["symbol"], {})
+            if order["status"] in FINAL_STATUSES:
+                symbol_open.pop(order_id, None)
+            else:
+                symbol_open[order_id] = order
+            return order
+
+    def reconcile(self, symbols=None):
+        """
+        Sync with the exchange: one /v3/openOrders call per symbol (default:
+        every symbol with orders we believe are open, or a single
+        account-wide call on the first reconcile or if there are none).
+        Orders we had as open but the exchange no longer lists are looked up
+        for their final status.
+        """
+        if symbols is None:
+            symbols = self._open_symbols()
+            if not symbols or not self._reconciled:
+                self._reconcile_all()
+                return
+        for symbol in symbols:
+            self._reconcile_symbol(symbol, self.client.get_open_orders(symbol))
+
+    def _reconcile_all(self):
+        """One account-wide call; also finds orders on symbols we know nothing about."""
+        listed = {}
+        for order in self.client.get_open_orders():
+            listed.setdefault(order["symbol"], []).append(order)
+        for symbol in set(self._open_symbols()) | set(listed):
+            self._reconcile_symbol(symbol, listed.get(symbol, []))
+        self._reconciled = True
+
+    def _ensure_reconciled(self):
+        if self._reconciled:
+            return
+        with self._startup_lock:
+            if self._reconciled:
+                return
+            try:
+                self._reconcile_all()
+            except Exception as e:
+                # Serve what we know; the next query tries again
+                logger.warning(f"Startup order reconcile failed: {e}")
+
+    def _reconcile_symbol(self, symbol, listed):
+        for order in listed:
+            self.apply(order)
+        listed_ids = {o["orderId"] for o in listed}
+        with self.lock:
+            gone = [oid for oid in self.open_by_symbol.get(symbol, {}) if oid not in listed_ids]
+        for order_id in gone:
+            try:
+                self.apply(self.client.get_order(symbol, order_id))
+            except Exception as e:
+                logger.warning(f"Could not resolve order {order_id} on {symbol}: {e}")
+                with self.lock:
+                    self.open_by_symbol[symbol].pop(order_id, None)
+
+    # ---------------- Reads ----------------
+    def get(self, order_id=None, client_order_id=None):
+        with self.lock:
+            if order_id is not None:
+                return self.by_id.get(order_id)
+            return self.by_client_id.get(client_order_id)
+
+    def open_orders(self, symbol=None):
+        """Open orders on `symbol` (or everywhere); only the first query touches the API."""
+        self._ensure_reconciled()
+        with self.lock:
+            if symbol is not None:
+                return list(self.open_by_symbol.get(symbol, {}).values())
+            return [o for orders in self.open_by_symbol.values() for o in orders.values()]
+
+    def has_open(self, symbol):
+        self._ensure_reconciled()
+        with self.lock:
+            return bool(self.open_by_symbol.get(symbol))
+
+    def open_symbols(self):
+        self._ensure_reconciled()
+        return self._open_symbols()
+
+    def _open_symbols(self):
+        with self.lock:
+            return [s for s, orders in self.open_by_symbol.items() if orders]
@@ -1,22 +1,83 @@
 from decimal import Decimal
+import numpy as np
 from rich.table import Table
 from rich import box
 
-from src.binance import BinanceClient
-from src.logger_config import logger
+from binance import BinanceClient, PRICE_MAX_AGE
+from conversion import ConversionGraph, ConversionPlan
+from logger_config import logger
 
 class PortfolioManager:
     """
     Handles fetching and displaying Spot portfolio balances.
     Supports free/locked balances, USDT balance, total value, and positions for dashboard.
+
+    Holdings are parallel arrays (one entry per asset with a balance) and are
+    valued in `quote_asset` with one vectorized multiply. Assets without a
+    direct market against the quote are valued through intermediate pairs
+    (e.g. XRP -> BTC -> USDT) from a conversion graph of all trading symbols.
     """
-    def __init__(self):
+    def __init__(self, quote_asset="USDT"):
         self.client = BinanceClient()
-        self.balances = []
-        self.positions_data = []      # For dashboard and panic button
+        self.quote_asset = quote_asset
+        self.assets = []                        # asset names, same order as the arrays
+        self.free = np.zeros(0)
+        self.locked = np.zeros(0)
+        self.rates = np.zeros(0)                # value of one unit in quote_asset (0 if unpriced)
+        self.values = np.zeros(0)               # (free + locked) * rates
         self.total_unrealized_pnl = 0.0
         self.usdt_balance = 0.0       # For live dashboard
         self.is_data_loaded = False
+        self._graph = None
+        self._plans = {}                        # quote asset -> ConversionPlan for self.assets
+        self._positions = None                  # positions_data, built on demand
+
+    @property
+    def graph(self):
+        """Conversion graph over every trading symbol, built once from the cached exchange info."""
+        if self._graph is None:
+            self._graph = ConversionGraph(self.client.exchange_info.all_symbols())
+        return self._graph
+
+    def _plan(self, quote_asset):
+        plan = self._plans.get(quote_asset)
+        if plan is None or plan.assets != self.assets:
+            if not self.assets:
+                return ConversionPlan([], quote_asset, [])    # nothing held: no need for the graph
+            try:
+                graph = self.graph
+            except Exception as e:
+                # Not cached, so the graph is retried on the next refresh
+                logger.warning(f"Conversion graph unavailable, valuing direct {quote_asset} pairs only: {e}")
+                return ConversionPlan.direct(self.assets, quote_asset)
+            plan = self._plans[quote_asset] = graph.plan(self.assets, quote_asset)
+        return plan
+
+    def _fetch_prices(self, symbols):
+        """
+        Prices for `symbols`: from the streamed price cache when fresh,
+        otherwise all of them from one /v3/ticker/price request. Symbols
+        without a market are left out.
+        """
+        cache = self.client.price_cache
+        prices = {s: cache.price(s, PRICE_MAX_AGE) for s in symbols}
+        if any(p is None for p in prices.values()):
+            tickers = {t["symbol"]: t["price"] for t in self.client.get_all_ticker_prices()}
+            for s, p in prices.items():
+                if p is None and s in tickers:
+                    cache.set_price(s, tickers[s])
+                    prices[s] = float(tickers[s])
+        return {s: p for s, p in prices.items() if p is not None}
+
+    def price_symbols(self, quote_asset=None):
+        """Every symbol whose price the valuation in `quote_asset` depends on."""
+        return self._plan(quote_asset or self.quote_asset).symbols
+
+    def valuation(self, quote_asset=None):
+        """Per-asset values in `quote_asset` (default: the portfolio's), with one price fetch."""
+        plan = self._plan(quote_asset or self.quote_asset)
+        rates = np.nan_to_num(plan.rates(self._fetch_prices(plan.symbols)), nan=0.0, posinf=0.0, neginf=0.0)
+        return (self.free + self.locked) * rates
 
     def fetch_data(self):
         """
@@ -24,62 +85,83 @@ class PortfolioManager:
         """
         logger.info("Fetching Spot portfolio data...")
         try:
-            account_info = self.client.get_account_balance()
-            
-            # Ensure we get a list of balances
-            balances_list = account_info.get("balances", []) if isinstance(account_info, dict) else account_info
-
-            self.balances = [
-                {
-                    "asset": b["asset"],
-                    "free": float(b["free"]),
-                    "locked": float(b["locked"])
-                }
-                for b in balances_list if float(b["free"]) > 0 or float(b["locked"]) > 0
-            ]
-
-            self.positions_data = []
-            total_value = 0.0
-            usdt_balance = 0.0
-            for b in self.balances:
-                asset = b["asset"]
-                free = b["free"]
-                locked = b["locked"]
-                symbol = asset + "USDT" if asset != "USDT" else "USDT"
-
-                # Get current price in USDT
-                try:
-                    price_data = self.client.get_symbol_price(symbol)
-                    price = float(price_data['price']) if 'price' in price_data else 0.0
-                except Exception:
-                    price = 0.0
-
-                position_value = (free + locked) * price
-                total_value += position_value
-
-                if asset == "USDT":
-                    usdt_balance = free + locked
-
-                self.positions_data.append({
-                    "symbol": symbol,
-                    "free": free,
-                    "locked": locked,
-                    "current_price": price,
-                    "position_value": position_value,
-                    "positionAmt": free + locked  # Dummy field for spot
-                })
-
-            self.total_unrealized_pnl = total_value
-            self.usdt_balance = usdt_balance
+            # Live balances from the user data stream when it is running, else REST
+            live_state = self.client.live_account_state()
+            if live_state is not None:
+                balances_list = live_state.balance_list()
+            else:
+                account_info = self.client.get_account_balance()
+
+                # Ensure we get a list of balances
+                balances_list = account_info.get("balances", []) if isinstance(account_info, dict) else account_info
+
+            held = [b for b in balances_list if float(b["free"]) > 0 or float(b["locked"]) > 0]
+            assets = [b["asset"] for b in held]
+            free = np.array([float(b["free"]) for b in held])
+            locked = np.array([float(b["locked"]) for b in held])
+            same_assets = assets == self.assets
+            self.assets = assets
+
+            # Every price any route needs, in one go, then one product per route and one multiply
+            plan = self._plan(self.quote_asset)
+            rates = np.nan_to_num(plan.rates(self._fetch_prices(plan.symbols)), nan=0.0, posinf=0.0, neginf=0.0)
+
+            # Same holdings: only the dashboard rows whose balance or price moved are rebuilt
+            changed = None
+            if same_assets and self._positions is not None:
+                changed = np.flatnonzero((free != self.free) | (locked != self.locked) | (rates != self.rates))
+            else:
+                self._positions = None
+            self.free, self.locked, self.rates = free, locked, rates
+            self.values = (free + locked) * rates
+            if changed is not None:
+                for i in changed:
+                    self._positions[i] = self._position_row(plan, i)
+
+            self.total_unrealized_pnl = float(self.values.sum())
+            usdt = [i for i, a in enumerate(assets) if a == "USDT"]
+            self.usdt_balance = float(free[usdt[0]] + locked[usdt[0]]) if usdt else 0.0
             self.is_data_loaded = True
             logger.info("Spot portfolio data fetched successfully.")
         except Exception as e:
             logger.error(f"Failed to fetch Spot portfolio data: {e}")
             self.is_data_loaded = False
-            self.positions_data = []
+            self.assets = []
+            self.free = self.locked = self.rates = self.values = np.zeros(0)
+            self._positions = None
             self.total_unrealized_pnl = 0.0
             self.usdt_balance = 0.0
 
+    @property
+    def positions_data(self):
+        """Holdings as dicts, for the dashboard and callers that want rows."""
+        if self._positions is None:
+            plan = self._plan(self.quote_asset)
+            self._positions = [self._position_row(plan, i) for i in range(len(self.assets))]
+        return self._positions
+
+    def _position_row(self, plan, i):
+        asset, route = self.assets[i], plan.routes[i]
+        # Tradable symbol that sells this asset straight into the quote, if any
+        market = route[0][0] if route and len(route) == 1 and not route[0][1] else None
+        if market:
+            symbol = market
+        elif not route:
+            symbol = asset     # the quote itself, or no route
+        else:
+            symbol = " > ".join(s for s, _ in route)
+        amount = float(self.free[i] + self.locked[i])
+        return {
+            "asset": asset,
+            "symbol": symbol,          # display label: a symbol, a route or the asset
+            "market": market,
+            "free": float(self.free[i]),
+            "locked": float(self.locked[i]),
+            "current_price": float(self.rates[i]),
+            "position_value": float(self.values[i]),
+            "positionAmt": amount  # Dummy field for spot
+        }
+
     def display_positions(self):
         """
         Returns a Rich Table object to display Spot positions.
@@ -98,7 +180,7 @@ class PortfolioManager:
             expand=True
         )
 
-        headers = ["Symbol", "Free", "Locked", "Price (USDT)", "Value (USDT)"]
+        headers = ["Symbol", "Free", "Locked", f"Price ({self.quote_asset})", f"Value ({self.quote_asset})"]
         for header in headers:
             table.add_column(header, justify="right")
 
@@ -0,0 +1,167 @@
+# src/ratelimit.py
+"""
+Client-side rate limiting for the Binance REST API.
+
+Binance enforces a request-weight budget (per minute) and order-count
+budgets (per 10s and per day) per IP/account; going over them yields 429s
+and eventually 418 IP bans. RateLimiter keeps a token bucket for each
+budget, charges every call its endpoint weight before it is sent, and
+re-syncs from the X-MBX-USED-WEIGHT-* / X-MBX-ORDER-COUNT-* headers on each
+response. Calls reserve tokens up front and wait out any deficit, so a
+burst is spread out at the maximum safe rate instead of failing.
+"""
+import re
+import time
+import threading
+
+# Weight per (method, endpoint); tuples are (with symbol, without symbol)
+ENDPOINT_WEIGHTS = {
+    ("GET", "/v3/ping"): 1,
+    ("GET", "/v3/time"): 1,
+    ("GET", "/v3/exchangeInfo"): 20,
+    ("GET", "/v3/ticker/price"): (2, 4),
+    ("GET", "/v3/ticker/bookTicker"): (2, 4),
+    ("GET", "/v3/avgPrice"): 2,
+    ("POST", "/v3/order"): 1,
+    ("POST", "/v3/order/oco"): 1,
+    ("GET", "/v3/order"): 4,
+    ("DELETE", "/v3/order"): 1,
+    ("GET", "/v3/openOrders"): (6, 80),
+    ("DELETE", "/v3/openOrders"): 1,
+    ("GET", "/v3/allOrders"): 20,
+    ("GET", "/v3/myTrades"): 20,
+    ("GET", "/v3/account"): 20,
+    ("POST", "/v3/userDataStream"): 2,
+    ("PUT", "/v3/userDataStream"): 2,
+    ("DELETE", "/v3/userDataStream"): 2,
+}
+
+# Endpoints that also count against the ORDERS limits
+ORDER_ENDPOINTS = {("POST", "/v3/order"), ("POST", "/v3/order/oco")}
+
+_DEPTH_WEIGHTS = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+_INTERVAL_SECONDS = {"S": 1, "M": 60, "H": 3600, "D": 86400}
+_HEADER_RE = re.compile(r"^x-mbx-(used-weight|order-count)-(\d+)([smhd])$", re.IGNORECASE)
+
+
+def request_weight(method, endpoint, params=None):
+    """Request weight Binance charges for one call."""
+    params = params or {}
+    if endpoint == "/v3/depth":
+        limit = int(params.get("limit", 100))
+        return next((w for cap, w in _DEPTH_WEIGHTS if limit <= cap), 250)
+    weight = ENDPOINT_WEIGHTS.get((method, endpoint), 1)
+    if isinstance(weight, tuple):
+        return weight[0] if "symbol" in params else weight[1]
+    return weight
+
+
+def is_order_endpoint(method, endpoint):
+    return (method, endpoint) in ORDER_ENDPOINTS
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity / interval. Not thread-safe on its own."""
+    def __init__(self, capacity, interval):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / interval
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take `amount` tokens (possibly going negative); return seconds until they are covered."""
+        self._refill(now)
+        self.tokens -= amount
+        return max(0.0, -self.tokens / self.rate)
+
+    def sync(self, used, now):
+        """Align with the server's view: never assume more tokens than capacity - used."""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter over all of Binance's budgets.
+    `safety` scales the published limits down to leave headroom for other
+    processes on the same IP/account and for clock skew between windows.
+    """
+    def __init__(self, weight_per_minute=6000, orders_per_10s=100, orders_per_day=200000, safety=0.9):
+        self.safety = safety
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.weight_buckets = {"1M": TokenBucket(weight_per_minute * safety, 60)}
+        self.order_buckets = {
+            "10S": TokenBucket(orders_per_10s * safety, 10),
+            "1D": TokenBucket(orders_per_day * safety, 86400),
+        }
+
+    def configure(self, rate_limits):
+        """
+        Rebuild the buckets from exchangeInfo's `rateLimits` list. Buckets
+        whose limit is unchanged are kept, so re-applying the same limits
+        on every exchangeInfo refresh does not hand back spent tokens.
+        """
+        weight, orders = {}, {}
+        with self._lock:
+            for rl in rate_limits:
+                if rl["rateLimitType"] == "REQUEST_WEIGHT":
+                    target, current = weight, self.weight_buckets
+                elif rl["rateLimitType"] == "ORDERS":
+                    target, current = orders, self.order_buckets
+                else:
+                    continue
+                key = f"{rl['intervalNum']}{rl['interval'][0]}"
+                seconds = rl["intervalNum"] * _INTERVAL_SECONDS[rl["interval"][0]]
+                capacity = rl["limit"] * self.safety
+                bucket = current.get(key)
+                if bucket is None or bucket.capacity != capacity or bucket.rate != capacity / seconds:
+                    bucket = TokenBucket(capacity, seconds)
+                target[key] = bucket
+            self.weight_buckets = weight or self.weight_buckets
+            self.order_buckets = orders or self.order_buckets
+
+    def reserve(self, weight, orders=0):
+        """Reserve budget for one call; returns how long the caller must wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until - now)
+            for bucket in self.weight_buckets.values():
+                delay = max(delay, bucket.reserve(weight, now))
+            if orders:
+                for bucket in self.order_buckets.values():
+                    delay = max(delay, bucket.reserve(orders, now))
+            return delay
+
+    def acquire(self, weight, orders=0):
+        """Blocking reserve(): sleeps until the call may be sent."""
+        delay = self.reserve(weight, orders)
+        if delay > 0:
+            time.sleep(delay)
+
+    def update_from_headers(self, headers):
+        """Sync buckets with X-MBX-USED-WEIGHT-<n><u> / X-MBX-ORDER-COUNT-<n><u> response headers."""
+        now = time.monotonic()
+        with self._lock:
+            for name, value in headers.items():
+                m = _HEADER_RE.match(name)
+                if not m:
+                    continue
+                kind, key = m.group(1).lower(), f"{m.group(2)}{m.group(3).upper()}"
+                buckets = self.weight_buckets if kind == "used-weight" else self.order_buckets
+                bucket = buckets.get(key)
+                if bucket is not None:
+                    bucket.sync(float(value), now)
+
+    def pause(self, seconds):
+        """Hold every call for `seconds` (after a 429/418 with Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# Limits are per IP/account, so every client in the process shares one limiter
+DEFAULT_LIMITER = RateLimiter()
@@ -0,0 +1,103 @@
+# src/resilience.py
+"""
+Retry policy and circuit breaker for the Binance clients.
+
+RetryPolicy gives jittered exponential backoff delays for transient
+failures (timeouts, connection resets, 5xx). CircuitBreaker counts those
+failures across calls; after `failure_threshold` in a row it opens and
+every call fails fast with CircuitOpenError until `reset_timeout` has
+passed, then lets a single trial call through (half-open) to decide
+whether to close again. A trial that ends without an outcome (cancelled,
+interrupted, unexpected error) must be handed back with release(), which
+counts it as a failure, or the breaker would stay half-open for good.
+"""
+import time
+import random
+import threading
+
+# Methods that can be resent without side effects. New orders are made
+# idempotent separately via newClientOrderId.
+IDEMPOTENT_METHODS = {"GET", "PUT"}
+TRANSIENT_STATUS = {500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the exchange while the circuit is open."""
+
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, base_delay=0.25, max_delay=5.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_id = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if calls are currently blocked. Returns a
+        trial token when this call is the half-open trial, else None.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"Circuit open after {self.failures} consecutive failures; retrying in "
+                        f"{self.reset_timeout - (time.monotonic() - self.opened_at):.1f}s")
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise CircuitOpenError("Circuit half-open; trial request in flight")
+                self._trial_in_flight = True
+                self._trial_id += 1
+                return self._trial_id
+        return None
+
+    def release(self, trial):
+        """
+        End a call that recorded no outcome. If it was the half-open trial
+        (and nothing has decided the trial since), count it as a failure so
+        the circuit reopens instead of blocking every call from now on.
+        """
+        with self._lock:
+            if trial is None or not self._trial_in_flight or trial != self._trial_id:
+                return
+            self._trial_in_flight = False
+            self.failures += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+# One exchange, one health state: clients in the process share this breaker by default
+DEFAULT_BREAKER = CircuitBreaker()
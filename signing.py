@@ -0,0 +1,86 @@
+# src/signing.py
+"""
+Request signing and server-clock offset, shared by every client.
+
+The sync and async clients both sign with DEFAULT_SIGNER and share the
+offset it measured. The offset is kept fresh by a single background
+thread per signer, started by the first signed request (see
+BinanceClient.start_time_sync).
+"""
+import time
+import hmac
+import hashlib
+import threading
+
+from config import BINANCE_API_SECRET
+from logger_config import logger
+
+TIME_SYNC_INTERVAL = 300
+
+
+class RequestSigner:
+    """
+    Signing state shared by the clients: an HMAC-SHA256 object keyed once
+    with the API secret (each signature copies it instead of redoing the key
+    setup) and the local-to-server clock offset applied to timestamps.
+    """
+    def __init__(self, secret):
+        self._mac = hmac.new((secret or "").encode(), digestmod=hashlib.sha256)
+        self.offset_ms = 0
+        self.synced_at = None
+        self._sync_stop = None
+        self._sync_lock = threading.Lock()
+
+    def sign(self, query_string):
+        mac = self._mac.copy()
+        mac.update(query_string.encode())
+        return mac.hexdigest()
+
+    def timestamp(self):
+        """Current server time estimate in ms."""
+        return int(time.time() * 1000) + self.offset_ms
+
+    def update_offset(self, server_time_ms, sent_ms, received_ms):
+        # Assume the server stamped the response halfway through the round trip
+        self.offset_ms = int(server_time_ms - (sent_ms + received_ms) / 2)
+        self.synced_at = time.time()
+
+    # ---------------- Periodic sync ----------------
+    @property
+    def sync_started(self):
+        return self._sync_stop is not None
+
+    def start_sync(self, sync, interval=TIME_SYNC_INTERVAL):
+        """
+        Run `sync()` (which measures the offset and calls update_offset) now,
+        then every `interval` seconds in a daemon thread. Only the first call
+        per signer does anything; callers racing it wait for the first sync.
+        """
+        with self._sync_lock:
+            if self._sync_stop is not None:
+                return
+            self._sync_stop = stop = threading.Event()
+            self._sync_once(sync)
+
+        def loop():
+            while not stop.wait(interval):
+                self._sync_once(sync)
+
+        threading.Thread(target=loop, name="binance-time-sync", daemon=True).start()
+
+    def stop_sync(self):
+        with self._sync_lock:
+            if self._sync_stop is not None:
+                self._sync_stop.set()
+                self._sync_stop = None
+
+    @staticmethod
+    def _sync_once(sync):
+        try:
+            sync()
+        except Exception as e:
+            logger.warning(f"Server time sync failed: {e}")
+
+
+# One API secret, one clock: every client signs with this by default
+DEFAULT_SIGNER = RequestSigner(BINANCE_API_SECRET)
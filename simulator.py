@@ -0,0 +1,277 @@
+# src/simulator.py
+import heapq
+import itertools
+from collections import deque
+from decimal import Decimal
+
+import numpy as np
+
+from backnet import _to_ms, _format_ts
+
+
+def _dec(value):
+    """Exact Decimal for a float via its shortest repr (0.1 -> Decimal('0.1'))."""
+    return value if isinstance(value, Decimal) else Decimal(repr(float(value)))
+
+
+class SimOrder:
+    """A single order resting in (or passing through) the simulator."""
+    __slots__ = ("orderId", "symbol", "side", "type", "qty", "price",
+                 "status", "ts", "fill_price", "fill_ts")
+
+    def __init__(self, orderId, symbol, side, type, qty, price, ts):
+        self.orderId = orderId
+        self.symbol = symbol
+        self.side = side
+        self.type = type
+        self.qty = qty
+        self.price = price
+        self.status = "NEW"
+        self.ts = ts
+        self.fill_price = None
+        self.fill_ts = None
+
+
+class BacktestSimulator:
+    """
+    Streaming, event-driven backtest on top of a BacktestEngine tape.
+
+    The tape is consumed once, front to back. Resting limit orders live in a
+    max-heap of bids and a min-heap of asks; between fills the simulator jumps
+    straight to the next trade that crosses the best bid/ask with a vectorized
+    scan, so a full strategy run costs O(n) array work plus O(log k) per fill
+    instead of re-scanning the tape for every order.
+
+    Strategies drive it by submitting/cancelling orders and calling
+    advance_to(ts); fills, balances and PnL are available at any point.
+
+    Resting limit orders fill at their own limit price (no free price
+    improvement when a trade prints through them); market orders fill at
+    the trade price. Balances are settled in Decimal, so lock/unlock and
+    fills never leave float residue behind.
+    """
+    def __init__(self, engine, symbol, balances=None, fee_rate=0.001,
+                 quote_asset="USDT", base_asset=None, start_ts=None):
+        tape = engine._require_tape(symbol)
+
+        self.engine = engine
+        self.symbol = symbol
+        self.quote_asset = quote_asset
+        if base_asset is None:
+            base_asset = symbol[:-len(quote_asset)] if symbol.endswith(quote_asset) else symbol
+        self.base_asset = base_asset
+        self.fee_rate = fee_rate
+
+        self._ts = tape.ts
+        self._prices = tape.prices
+        self.cursor = 0 if start_ts is None else int(np.searchsorted(self._ts, _to_ms(start_ts), side='left'))
+
+        self._fee_rate = _dec(fee_rate)
+        self._balances = {self.base_asset: Decimal(0), self.quote_asset: Decimal(0)}
+        self._balances.update({a: _dec(v) for a, v in (balances or {}).items()})
+        self._locked = {self.base_asset: Decimal(0), self.quote_asset: Decimal(0)}
+        self.starting_balances = self.balances
+
+        self.orders = {}
+        self.fills = []
+        self._bids = []               # (-price, seq, orderId)
+        self._asks = []               # (price, seq, orderId)
+        self._market = deque()
+        self._ids = itertools.count(1)
+
+    # ---------------- Clock ----------------
+    @property
+    def now(self):
+        """Timestamp (ms) of the last processed trade, or of the next one before any processing."""
+        if self.cursor == 0:
+            return int(self._ts[0]) if len(self._ts) else None
+        return int(self._ts[self.cursor - 1])
+
+    @property
+    def last_price(self):
+        idx = max(self.cursor - 1, 0)
+        return float(self._prices[idx]) if len(self._prices) else None
+
+    # ---------------- Order entry ----------------
+    def submit_limit(self, side, qty, price):
+        """Rest a limit order; returns its orderId (status REJECTED if it can't be funded)."""
+        side = side.upper()
+        order = SimOrder(next(self._ids), self.symbol, side, "LIMIT", float(qty), float(price), self.now)
+        self.orders[order.orderId] = order
+
+        if not self._lock(order):
+            order.status = "REJECTED"
+            return order.orderId
+
+        if side == "BUY":
+            heapq.heappush(self._bids, (-order.price, order.orderId, order.orderId))
+        else:
+            heapq.heappush(self._asks, (order.price, order.orderId, order.orderId))
+        return order.orderId
+
+    def submit_market(self, side, qty):
+        """Queue a market order; it fills on the next trade processed."""
+        order = SimOrder(next(self._ids), self.symbol, side.upper(), "MARKET", float(qty), None, self.now)
+        self.orders[order.orderId] = order
+        self._market.append(order)
+        return order.orderId
+
+    def cancel(self, orderId):
+        """Cancel a resting order. Heap entries are dropped lazily when they surface."""
+        order = self.orders.get(orderId)
+        if order is None or order.status != "NEW":
+            return False
+        order.status = "CANCELED"
+        if order.type == "LIMIT":
+            self._unlock(order)
+        return True
+
+    def open_orders(self):
+        return [o for o in self.orders.values() if o.status == "NEW"]
+
+    # ---------------- Balances ----------------
+    @property
+    def balances(self):
+        """{asset: total balance} as floats (settled exactly in Decimal)."""
+        return {a: float(v) for a, v in self._balances.items()}
+
+    @property
+    def locked(self):
+        """{asset: amount reserved by resting orders} as floats."""
+        return {a: float(v) for a, v in self._locked.items()}
+
+    def _reserve(self, order, price):
+        """(asset, amount) an order needs: quote incl. fee for buys, base for sells."""
+        if order.side == "BUY":
+            return self.quote_asset, _dec(order.qty) * _dec(price) * (1 + self._fee_rate)
+        return self.base_asset, _dec(order.qty)
+
+    def _free(self, asset):
+        return self._balances[asset] - self._locked[asset]
+
+    def _lock(self, order):
+        asset, amount = self._reserve(order, order.price)
+        if self._free(asset) < amount:
+            return False
+        self._locked[asset] += amount
+        return True
+
+    def _unlock(self, order):
+        asset, amount = self._reserve(order, order.price)
+        self._locked[asset] -= amount
+
+    def _settle(self, order, price, idx):
+        qty = _dec(order.qty)
+        notional = qty * _dec(price)
+        fee = notional * self._fee_rate
+        if order.side == "BUY":
+            self._balances[self.quote_asset] -= notional + fee
+            self._balances[self.base_asset] += qty
+        else:
+            self._balances[self.base_asset] -= qty
+            self._balances[self.quote_asset] += notional - fee
+
+        order.status = "FILLED"
+        order.fill_price = price
+        order.fill_ts = int(self._ts[idx])
+        self.fills.append({
+            "mode": "backtest",
+            "orderType": order.type,
+            "orderId": order.orderId,
+            "symbol": order.symbol,
+            "side": order.side,
+            "qty": order.qty,
+            "limit_price": order.price,
+            "fill_price": price,
+            "fee": float(fee),
+            "status": "FILLED",
+            "ts": order.fill_ts,
+            "timestamp": _format_ts(order.fill_ts)
+        })
+
+    def equity(self, mark_price=None):
+        """Account value in the quote asset, marked at `mark_price` (default: last trade)."""
+        mark = self.last_price if mark_price is None else mark_price
+        return self.balances[self.quote_asset] + self.balances[self.base_asset] * mark
+
+    def pnl(self, mark_price=None):
+        """Trading PnL versus simply holding the starting balances, at the same mark."""
+        mark = self.last_price if mark_price is None else mark_price
+        start = self.starting_balances[self.quote_asset] + self.starting_balances[self.base_asset] * mark
+        return self.equity(mark) - start
+
+    # ---------------- Matching ----------------
+    def _best(self, heap):
+        while heap and self.orders[heap[0][2]].status != "NEW":
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _next_event(self, start, end):
+        """First index in [start, end) whose price crosses the best bid or ask, else end."""
+        top_bid, top_ask = self._best(self._bids), self._best(self._asks)
+        if top_bid is None and top_ask is None:
+            return end
+        bid = -top_bid[0] if top_bid else -np.inf
+        ask = top_ask[0] if top_ask else np.inf
+
+        chunk = 4096
+        while start < end:
+            seg = self._prices[start:min(end, start + chunk)]
+            hits = np.flatnonzero((seg <= bid) | (seg >= ask))
+            if hits.size:
+                return start + int(hits[0])
+            start += len(seg)
+            chunk = min(chunk * 2, 1 << 20)
+        return end
+
+    def _match(self, idx):
+        price = float(self._prices[idx])
+
+        while self._market:
+            order = self._market.popleft()
+            if order.status != "NEW":
+                continue
+            asset, amount = self._reserve(order, price)
+            if self._free(asset) < amount:
+                order.status = "REJECTED"
+                continue
+            self._settle(order, price, idx)
+
+        # Resting orders execute at their limit price, whatever the crossing print
+        while True:
+            top = self._best(self._bids)
+            if top is None or -top[0] < price:
+                break
+            order = self.orders[heapq.heappop(self._bids)[2]]
+            self._unlock(order)
+            self._settle(order, order.price, idx)
+
+        while True:
+            top = self._best(self._asks)
+            if top is None or top[0] > price:
+                break
+            order = self.orders[heapq.heappop(self._asks)[2]]
+            self._unlock(order)
+            self._settle(order, order.price, idx)
+
+    def advance_to(self, ts=None):
+        """
+        Process every trade up to and including `ts` (default: end of tape).
+        Returns the fills generated during this call.
+        """
+        end = len(self._ts) if ts is None else int(np.searchsorted(self._ts, _to_ms(ts), side='right'))
+        n_fills = len(self.fills)
+
+        while self.cursor < end:
+            idx = self.cursor if self._market else self._next_event(self.cursor, end)
+            if idx >= end:
+                self.cursor = end
+                break
+            self._match(idx)
+            self.cursor = idx + 1
+
+        return self.fills[n_fills:]
+
+    def run(self):
+        """Consume the rest of the tape."""
+        return self.advance_to(None)
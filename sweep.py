@@ -0,0 +1,82 @@
+# src/sweep.py
+"""
+Parallel parameter sweeps over BacktestEngine.
+
+Every worker process opens the same memory-mapped columnar store once (in
+the pool initializer), so the OS page cache shares the price arrays across
+workers and nothing but parameters and result dicts crosses process
+boundaries.
+
+A run function takes the worker's engine plus one parameter combination and
+returns a dict of metrics:
+
+    def run_grid(engine, symbol, spacing, levels):
+        sim = BacktestSimulator(engine, symbol, balances={"USDT": 10_000})
+        ...
+        return {"pnl": sim.pnl(), "fills": len(sim.fills)}
+
+    results = run_sweep(run_grid, {"symbol": ["BTCUSDT"], "spacing": [5, 10, 20], "levels": [5, 10]})
+
+It must be defined at module level so the pool can pickle it.
+"""
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backnet import BacktestEngine
+from logger_config import logger
+
+# Per-process engine, set up by _init_worker
+_ENGINE = None
+
+
+def _init_worker(store_dir, max_resident):
+    global _ENGINE
+    _ENGINE = BacktestEngine(store_dir=store_dir, max_resident=max_resident)
+
+
+def _run_one(job):
+    func, params = job
+    try:
+        metrics = func(_ENGINE, **params)
+    except Exception as e:
+        logger.error(f"Sweep run failed for {params}: {e}")
+        metrics = {"error": str(e)}
+    return {**params, **(metrics or {})}
+
+
+def parameter_grid(grid):
+    """Expand {"name": [values, ...]} into a list of parameter dicts (cartesian product)."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_sweep(func, grid, file_path=None, store_dir=None, processes=None, max_resident=16, chunksize=1):
+    """
+    Run `func(engine, **params)` for every combination in `grid` across a
+    process pool and return one DataFrame row per run (parameters + metrics),
+    in grid order.
+
+    `grid` is a dict of parameter lists or an explicit list of parameter dicts.
+    The store is built (or reused) in the parent before any worker starts.
+    """
+    engine = BacktestEngine(file_path=file_path, store_dir=store_dir, max_resident=max_resident)
+    if engine.file_missing:
+        raise RuntimeError("Backtest data unavailable.")
+
+    runs = grid if isinstance(grid, list) else parameter_grid(grid)
+    processes = processes or os.cpu_count() or 1
+    logger.info(f"Starting sweep: {len(runs)} runs on {processes} processes")
+
+    if processes == 1:
+        _init_worker(engine.store_dir, max_resident)
+        rows = [_run_one((func, params)) for params in runs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(engine.store_dir, max_resident)) as pool:
+            rows = list(pool.map(_run_one, [(func, params) for params in runs], chunksize=chunksize))
+
+    logger.info(f"Sweep finished: {len(rows)} runs")
+    return pd.DataFrame(rows)
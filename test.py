@@ -7,15 +7,15 @@ from time import sleep
 from datetime import datetime
 
 # --- Add src to path ---
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # --- Project Imports ---
-from src.binance import BinanceClient
-from src import order, utils
-from src.advanced import strategies
-from src.advanced.bots import GridTradingBot
-from src.portfolio import PortfolioManager
-from src.logger_config import logger
+from binance import BinanceClient
+import order, utils
+from advanced import strategies
+from advanced.bots import GridTradingBot
+from portfolio import PortfolioManager
+from logger_config import logger
 
 # --- Rich Library Imports ---
 from rich.console import Console
@@ -238,13 +238,14 @@ class TradingTerminal:
 
         self.console.print(f"[{self.theme['warning']}]Fetching open positions...[/]")
         self.portfolio.fetch_data()
-        open_positions = [p for p in self.portfolio.positions_data if float(p['positionAmt']) != 0]
+        # "symbol" may be a route or a bare asset; only direct markets can be closed with one order
+        open_positions = [p for p in self.portfolio.positions_data if float(p['positionAmt']) != 0 and p['market']]
 
         if not open_positions:
             self.console.print("[green]No open positions to close.[/green]")
         else:
             for pos in open_positions:
-                symbol = pos['symbol']
+                symbol = pos['market']
                 qty = abs(float(pos['positionAmt']))
                 side = "SELL" if float(pos['positionAmt']) > 0 else "BUY"
                 self.console.print(f"\nClosing {symbol} position...")
@@ -3,8 +3,8 @@ import os
 import json
 from datetime import datetime
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from src.advanced.strategies import place_oco_monitored
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+from advanced.strategies import place_oco_monitored
 
 # -----------------------
 # Test OCO order
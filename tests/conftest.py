@@ -0,0 +1,48 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Keep the client modules offline and deterministic, and their files out of the tree
+MOCK_PORT = 18765
+SCRATCH = tempfile.mkdtemp(prefix="binance-bot-tests-")
+os.environ.setdefault("BINANCE_API_KEY", "test-key")
+os.environ.setdefault("BINANCE_API_SECRET", "test-secret")
+os.environ.setdefault("USE_MOCK_SERVER", "true")
+os.environ.setdefault("MOCK_SERVER_URL", f"http://127.0.0.1:{MOCK_PORT}/api")
+os.environ.setdefault("BINANCE_WS_URL", "")
+os.environ.setdefault("EXCHANGE_INFO_CACHE_DIR", os.path.join(SCRATCH, "exchange_info"))
+
+# Log to the scratch dir instead of the tracked bot.log
+from logger_config import logger  # noqa: E402
+
+for _handler in [h for h in logger.handlers if isinstance(h, RotatingFileHandler)]:
+    logger.removeHandler(_handler)
+    _handler.close()
+logger.addHandler(RotatingFileHandler(os.path.join(SCRATCH, "bot.log")))
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    """MockBinanceServer on MOCK_PORT, shared by the whole run (clients keep connections alive)."""
+    from mock_server import MockBinanceServer
+
+    server = MockBinanceServer(port=MOCK_PORT, api_key=os.environ["BINANCE_API_KEY"],
+                               api_secret=os.environ["BINANCE_API_SECRET"])
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mock_exchange(mock_server):
+    """A fresh MockExchange behind the shared mock server."""
+    return mock_server.reset()
@@ -0,0 +1,157 @@
+# tests/test_backnet.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import datastore
+from backnet import BacktestEngine
+
+
+def write_csv(path, symbol=None, n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "Timestamp": 1_700_000_000_000 + np.arange(n) * 1000,
+        "Execution Price": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+    })
+    if symbol is not None:
+        frame["Symbol"] = symbol
+    frame.to_csv(path, index=False)
+    return frame
+
+
+@pytest.fixture
+def single_csv_engine(tmp_path):
+    frame = write_csv(tmp_path / "tape.csv")
+    return BacktestEngine(str(tmp_path / "tape.csv")), frame
+
+
+@pytest.fixture
+def multi_symbol_engine(tmp_path):
+    btc = write_csv(tmp_path / "btc.csv", "BTCUSDT", seed=1)
+    eth = write_csv(tmp_path / "eth.csv", "ETHUSDT", seed=2)
+    pd.concat([btc, eth]).to_csv(tmp_path / "tape.csv", index=False)
+    return BacktestEngine(str(tmp_path / "tape.csv")), btc, eth
+
+
+def naive_first_cross(prices, start, limit, is_buy):
+    for i in range(start, len(prices)):
+        if (prices[i] <= limit) if is_buy else (prices[i] >= limit):
+            return i
+    return -1
+
+
+def test_symbol_less_csv_serves_any_symbol(single_csv_engine):
+    # The README's CSV format has no Symbol column; its tape stands for whatever symbol is traded
+    engine, frame = single_csv_engine
+    last = frame["Execution Price"].iloc[-1]
+    assert engine.simulate_market_order(None, "BUY", 1)["fill_price"] == pytest.approx(last)
+    fill = engine.simulate_market_order("BTCUSDT", "BUY", 1)
+    assert fill["fill_price"] == pytest.approx(last) and fill["symbol"] == "BTCUSDT"
+    assert "error" not in engine.simulate_limit_order("ethusdt", "BUY", 1, 100.0)
+    ts = frame["Timestamp"].iloc[10]
+    assert engine.get_price_at(ts, "ETHUSDT") == pytest.approx(frame["Execution Price"].iloc[10])
+
+
+def test_empty_tape_prices_are_nan(tmp_path):
+    datastore.allocate_partition(str(tmp_path), "BTCUSDT", 0)
+    datastore.finalize_partition(str(tmp_path), "BTCUSDT")
+    engine = BacktestEngine(store_dir=str(tmp_path))
+    assert np.isnan(engine.get_prices_at([1_700_000_000_000, 1_700_000_001_000], "BTCUSDT")).all()
+
+
+def test_orders_route_to_their_own_symbol(multi_symbol_engine):
+    engine, btc, eth = multi_symbol_engine
+    ts = int(btc["Timestamp"].iloc[100])
+    assert engine.get_price_at(ts, "BTCUSDT") == pytest.approx(btc["Execution Price"].iloc[100])
+    assert engine.get_price_at(ts, "ethusdt") == pytest.approx(eth["Execution Price"].iloc[100])
+    assert "error" in engine.simulate_market_order("XRPUSDT", "BUY", 1)
+
+
+def test_lru_bounds_resident_tapes(multi_symbol_engine):
+    engine, _, _ = multi_symbol_engine
+    engine.max_resident = 1
+    engine.get_price_at(1_700_000_100_000, "BTCUSDT")
+    engine.get_price_at(1_700_000_100_000, "ETHUSDT")
+    assert list(engine._tapes) == ["ETHUSDT"]
+
+
+def test_bulk_first_cross_matches_naive_scan():
+    rng = np.random.default_rng(7)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 20_000)))
+    engine = BacktestEngine.__new__(BacktestEngine)
+    for is_buy in (True, False):
+        starts = rng.integers(0, len(prices), 300).astype(np.int64)
+        limits = prices[starts] * (1 + rng.normal(0, 0.02, 300))
+        fills = engine._bulk_first_cross(prices, starts, limits, is_buy)
+        expected = [naive_first_cross(prices, s, l, is_buy) for s, l in zip(starts, limits)]
+        assert fills.tolist() == expected
+        assert [engine._first_cross(prices, int(s), l, is_buy) for s, l in zip(starts, limits)] == expected
+
+
+def test_bulk_limit_orders_match_single_orders(multi_symbol_engine):
+    engine, btc, _ = multi_symbol_engine
+    rng = np.random.default_rng(3)
+    ts = btc["Timestamp"].to_numpy()[rng.integers(0, len(btc), 50)]
+    limits = btc["Execution Price"].to_numpy()[rng.integers(0, len(btc), 50)]
+    sides = rng.choice(["BUY", "SELL"], 50)
+    idx, price = engine.simulate_limit_orders("BTCUSDT", sides, limits, ts)
+    for i in range(50):
+        single = engine.simulate_limit_order("BTCUSDT", sides[i], 1, limits[i], int(ts[i]))
+        if idx[i] < 0:
+            assert single["status"] == "OPEN"
+        else:
+            assert single["fill_price"] == pytest.approx(price[i])
+
+
+def expected_bars(frame, rule):
+    indexed = frame.set_index(pd.to_datetime(frame["Timestamp"], unit="ms"))
+    grouped = indexed.resample(rule)
+    bars = pd.DataFrame({
+        "open": grouped["Execution Price"].first(),
+        "high": grouped["Execution Price"].max(),
+        "low": grouped["Execution Price"].min(),
+        "close": grouped["Execution Price"].last(),
+        "volume": grouped["Quantity"].sum(),
+        "trades": grouped["Execution Price"].count(),
+    })
+    bars = bars[bars["trades"] > 0]
+    return bars.reset_index(drop=True), bars.index.astype("datetime64[ms]").astype(np.int64)
+
+
+def write_trades(path, seed):
+    rng = np.random.default_rng(seed)
+    n = 3000
+    frame = pd.DataFrame({
+        # Irregular spacing leaves some minutes without trades
+        "Timestamp": 1_700_000_000_000 + np.cumsum(rng.integers(1, 40_000, n)),
+        "Execution Price": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+        "Quantity": rng.uniform(0.1, 2, n),
+        "Symbol": "BTCUSDT",
+    })
+    frame.to_csv(path, index=False)
+    return frame
+
+
+@pytest.mark.parametrize("interval, rule", [("1m", "1min"), ("5m", "5min"), ("1h", "1h")])
+def test_bars_match_a_pandas_resample(tmp_path, interval, rule):
+    frame = write_trades(tmp_path / "tape.csv", seed=4)
+    bars = BacktestEngine(str(tmp_path / "tape.csv")).get_bars("BTCUSDT", interval)
+    expected, open_times = expected_bars(frame, rule)
+    np.testing.assert_array_equal(bars["open_time"], open_times)
+    pd.testing.assert_frame_equal(bars[expected.columns], expected, check_dtype=False)
+
+
+def test_bar_cache_is_invalidated_when_the_source_changes(tmp_path):
+    path = tmp_path / "tape.csv"
+    write_trades(path, seed=5)
+    BacktestEngine(str(path)).get_bars("BTCUSDT", "1m")
+    cached = tmp_path / "tape_store" / "BTCUSDT" / "bars_60000.npz"
+    stale = cached.read_bytes()
+
+    frame = write_trades(path, seed=6)
+    engine = BacktestEngine(str(path))
+    # Bars left over from the old source must not be served for the new one
+    cached.write_bytes(stale)
+    bars = engine.get_bars("BTCUSDT", "1m")
+    expected, _ = expected_bars(frame, "1min")
+    pd.testing.assert_frame_equal(bars[expected.columns], expected, check_dtype=False)
@@ -0,0 +1,43 @@
+# tests/test_cli.py
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("advanced")    # the strategy package cli.py imports
+
+import cli  # noqa: E402
+from backnet import BacktestEngine  # noqa: E402
+
+
+@pytest.fixture
+def terminal(tmp_path, monkeypatch):
+    """TradingTerminal on a README-format CSV (no Symbol column), with prompts scripted."""
+    pd.DataFrame({
+        "Timestamp": 1_700_000_000_000 + np.arange(200) * 1000,
+        "Execution Price": np.linspace(100.0, 110.0, 200),
+    }).to_csv(tmp_path / "historical_data.csv", index=False)
+    term = cli.TradingTerminal.__new__(cli.TradingTerminal)
+    term.console = cli.Console(quiet=True)
+    term.theme = {}
+    term.backtest_engine = BacktestEngine(str(tmp_path / "historical_data.csv"))
+    term.results = []
+    monkeypatch.setattr(term, "clear_screen", lambda: None)
+    monkeypatch.setattr(term, "log_trade", lambda trade: None)
+    monkeypatch.setattr(term, "print_output", lambda data, title="": term.results.append(data))
+    monkeypatch.setattr(cli.utils, "prompt_for_symbol", lambda console, spot_only=False: "BTCUSDT")
+    return term
+
+
+def _script(monkeypatch, answers, numbers):
+    answers, numbers = iter(answers), iter(numbers)
+    monkeypatch.setattr(cli.Prompt, "ask", lambda *a, **k: next(answers, ""))
+    monkeypatch.setattr(cli.FloatPrompt, "ask", lambda *a, **k: next(numbers))
+
+
+@pytest.mark.parametrize("order_type,numbers", [("MARKET", [1.0]), ("LIMIT", [1.0, 1_000.0])])
+def test_backtest_orders_fill_on_a_symbol_less_csv(terminal, monkeypatch, order_type, numbers):
+    _script(monkeypatch, [order_type, "BACKTEST", "BUY"], numbers)
+    terminal.show_basic_orders_menu()
+    (result,) = terminal.results
+    assert "error" not in result
+    assert result["status"] == "FILLED"
@@ -0,0 +1,82 @@
+# tests/test_conversion.py
+import numpy as np
+import pytest
+
+from conversion import ConversionGraph, ConversionPlan
+
+
+def _symbol(base, quote, status="TRADING"):
+    return {"symbol": base + quote, "baseAsset": base, "quoteAsset": quote, "status": status}
+
+
+@pytest.fixture
+def graph():
+    return ConversionGraph([
+        _symbol("BTC", "USDT"), _symbol("ETH", "BTC"), _symbol("ETH", "USDT"),
+        _symbol("XRP", "BTC"), _symbol("XRP", "ETH"), _symbol("USDT", "TRY"),
+        _symbol("DEAD", "USDT", status="BREAK"),
+    ])
+
+
+def test_routes_are_shortest_and_prefer_bridges(graph):
+    assert graph.route("USDT", "USDT") == ()
+    assert graph.route("ETH", "USDT") == (("ETHUSDT", False),)
+    # Two hops either way; BTC is the preferred bridge
+    assert graph.route("XRP", "USDT") == (("XRPBTC", False), ("BTCUSDT", False))
+    # TRY only quotes USDT, so it is bought back through USDTTRY
+    assert graph.route("TRY", "USDT") == (("USDTTRY", True),)
+    assert graph.route("DEAD", "USDT") is None
+    assert graph.route("NOPE", "USDT") is None
+
+
+def test_plan_rates_match_route_products(graph):
+    plan = graph.plan(["XRP", "TRY", "USDT", "DEAD"], "USDT")
+    assert plan.symbols == ["BTCUSDT", "USDTTRY", "XRPBTC"]
+    rates = plan.rates({"BTCUSDT": 50_000.0, "USDTTRY": 32.0, "XRPBTC": 0.00001})
+    assert rates[:3] == pytest.approx([0.5, 1 / 32.0, 1.0])
+    assert np.isnan(rates[3])
+
+
+def test_missing_or_zero_prices_give_nan_not_inf(graph):
+    plan = graph.plan(["TRY", "XRP"], "USDT")
+    rates = plan.rates({"USDTTRY": 0.0, "BTCUSDT": 50_000.0})
+    assert np.isnan(rates).all()
+
+
+def test_direct_plan_uses_asset_quote_pairs():
+    plan = ConversionPlan.direct(["BTC", "USDT", "XRP"], "USDT")
+    assert plan.symbols == ["BTCUSDT", "XRPUSDT"]
+    rates = plan.rates({"BTCUSDT": 50_000.0})
+    assert rates[:2] == pytest.approx([50_000.0, 1.0])
+    assert np.isnan(rates[2])
+
+
+def test_portfolio_falls_back_to_direct_pairs_without_exchange_info(monkeypatch):
+    import portfolio as portfolio_module
+
+    manager = portfolio_module.PortfolioManager()
+
+    def unavailable():
+        raise RuntimeError("exchangeInfo down")
+
+    monkeypatch.setattr(manager.client.exchange_info, "all_symbols", unavailable)
+    manager.assets = ["BTC", "USDT"]
+    manager.free = np.array([2.0, 10.0])
+    manager.locked = np.zeros(2)
+    assert manager.price_symbols() == ["BTCUSDT"]
+    monkeypatch.setattr(manager, "_fetch_prices", lambda symbols: {"BTCUSDT": 100.0})
+    assert manager.valuation().tolist() == [200.0, 10.0]
+
+
+def test_positions_expose_the_direct_market_separately(graph):
+    import portfolio as portfolio_module
+
+    manager = portfolio_module.PortfolioManager()
+    manager._graph = graph
+    manager.assets = ["ETH", "XRP", "USDT"]
+    manager.free = np.ones(3)
+    manager.locked = manager.rates = manager.values = np.zeros(3)
+    rows = {p["asset"]: p for p in manager.positions_data}
+    assert (rows["ETH"]["symbol"], rows["ETH"]["market"]) == ("ETHUSDT", "ETHUSDT")
+    assert (rows["XRP"]["symbol"], rows["XRP"]["market"]) == ("XRPBTC > BTCUSDT", None)
+    assert (rows["USDT"]["symbol"], rows["USDT"]["market"]) == ("USDT", None)
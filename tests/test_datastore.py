@@ -0,0 +1,74 @@
+# tests/test_datastore.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import datastore
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=["Timestamp", "Execution Price", "Quantity", "Symbol"]).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    return write_csv(tmp_path / "trades.csv", [
+        (3000, 101.0, 0.5, "btcusdt"),
+        (1000, 100.0, 1.0, "BTCUSDT"),
+        (2000, 10.0, 2.0, "ETHUSDT"),
+        (2000, 100.5, 0.1, "BTCUSDT"),
+    ])
+
+
+def test_ingest_partitions_by_symbol_sorted(csv_path, tmp_path):
+    store = datastore.ingest_csv(csv_path, str(tmp_path / "store"), chunksize=2)
+    assert datastore.list_symbols(store) == ["BTCUSDT", "ETHUSDT"]
+    ts, prices, qty = datastore.open_partition(store, "BTCUSDT")
+    assert ts.tolist() == [1000, 2000, 3000]
+    assert prices.tolist() == [100.0, 100.5, 101.0]
+    assert qty.tolist() == [1.0, 0.1, 0.5]
+    assert datastore.is_fresh(store, csv_path)
+
+
+def test_reingest_replaces_an_existing_store(csv_path, tmp_path):
+    store = datastore.ingest_csv(csv_path, str(tmp_path / "store"))
+    write_csv(csv_path, [(1000, 1.0, 1.0, "XRPUSDT")])
+    os.utime(csv_path, (1, 1))
+    assert not datastore.is_fresh(store, csv_path)
+    datastore.ingest_csv(csv_path, store)
+    assert datastore.list_symbols(store) == ["XRPUSDT"]
+    assert not os.path.exists(os.path.join(store, "BTCUSDT"))
+    assert [p for p in os.listdir(tmp_path) if p.startswith(".")] == []
+
+
+def test_refuses_to_overwrite_a_directory_that_is_not_a_store(csv_path, tmp_path):
+    precious = tmp_path / "documents"
+    precious.mkdir()
+    (precious / "notes.txt").write_text("keep me")
+    with pytest.raises(ValueError, match="not a backtest store"):
+        datastore.ingest_csv(csv_path, str(precious))
+    with pytest.raises(ValueError, match="not a backtest store"):
+        datastore.ingest_symbol_csv(csv_path, str(precious), "BTCUSDT")
+    assert (precious / "notes.txt").read_text() == "keep me"
+
+
+def test_rows_without_a_symbol_are_rejected(tmp_path):
+    path = write_csv(tmp_path / "trades.csv", [(1000, 100.0, 1.0, "BTCUSDT"), (2000, 101.0, 1.0, None)])
+    with pytest.raises(ValueError, match="1 row"):
+        datastore.ingest_csv(path, str(tmp_path / "store"))
+    assert not os.path.exists(tmp_path / "store")
+    assert [p for p in os.listdir(tmp_path) if p.startswith(".")] == []
+
+
+def test_symbol_csv_adds_one_partition(csv_path, tmp_path):
+    store = datastore.ingest_csv(csv_path, str(tmp_path / "store"))
+    extra = tmp_path / "xrp.csv"
+    pd.DataFrame({"Timestamp": [5, 4], "Execution Price": [0.5, 0.4]}).to_csv(extra, index=False)
+    datastore.ingest_symbol_csv(str(extra), store, "xrpusdt")
+    assert datastore.list_symbols(store) == ["BTCUSDT", "ETHUSDT", "XRPUSDT"]
+    ts, prices, qty = datastore.open_partition(store, "XRPUSDT")
+    assert ts.tolist() == [4, 5] and prices.tolist() == [0.4, 0.5] and qty is None
+    assert np.asarray(datastore.open_partition(store, "ETHUSDT")[1]).tolist() == [10.0]
@@ -0,0 +1,110 @@
+# tests/test_exchange_info.py
+import time
+import threading
+
+import pytest
+
+from exchange_info import ExchangeInfoCache
+
+
+def _info(symbols):
+    return {"symbols": [{"symbol": s, "filters": [{"filterType": "LOT_SIZE", "stepSize": "0.001"}]}
+                        for s in symbols]}
+
+
+def test_fetches_only_missing_symbols():
+    calls = []
+
+    def fetch(symbols=None):
+        calls.append(symbols)
+        return _info(symbols or ["BTCUSDT", "ETHUSDT"])
+
+    cache = ExchangeInfoCache(fetch)
+    cache.prefetch(["BTCUSDT"])
+    assert cache.filters("BTCUSDT")["LOT_SIZE"]["stepSize"] == "0.001"
+    cache.filters("ETHUSDT")
+    assert calls == [["BTCUSDT"], ["ETHUSDT"]]
+
+
+def test_filters_wait_for_a_refresh_in_progress():
+    cache = ExchangeInfoCache(lambda symbols=None: _info(symbols or ["BTCUSDT"]))
+    assert cache.filters("BTCUSDT")["LOT_SIZE"]["stepSize"] == "0.001"
+    results = []
+    reader = threading.Thread(target=lambda: results.append(cache.filters("BTCUSDT")))
+    with cache._lock:
+        # Mid-refresh: the new entry is stored, its old filters not yet dropped
+        entry = _info(["BTCUSDT"])["symbols"][0]
+        entry["filters"][0]["stepSize"] = "0.01"
+        cache._symbols["BTCUSDT"] = (time.time(), entry)
+        reader.start()
+        reader.join(timeout=0.2)
+        cache._filters.pop("BTCUSDT")
+    reader.join()
+    assert results[0]["LOT_SIZE"]["stepSize"] == "0.01"
+
+
+def test_fetch_runs_outside_the_lock():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch(symbols=None):
+        calls.append(symbols)
+        if symbols == ["ETHUSDT"]:
+            started.set()
+            release.wait(5)
+        return _info(symbols)
+
+    cache = ExchangeInfoCache(fetch)
+    cache.prefetch(["BTCUSDT"])
+    fetchers = [threading.Thread(target=cache.filters, args=("ETHUSDT",)) for _ in range(3)]
+    for t in fetchers:
+        t.start()
+    assert started.wait(5)
+    # A cached symbol is served while ETHUSDT is still being fetched
+    assert cache.filters("BTCUSDT")["LOT_SIZE"]["stepSize"] == "0.001"
+    release.set()
+    for t in fetchers:
+        t.join()
+    # Concurrent readers of ETHUSDT shared one fetch
+    assert calls == [["BTCUSDT"], ["ETHUSDT"]]
+
+
+def test_stale_entries_are_served_when_a_refresh_fails():
+    fail = []
+
+    def fetch(symbols=None):
+        if fail:
+            raise ConnectionError("down")
+        return _info(symbols)
+
+    cache = ExchangeInfoCache(fetch, ttl=0)
+    cache.prefetch(["BTCUSDT"])
+    fail.append(True)
+    assert cache.symbol_info("BTCUSDT")["symbol"] == "BTCUSDT"
+
+
+def test_partial_fetches_append_to_the_disk_log(tmp_path):
+    path = tmp_path / "info.jsonl"
+    cache = ExchangeInfoCache(lambda symbols=None: _info(symbols or ["BTCUSDT", "ETHUSDT"]), path=str(path))
+    cache.prefetch(["BTCUSDT"])
+    first = path.read_text()
+    cache.prefetch(["ETHUSDT"])
+    assert path.read_text().startswith(first)
+    assert len(path.read_text().splitlines()) == 2
+
+    reloaded = ExchangeInfoCache(lambda symbols=None: pytest.fail("fetched"), path=str(path))
+    assert reloaded.filters("ETHUSDT")["LOT_SIZE"]["stepSize"] == "0.001"
+
+    # A full fetch replaces the log with one snapshot
+    cache.all_symbols()
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_disk_log_is_compacted(tmp_path):
+    path = tmp_path / "info.jsonl"
+    cache = ExchangeInfoCache(lambda symbols=None: _info(symbols), path=str(path), compact_after=3)
+    for s in ["A", "B", "C", "D"]:
+        cache.prefetch([s])
+    assert len(path.read_text().splitlines()) == 1
+    reloaded = ExchangeInfoCache(lambda symbols=None: pytest.fail("fetched"), path=str(path))
+    reloaded.prefetch(["A", "B", "C", "D"])
@@ -0,0 +1,49 @@
+# tests/test_market_stream.py
+import json
+
+from market_stream import MarketDataStream, PriceCache
+
+
+def _stream(max_streams):
+    # Never started, so no sockets are opened
+    return MarketDataStream(cache=PriceCache(), url="ws://unused", max_streams=max_streams)
+
+
+def test_streams_are_spread_over_connections_up_to_the_cap():
+    stream = _stream(max_streams=4)
+    stream.watch(["BTCUSDT", "ETHUSDT", "BNBUSDT"])       # two streams per symbol
+    assert [len(c.streams) for c in stream.connections] == [4, 2]
+    assert len(stream.handlers) == 6
+    for name, connection in stream._connection_of.items():
+        assert name in connection.streams
+
+
+def test_freed_slots_are_reused_before_opening_a_connection():
+    stream = _stream(max_streams=4)
+    stream.watch(["BTCUSDT", "ETHUSDT", "BNBUSDT"])
+    stream.unwatch(["BTCUSDT"])
+    assert [len(c.streams) for c in stream.connections] == [2, 2]
+    stream.watch(["XRPUSDT"])
+    assert [len(c.streams) for c in stream.connections] == [4, 2]
+    assert "btcusdt@bookTicker" not in stream.handlers
+
+
+def test_resubscribing_a_stream_keeps_one_slot():
+    stream = _stream(max_streams=4)
+    stream.watch(["BTCUSDT"])
+    stream.watch(["BTCUSDT"])
+    assert [len(c.streams) for c in stream.connections] == [2]
+
+
+def test_events_from_any_connection_reach_the_cache():
+    stream = _stream(max_streams=2)
+    stream.watch(["BTCUSDT", "ETHUSDT"])
+    last = stream.connections[-1]
+    last._on_message(None, json.dumps({"stream": "ethusdt@miniTicker", "data": {"s": "ETHUSDT", "c": "2500.5"}}))
+    assert stream.cache.price("ETHUSDT") == 2500.5
+
+
+def test_default_cap_is_binance_limit():
+    stream = MarketDataStream(cache=PriceCache(), url="ws://unused")
+    stream.watch([f"SYM{i}USDT" for i in range(600)])
+    assert [len(c.streams) for c in stream.connections] == [1024, 176]
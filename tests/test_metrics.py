@@ -0,0 +1,56 @@
+# tests/test_metrics.py
+import math
+import statistics
+
+import pytest
+
+from metrics import compute_metrics, equity_curve
+
+HOUR = 3_600_000
+
+
+def fill(side, qty, price, ts, **extra):
+    return {"side": side, "qty": qty, "fill_price": price, "ts": ts, "status": "FILLED", **extra}
+
+
+def test_marked_metrics_match_hand_computed_values():
+    fills = [fill("BUY", 10, 100.0, 0, fee=1.0)]
+    marks = [HOUR, 2 * HOUR, 3 * HOUR, 4 * HOUR]
+    prices = [100.0, 110.0, 90.0, 120.0]
+    m = compute_metrics(fills, marks, prices, initial_cash=1000.0)
+
+    equity = [999.0, 1099.0, 899.0, 1199.0]        # cash -1 plus 10 units at each mark
+    returns = [b / a - 1 for a, b in zip(equity, equity[1:])]
+    assert m["final_equity"] == pytest.approx(1199.0)
+    assert m["pnl"] == pytest.approx(199.0)
+    assert m["total_return"] == pytest.approx(0.199)
+    assert m["max_drawdown"] == pytest.approx(899.0 / 1099.0 - 1)
+    assert m["volatility"] == pytest.approx(statistics.stdev(returns) * math.sqrt(8760))
+    assert m["sharpe"] == pytest.approx(statistics.mean(returns) / statistics.stdev(returns) * math.sqrt(8760))
+    assert m["turnover"] == pytest.approx(1000.0 / statistics.mean(equity))
+    assert m["fees"] == 1.0 and m["n_fills"] == 1
+
+
+def test_round_trip_without_marks():
+    fills = [
+        fill("SELL", 1, 110.0, 2000),
+        {"side": "BUY", "qty": 5, "fill_price": 1.0, "ts": 1500, "status": "OPEN"},
+        {"error": "rejected"},
+        fill("BUY", 1, 100.0, 1000),
+    ]
+    ts, equity = equity_curve(fills, fee_rate=0.001)
+    assert list(ts) == [1000, 2000]
+    assert list(equity) == pytest.approx([-0.1, 9.79])
+
+    m = compute_metrics(fills, fee_rate=0.001)
+    assert m["pnl"] == pytest.approx(9.79)
+    assert m["fees"] == pytest.approx(0.21)
+    assert m["n_fills"] == 2
+    assert math.isnan(m["total_return"])           # no starting capital to compare against
+
+
+def test_iso_timestamps_and_marks_before_the_first_fill():
+    fills = [{"side": "buy", "qty": 2, "fill_price": 50.0, "timestamp": "2024-01-01T00:00:01Z", "status": "FILLED"}]
+    start = 1_704_067_200_000                       # 2024-01-01T00:00:00Z
+    ts, equity = equity_curve(fills, [start, start + 2000], [40.0, 60.0], initial_cash=100.0)
+    assert list(equity) == pytest.approx([100.0, 120.0])
@@ -0,0 +1,102 @@
+# tests/test_order.py
+import pytest
+
+from resilience import DEFAULT_BREAKER
+
+
+@pytest.fixture
+def order(mock_exchange, monkeypatch):
+    import order as order_module
+    from order_manager import OrderManager
+
+    # Order ids restart with every fresh exchange; so does the manager tracking them
+    monkeypatch.setattr(order_module, "manager", OrderManager(order_module.client, account_state=None))
+    order_module.client.price_cache._quotes.clear()
+    yield order_module
+    DEFAULT_BREAKER.record_success()
+
+
+def test_flatten_cancels_and_closes_everything(order, mock_exchange):
+    assert order.place_limit("BTCUSDT", "BUY", 0.01, 20000)["status"] == "NEW"
+    assert order.place_limit("ETHUSDT", "SELL", 0.1, 9000)["status"] == "NEW"
+
+    report = order.flatten_all()
+
+    assert report["symbols"] == ["BTCUSDT", "ETHUSDT"]
+    assert report["cancelled"] == 2
+    assert report["errors"] == [] and report["cancel_errors"] == {}
+    assert sorted(o["symbol"] for o, r in report["closes"] if r.get("status") == "FILLED") == \
+        ["BNBUSDT", "BTCUSDT", "ETHUSDT"]
+    assert mock_exchange.open_orders() == []
+    assert [a for a, b in mock_exchange.balances.items() if b["free"] or b["locked"]] == ["USDT"]
+
+
+def test_flatten_bypasses_a_stuck_shared_breaker(order, mock_exchange):
+    order.place_limit("BTCUSDT", "BUY", 0.01, 20000)
+    # Shared breaker half-open with its trial never resolved: every shared-breaker call fails fast
+    DEFAULT_BREAKER.failure_threshold, DEFAULT_BREAKER.reset_timeout = 1, 0.0
+    try:
+        DEFAULT_BREAKER.record_failure()
+        DEFAULT_BREAKER.before_call()
+        report = order.flatten_all()
+    finally:
+        DEFAULT_BREAKER.failure_threshold, DEFAULT_BREAKER.reset_timeout = 5, 30.0
+
+    assert report["cancelled"] == 1
+    assert all(r.get("status") == "FILLED" for _, r in report["closes"])
+
+
+def test_flatten_keeps_going_when_a_read_fails(order, mock_exchange, monkeypatch):
+    from async_binance import AsyncBinanceClient
+
+    async def broken(self):
+        raise ConnectionError("ticker feed down")
+
+    monkeypatch.setattr(AsyncBinanceClient, "get_all_ticker_prices", broken)
+    order.client.price_cache.set_price("BTCUSDT", 30000)
+    order.place_limit("ETHUSDT", "SELL", 0.1, 9000)
+
+    report = order.flatten_all()
+
+    assert report["cancelled"] == 1
+    assert report["errors"] and "ticker prices" in report["errors"][0]
+    # Priced from the local cache instead; the rest could not be priced and are left alone
+    assert [o["symbol"] for o, r in report["closes"] if r.get("status") == "FILLED"] == ["BTCUSDT"]
+
+
+def test_batch_reports_bad_orders_without_failing_the_rest(order, mock_exchange):
+    results = order.place_batch([
+        {"symbol": "BTCUSDT", "side": "BUY", "qty": 0.01, "price": 20000, "clientOrderId": "good-limit"},
+        {"symbol": "NOPEUSDT", "side": "BUY", "qty": 1, "price": 1, "clientOrderId": "unknown"},
+        {"symbol": "ETHUSDT", "side": "BUY", "clientOrderId": "no-qty"},
+        {"symbol": "ETHUSDT", "side": "HOLD", "qty": 1, "clientOrderId": "bad-side"},
+        {"symbol": "BTCUSDT", "side": "BUY", "qty": 0.00001, "price": 20000, "clientOrderId": "too-small"},
+        {"symbol": "ETHUSDT", "side": "SELL", "qty": 0.1, "clientOrderId": "good-market"},
+    ])
+
+    assert [r["clientOrderId"] for r in results] == \
+        ["good-limit", "unknown", "no-qty", "bad-side", "too-small", "good-market"]
+    assert results[0]["status"] == "NEW"
+    assert "NOPEUSDT" in results[1]["error"]
+    assert "missing qty" in results[2]["error"]
+    assert "side" in results[3]["error"]
+    assert "notional" in results[4]["error"]
+    assert results[5]["status"] == "FILLED"
+    assert [o["clientOrderId"] for o in mock_exchange.open_orders()] == ["good-limit"]
+
+
+def test_batch_preserves_submission_order(order, mock_exchange):
+    specs = [{"symbol": ("BTCUSDT", "ETHUSDT")[i % 2], "side": "BUY", "qty": (0.01, 0.1)[i % 2],
+              "price": (20000 + i, 1000 + i)[i % 2], "clientOrderId": f"batch-{i}"} for i in range(30)]
+
+    results = order.place_batch(specs, max_concurrency=8)
+
+    assert [r["clientOrderId"] for r in results] == [s["clientOrderId"] for s in specs]
+    assert [r["symbol"] for r in results] == [s["symbol"] for s in specs]
+    assert all(r["status"] == "NEW" for r in results)
+
+
+def test_batch_of_only_bad_orders_sends_nothing(order, mock_exchange):
+    results = order.place_batch([{"symbol": "NOPEUSDT", "side": "BUY", "qty": 1}, "not a spec"])
+    assert all("error" in r for r in results)
+    assert mock_exchange.open_orders() == []
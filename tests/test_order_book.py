@@ -0,0 +1,107 @@
+# tests/test_order_book.py
+import queue
+
+import pytest
+
+from order_book import OrderBook, OrderBookSync
+
+
+class FakeStream:
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, stream, handler):
+        self.handlers[stream] = handler
+
+    def unsubscribe(self, streams):
+        for s in streams:
+            self.handlers.pop(s, None)
+
+
+class FakeClient:
+    """Hands out snapshots queued by the test, one per get_order_book call."""
+    def __init__(self):
+        self.snapshots = queue.Queue()
+        self.calls = 0
+
+    def get_order_book(self, symbol, limit=100):
+        self.calls += 1
+        return self.snapshots.get(timeout=5)
+
+
+def snapshot(last_id, bids=(), asks=()):
+    return {"lastUpdateId": last_id, "bids": [list(l) for l in bids], "asks": [list(l) for l in asks]}
+
+
+def diff(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "U": first, "u": last, "b": [list(l) for l in bids], "a": [list(l) for l in asks]}
+
+
+@pytest.fixture
+def sync():
+    client = FakeClient()
+    sync = OrderBookSync("BTCUSDT", client, stream=FakeStream(), retry_wait=0.01)
+    sync.start()
+    yield sync
+    sync.stop()
+    client.snapshots.put(snapshot(0))   # release a loader still waiting for one
+
+
+def _synced(sync):
+    assert sync.synced.wait(5)
+    return sync.book
+
+
+def test_buffered_events_are_replayed_past_the_snapshot(sync):
+    sync.on_event(diff(95, 100, bids=[("99", "9")]))        # fully covered by the snapshot: dropped
+    sync.on_event(diff(101, 104, bids=[("100", "2")]))      # straddles lastUpdateId + 1
+    sync.on_event(diff(105, 105, asks=[("102", "0")]))
+    sync.client.snapshots.put(snapshot(102, bids=[("99", "1")], asks=[("101", "1"), ("102", "3")]))
+    book = _synced(sync)
+    assert book.best_bid() == (100.0, 2.0)
+    assert list(book.bids.items()) == [(100.0, 2.0), (99.0, 1.0)]
+    assert list(book.asks.items()) == [(101.0, 1.0)]
+    assert sync._prev_u == 105 and book.last_update_id == 105
+
+
+def test_snapshot_too_old_to_bridge_the_buffer_is_refetched(sync):
+    sync.on_event(diff(110, 112, bids=[("100", "1")]))
+    sync.client.snapshots.put(snapshot(100))                # 110 > 100 + 1: cannot bridge
+    sync.client.snapshots.put(snapshot(111, bids=[("98", "1")]))
+    book = _synced(sync)
+    assert sync.client.calls == 2
+    assert list(book.bids.items()) == [(100.0, 1.0), (98.0, 1.0)]
+
+
+def test_in_sequence_events_apply_and_stale_ones_are_ignored(sync):
+    sync.client.snapshots.put(snapshot(10, bids=[("100", "1")]))
+    book = _synced(sync)
+    sync.on_event(diff(11, 12, bids=[("100", "5")]))
+    sync.on_event(diff(9, 12, bids=[("100", "7")]))         # u <= previous u: already applied
+    sync.on_event(diff(13, 13, bids=[("101", "1")]))
+    assert list(book.bids.items()) == [(101.0, 1.0), (100.0, 5.0)]
+    assert sync._prev_u == 13
+
+
+def test_gap_discards_the_book_and_resyncs(sync):
+    sync.client.snapshots.put(snapshot(10, bids=[("100", "1")]))
+    _synced(sync)
+    sync.on_event(diff(15, 16, bids=[("101", "1")]))        # 15 > 10 + 1: events were missed
+    assert not sync.synced.is_set()
+    assert sync.best_bid() is None
+    sync.on_event(diff(17, 17, bids=[("102", "1")]))        # buffered while resyncing
+    sync.client.snapshots.put(snapshot(15, bids=[("100", "2")]))
+    book = _synced(sync)
+    assert sync.client.calls == 2
+    assert list(book.bids.items()) == [(102.0, 1.0), (101.0, 1.0), (100.0, 2.0)]
+    assert sync._prev_u == 17
+
+
+def test_vwap_walks_the_book_and_rejects_non_positive_qty():
+    book = OrderBook("BTCUSDT")
+    book.load_snapshot(snapshot(1, asks=[("100", "1"), ("102", "1")]))
+    assert book.vwap("BUY", 2) == pytest.approx(101.0)
+    assert book.vwap("BUY", 3) is None
+    for qty in (0, -1):
+        with pytest.raises(ValueError):
+            book.vwap("BUY", qty)
@@ -0,0 +1,104 @@
+# tests/test_order_manager.py
+from order_manager import OrderManager
+
+
+def order(order_id, status="NEW", symbol="BTCUSDT", update_time=1):
+    return {"symbol": symbol, "orderId": order_id, "clientOrderId": f"c{order_id}",
+            "status": status, "updateTime": update_time}
+
+
+class FakeClient:
+    def __init__(self, open_orders=(), orders=None):
+        self.open = list(open_orders)
+        self.orders = dict(orders or {})
+        self.calls = []
+
+    def get_open_orders(self, symbol=None):
+        self.calls.append(("open", symbol))
+        return [dict(o) for o in self.open if symbol is None or o["symbol"] == symbol]
+
+    def get_order(self, symbol, order_id):
+        self.calls.append(("order", symbol, order_id))
+        return dict(self.orders[order_id])
+
+
+def manager(client):
+    return OrderManager(client, account_state=None)
+
+
+def test_lifecycle_transitions_are_enforced():
+    m = manager(FakeClient())
+    m._reconciled = True
+    m.apply(order(1, "NEW", update_time=1))
+    m.apply(order(1, "PARTIALLY_FILLED", update_time=2))
+    m.apply(order(1, "FILLED", update_time=3))
+    # Final status: no way back
+    m.apply(order(1, "NEW", update_time=4))
+    assert m.get(1)["status"] == "FILLED"
+    assert [s for s, _ in m.history[1]] == ["NEW", "PARTIALLY_FILLED", "FILLED"]
+    assert not m.has_open("BTCUSDT")
+
+
+def test_out_of_order_update_is_ignored():
+    m = manager(FakeClient())
+    m._reconciled = True
+    m.apply(order(1, "PARTIALLY_FILLED", update_time=5))
+    m.apply(order(1, "NEW", update_time=2))
+    assert m.get(1)["status"] == "PARTIALLY_FILLED"
+
+
+def test_indexes_by_client_id_and_symbol():
+    m = manager(FakeClient())
+    m._reconciled = True
+    m.track({**order(7, symbol="ETHUSDT"), "transactTime": 1})
+    assert m.get(client_order_id="c7")["orderId"] == 7
+    assert [o["orderId"] for o in m.open_orders("ETHUSDT")] == [7]
+    assert m.open_symbols() == ["ETHUSDT"]
+
+
+def test_track_ignores_error_results():
+    m = manager(FakeClient())
+    assert m.track({"error": "rejected"}) is None
+
+
+def test_first_query_reconciles_open_orders_from_earlier_runs():
+    client = FakeClient(open_orders=[order(1), order(2, symbol="ETHUSDT")])
+    m = manager(client)
+    assert m.has_open("ETHUSDT")
+    assert sorted(o["orderId"] for o in m.open_orders()) == [1, 2]
+    # Only the first query hits the API
+    assert client.calls == [("open", None)]
+
+
+def test_startup_reconcile_covers_orders_tracked_before_first_query():
+    client = FakeClient(open_orders=[order(2, symbol="ETHUSDT")], orders={1: order(1, "FILLED", update_time=9)})
+    m = manager(client)
+    m.track(order(1))
+    assert m.open_symbols() == ["ETHUSDT"]
+    assert m.get(1)["status"] == "FILLED"
+
+
+def test_startup_reconcile_failure_is_retried():
+    class Failing(FakeClient):
+        fail = True
+
+        def get_open_orders(self, symbol=None):
+            if self.fail:
+                raise ConnectionError("down")
+            return super().get_open_orders(symbol)
+
+    client = Failing(open_orders=[order(1)])
+    m = manager(client)
+    assert m.open_orders() == []
+    client.fail = False
+    assert [o["orderId"] for o in m.open_orders()] == [1]
+
+
+def test_reconcile_resolves_orders_that_disappeared():
+    client = FakeClient(orders={1: order(1, "CANCELED", update_time=5)})
+    m = manager(client)
+    m._reconciled = True
+    m.apply(order(1))
+    m.reconcile(["BTCUSDT"])
+    assert m.get(1)["status"] == "CANCELED"
+    assert not m.has_open("BTCUSDT")
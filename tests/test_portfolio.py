@@ -0,0 +1,85 @@
+# tests/test_portfolio.py
+import pytest
+
+from market_stream import PriceCache
+from portfolio import PortfolioManager
+
+
+def _symbol(base, quote):
+    return {"symbol": base + quote, "baseAsset": base, "quoteAsset": quote, "status": "TRADING"}
+
+
+class FakeExchangeInfo:
+    def all_symbols(self):
+        return [_symbol("BTC", "USDT"), _symbol("ETH", "USDT"), _symbol("XRP", "BTC")]
+
+
+class FakeClient:
+    def __init__(self):
+        self.price_cache = PriceCache()
+        self.exchange_info = FakeExchangeInfo()
+        self.balances = {}
+        self.tickers = {}
+        self.ticker_calls = 0
+
+    def live_account_state(self):
+        return None
+
+    def get_account_balance(self):
+        return {"balances": [{"asset": a, "free": str(f), "locked": str(l)} for a, (f, l) in self.balances.items()]}
+
+    def get_all_ticker_prices(self):
+        self.ticker_calls += 1
+        return [{"symbol": s, "price": str(p)} for s, p in self.tickers.items()]
+
+
+@pytest.fixture
+def portfolio():
+    pm = PortfolioManager()
+    pm.client = FakeClient()
+    pm.client.balances = {"USDT": (100, 0), "BTC": (1, 0.5), "ETH": (2, 0), "XRP": (1000, 0)}
+    pm.client.tickers = {"BTCUSDT": 50_000, "ETHUSDT": 3_000, "XRPBTC": 0.00001}
+    return pm
+
+
+def test_values_every_asset_with_one_ticker_request(portfolio):
+    portfolio.fetch_data()
+    rows = {p["asset"]: p for p in portfolio.positions_data}
+    assert rows["BTC"]["position_value"] == pytest.approx(75_000)
+    assert rows["XRP"]["position_value"] == pytest.approx(500)
+    assert rows["XRP"]["symbol"] == "XRPBTC > BTCUSDT"
+    assert portfolio.total_unrealized_pnl == pytest.approx(100 + 75_000 + 6_000 + 500)
+    assert portfolio.client.ticker_calls == 1
+
+
+def test_refresh_only_rebuilds_rows_that_changed(portfolio):
+    portfolio.fetch_data()
+    before = list(portfolio.positions_data)
+
+    # Prices are fresh in the cache: no ticker request, and no row is touched
+    portfolio.fetch_data()
+    assert portfolio.client.ticker_calls == 1
+    assert all(a is b for a, b in zip(portfolio.positions_data, before))
+
+    portfolio.client.balances["ETH"] = (3, 0)
+    portfolio.fetch_data()
+    after = portfolio.positions_data
+    assert [a is b for a, b in zip(after, before)] == [True, True, False, True]
+    assert after[2]["position_value"] == pytest.approx(9_000)
+
+    # A price move touches every row valued through it (XRP goes through BTCUSDT)
+    portfolio.client.price_cache.set_price("BTCUSDT", 60_000)
+    before = list(after)
+    portfolio.fetch_data()
+    assert [a is b for a, b in zip(portfolio.positions_data, before)] == [True, False, True, False]
+
+
+def test_new_asset_rebuilds_all_rows(portfolio):
+    portfolio.fetch_data()
+    before = list(portfolio.positions_data)
+    portfolio.client.balances["BNB"] = (1, 0)
+    portfolio.fetch_data()
+    rows = portfolio.positions_data
+    assert [p["asset"] for p in rows] == ["USDT", "BTC", "ETH", "XRP", "BNB"]
+    assert rows[4]["position_value"] == 0.0          # no market: held but unpriced
+    assert not any(a is b for a, b in zip(rows, before))
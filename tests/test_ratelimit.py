@@ -0,0 +1,84 @@
+# tests/test_ratelimit.py
+import pytest
+
+from exchange_info import ExchangeInfoCache
+from ratelimit import RateLimiter, request_weight
+
+RATE_LIMITS = [
+    {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 100},
+    {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": 10},
+    {"rateLimitType": "ORDERS", "interval": "DAY", "intervalNum": 1, "limit": 1000},
+    {"rateLimitType": "RAW_REQUESTS", "interval": "MINUTE", "intervalNum": 5, "limit": 61000},
+]
+
+
+def test_request_weight():
+    assert request_weight("GET", "/v3/ticker/price", {"symbol": "BTCUSDT"}) == 2
+    assert request_weight("GET", "/v3/ticker/price") == 4
+    assert request_weight("GET", "/v3/depth", {"limit": 1000}) == 50
+    assert request_weight("GET", "/v3/unknown") == 1
+
+
+def test_reserve_is_free_within_budget_then_waits_out_the_deficit():
+    limiter = RateLimiter(weight_per_minute=100, safety=1.0)
+    assert limiter.reserve(100) == 0.0
+    # 100 weight/minute refills at 5/3 per second: 10 more weight is ~6s away
+    assert limiter.reserve(10) == pytest.approx(6.0, abs=0.1)
+
+
+def test_reserve_charges_order_buckets_only_for_orders():
+    limiter = RateLimiter(orders_per_10s=2, safety=1.0)
+    assert limiter.reserve(1) == 0.0
+    assert limiter.reserve(1, orders=2) == 0.0
+    assert limiter.reserve(1, orders=1) == pytest.approx(5.0, abs=0.1)
+
+
+def test_update_from_headers_syncs_used_weight():
+    limiter = RateLimiter(weight_per_minute=100, safety=1.0)
+    limiter.update_from_headers({"X-MBX-USED-WEIGHT-1M": "100", "Content-Type": "application/json"})
+    assert limiter.reserve(1) > 0
+    # Headers for windows the limiter does not track are ignored
+    limiter.update_from_headers({"x-mbx-order-count-1h": "5"})
+    assert set(limiter.order_buckets) == {"10S", "1D"}
+
+
+def test_pause_holds_every_call():
+    limiter = RateLimiter()
+    limiter.pause(30)
+    assert limiter.reserve(1) == pytest.approx(30, abs=0.5)
+    limiter.pause(1)  # a shorter pause never cuts an existing one short
+    assert limiter.reserve(1) == pytest.approx(30, abs=0.5)
+
+
+def test_configure_rebuilds_buckets_from_rate_limits():
+    limiter = RateLimiter(safety=0.5)
+    limiter.configure(RATE_LIMITS)
+    assert set(limiter.weight_buckets) == {"1M"}
+    assert set(limiter.order_buckets) == {"10S", "1D"}
+    assert limiter.weight_buckets["1M"].capacity == 50
+    assert limiter.order_buckets["10S"].capacity == 5
+
+
+def test_configure_keeps_spent_tokens_when_limits_are_unchanged():
+    limiter = RateLimiter(safety=1.0)
+    limiter.configure(RATE_LIMITS)
+    limiter.reserve(100)
+    limiter.configure(RATE_LIMITS)
+    assert limiter.reserve(10) > 0
+
+
+def test_exchange_info_rate_limits_configure_the_limiter(tmp_path):
+    limiter = RateLimiter(safety=1.0)
+
+    def fetch(symbols=None):
+        return {"rateLimits": RATE_LIMITS,
+                "symbols": [{"symbol": s, "filters": []} for s in symbols or ["BTCUSDT"]]}
+
+    path = str(tmp_path / "info.json")
+    ExchangeInfoCache(fetch, path=path, limiter=limiter).prefetch(["BTCUSDT"])
+    assert limiter.weight_buckets["1M"].capacity == 100
+
+    # A later process picks the limits up from the disk cache without fetching
+    fresh = RateLimiter(safety=1.0)
+    ExchangeInfoCache(lambda symbols=None: pytest.fail("fetched"), path=path, limiter=fresh).prefetch(["BTCUSDT"])
+    assert fresh.order_buckets["10S"].capacity == 10
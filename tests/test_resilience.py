@@ -0,0 +1,129 @@
+# tests/test_resilience.py
+import asyncio
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_one_trial():
+    breaker = half_open_breaker()
+    trial = breaker.before_call()
+    assert trial is not None
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_trial_success_closes():
+    breaker = half_open_breaker()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.before_call() is None
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = half_open_breaker()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_release_reopens_abandoned_trial():
+    breaker = half_open_breaker()
+    trial = breaker.before_call()
+    breaker.release(trial)
+    assert breaker.state == CircuitBreaker.OPEN
+    # reset_timeout is 0, so the next call becomes a fresh trial instead of being blocked forever
+    assert breaker.before_call() is not None
+
+
+def test_release_after_outcome_is_noop():
+    breaker = half_open_breaker()
+    trial = breaker.before_call()
+    breaker.record_success()
+    breaker.release(trial)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_stale_release_does_not_touch_newer_trial():
+    breaker = half_open_breaker()
+    old = breaker.before_call()
+    breaker.record_failure()
+    new = breaker.before_call()
+    breaker.release(old)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.release(new)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+class _SlowLimiter:
+    """Limiter stub that makes every call wait, so the trial can be cancelled mid-flight."""
+    def reserve(self, weight, orders):
+        return 60.0
+
+    def acquire(self, weight, orders):
+        raise KeyboardInterrupt
+
+    def update_from_headers(self, headers):
+        pass
+
+
+def test_cancelled_async_trial_is_released():
+    from async_binance import AsyncBinanceClient
+
+    breaker = half_open_breaker()
+
+    async def run():
+        client = AsyncBinanceClient(limiter=_SlowLimiter(), breaker=breaker)
+        task = asyncio.create_task(client.ping())
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await client.close()
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.before_call() is not None
+
+
+def test_interrupted_sync_trial_is_released():
+    from binance import BinanceClient
+
+    breaker = half_open_breaker()
+    client = BinanceClient(limiter=_SlowLimiter(), breaker=breaker)
+    with pytest.raises(KeyboardInterrupt):
+        client.ping()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.before_call() is not None
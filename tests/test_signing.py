@@ -0,0 +1,52 @@
+# tests/test_signing.py
+import hashlib
+import hmac
+import threading
+
+import signing
+from signing import RequestSigner
+
+
+def test_signatures_match_a_fresh_hmac_each_time():
+    signer = RequestSigner("secret")
+    for query in ("symbol=BTCUSDT&timestamp=1", "symbol=ETHUSDT&timestamp=2", "symbol=BTCUSDT&timestamp=1"):
+        assert signer.sign(query) == hmac.new(b"secret", query.encode(), hashlib.sha256).hexdigest()
+
+
+def test_offset_assumes_the_server_stamped_mid_round_trip(monkeypatch):
+    signer = RequestSigner("secret")
+    signer.update_offset(server_time_ms=10_500, sent_ms=9_000, received_ms=9_200)
+    assert signer.offset_ms == 1_400
+    monkeypatch.setattr(signing.time, "time", lambda: 20.0)
+    assert signer.timestamp() == 21_400
+
+    signer.update_offset(server_time_ms=9_000, sent_ms=10_000, received_ms=10_000)
+    assert signer.timestamp() == 19_000
+
+
+def test_start_sync_runs_once_per_signer():
+    signer = RequestSigner("secret")
+    calls = []
+    signer.start_sync(lambda: calls.append(1), interval=3600)
+    signer.start_sync(lambda: calls.append(2), interval=3600)
+    assert calls == [1] and signer.sync_started
+    signer.stop_sync()
+    assert not signer.sync_started
+
+
+def test_periodic_sync_survives_failures():
+    signer = RequestSigner("secret")
+    ran = threading.Event()
+    calls = []
+
+    def sync():
+        calls.append(1)
+        if len(calls) == 3:
+            ran.set()
+        raise ConnectionError("offline")
+
+    signer.start_sync(sync, interval=0.01)
+    try:
+        assert ran.wait(5)
+    finally:
+        signer.stop_sync()
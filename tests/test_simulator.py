@@ -0,0 +1,80 @@
+# tests/test_simulator.py
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from backnet import BacktestEngine
+from simulator import BacktestSimulator
+
+T0 = 1_700_000_000_000
+
+
+@pytest.fixture
+def engine(tmp_path):
+    prices = [105.0, 104.0, 95.0, 96.0, 110.0, 111.0, 100.0]
+    pd.DataFrame({
+        "Timestamp": [T0 + i * 1000 for i in range(len(prices))],
+        "Execution Price": prices,
+        "Symbol": "BTCUSDT",
+    }).to_csv(tmp_path / "tape.csv", index=False)
+    return BacktestEngine(str(tmp_path / "tape.csv"))
+
+
+def test_resting_buy_fills_at_its_limit_not_the_print(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"USDT": 1000}, fee_rate=0.0)
+    order_id = sim.submit_limit("BUY", 1, 100)
+    fills = sim.run()
+    assert [f["orderId"] for f in fills] == [order_id]
+    # Crossed by the 95 print, but executes at 100
+    assert fills[0]["fill_price"] == 100.0
+    assert sim.balances == {"BTC": 1.0, "USDT": 900.0}
+
+
+def test_resting_sell_fills_at_its_limit(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"BTC": 1}, fee_rate=0.0)
+    sim.submit_limit("SELL", 1, 108)
+    fills = sim.run()
+    assert fills[0]["fill_price"] == 108.0
+    assert sim.balances["USDT"] == 108.0
+
+
+def test_market_order_fills_at_next_trade(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"USDT": 1000}, fee_rate=0.001)
+    sim.submit_market("BUY", 2)
+    fills = sim.advance_to(T0)
+    assert fills[0]["fill_price"] == 105.0
+    assert fills[0]["fee"] == pytest.approx(0.21)
+    assert sim.balances["USDT"] == pytest.approx(1000 - 210 - 0.21)
+
+
+def test_best_bid_fills_first_and_cancelled_orders_never_fill(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"USDT": 10_000}, fee_rate=0.0)
+    low = sim.submit_limit("BUY", 1, 90)
+    high = sim.submit_limit("BUY", 1, 104)
+    cancelled = sim.submit_limit("BUY", 1, 103)
+    assert sim.cancel(cancelled)
+    fills = sim.run()
+    assert [f["orderId"] for f in fills] == [high]
+    assert sim.orders[low].status == "NEW"
+    assert sim.orders[cancelled].status == "CANCELED"
+
+
+def test_unfundable_orders_are_rejected(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"USDT": 100}, fee_rate=0.001)
+    # 100 * 1.001 needs more than the 100 available
+    assert sim.orders[sim.submit_limit("BUY", 1, 100)].status == "REJECTED"
+
+
+def test_lock_unlock_and_fills_leave_no_residue(engine):
+    sim = BacktestSimulator(engine, "BTCUSDT", balances={"USDT": 1000.1}, fee_rate=0.001)
+    for _ in range(1000):
+        sim.cancel(sim.submit_limit("BUY", 0.1, 100.3))
+    assert sim._locked["USDT"] == 0
+    sim.submit_limit("BUY", 0.1, 100.3)
+    sim.submit_limit("BUY", 0.2, 100.1)
+    sim.run()
+    assert sim._locked["USDT"] == 0
+    expected = Decimal("1000.1") - (Decimal("0.1") * Decimal("100.3") + Decimal("0.2") * Decimal("100.1")) * Decimal("1.001")
+    assert sim._balances["USDT"] == expected
+    assert sim._balances["BTC"] == Decimal("0.3")
@@ -0,0 +1,47 @@
+# tests/test_sweep.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backnet import BacktestEngine
+from sweep import parameter_grid, run_sweep
+
+
+def limit_run(engine, symbol, side, offset):
+    last = engine.simulate_market_order(symbol, side, 1)["fill_price"]
+    limit = last * (1 - offset) if side == "BUY" else last * (1 + offset)
+    result = engine.simulate_limit_order(symbol, side, 1, limit, ts=1_700_000_000_000)
+    if offset < 0:
+        raise ValueError("negative offset")
+    return {"status": result["status"], "fill_price": result.get("fill_price", np.nan)}
+
+
+@pytest.fixture
+def tape(tmp_path):
+    rng = np.random.default_rng(3)
+    frames = [pd.DataFrame({"Timestamp": 1_700_000_000_000 + np.arange(2000) * 1000,
+                            "Execution Price": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 2000))),
+                            "Symbol": symbol}) for symbol in ("BTCUSDT", "ETHUSDT")]
+    pd.concat(frames).to_csv(tmp_path / "tape.csv", index=False)
+    return str(tmp_path / "tape.csv")
+
+
+def test_parameter_grid_is_the_cartesian_product_in_order():
+    assert parameter_grid({"a": [1, 2], "b": ["x", "y"]}) == [
+        {"a": 1, "b": "x"}, {"a": 1, "b": "y"}, {"a": 2, "b": "x"}, {"a": 2, "b": "y"}]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_sweep_matches_a_serial_loop(tape, processes):
+    grid = {"symbol": ["BTCUSDT", "ETHUSDT"], "side": ["BUY", "SELL"], "offset": [0.0, 0.01, 0.5, -1]}
+    result = run_sweep(limit_run, grid, file_path=tape, processes=processes)
+
+    engine = BacktestEngine(tape)
+    expected = []
+    for params in parameter_grid(grid):
+        try:
+            metrics = limit_run(engine, **params)
+        except ValueError as e:
+            metrics = {"error": str(e)}
+        expected.append({**params, **metrics})
+    pd.testing.assert_frame_equal(result, pd.DataFrame(expected))
@@ -0,0 +1,55 @@
+# tests/test_user_stream.py
+from user_stream import AccountState
+
+
+def report(order_id, status, update_time, execution=None, symbol="BTCUSDT", client_id=None):
+    return {"s": symbol, "i": order_id, "c": client_id or f"c{order_id}", "p": "100", "q": "1",
+            "z": "0", "Z": "0", "X": status, "x": execution or status, "f": "GTC", "o": "LIMIT",
+            "S": "BUY", "T": update_time, "l": "0", "L": "0", "n": "0", "N": None}
+
+
+def test_execution_reports_build_the_open_order_view():
+    state = AccountState()
+    seen = []
+    state.listeners.append(lambda o: seen.append(o["status"]))
+    state.on_execution_report(report(1, "NEW", 1))
+    state.on_execution_report(report(2, "NEW", 1, symbol="ETHUSDT"))
+    assert [o["orderId"] for o in state.open_orders("BTCUSDT")] == [1]
+    state.on_execution_report(report(1, "PARTIALLY_FILLED", 3, execution="TRADE"))
+    state.on_execution_report(report(1, "NEW", 2))     # older than what is stored
+    assert state.get_order(1)["status"] == "PARTIALLY_FILLED"
+    assert seen == ["NEW", "NEW", "PARTIALLY_FILLED"]
+
+
+def test_cancel_reports_keep_the_orders_own_client_id():
+    state = AccountState()
+    state.on_execution_report({**report(1, "CANCELED", 2, client_id="cancel-req"), "C": "c1"})
+    assert state.get_order(1)["clientOrderId"] == "c1"
+    assert state.open_orders() == []
+
+
+def test_reseed_drops_orders_the_exchange_no_longer_lists():
+    state = AccountState()
+    state.on_execution_report(report(1, "NEW", 1))
+    state.on_execution_report(report(2, "NEW", 1))
+    state.load_open_orders([{"symbol": "BTCUSDT", "orderId": 2, "status": "NEW", "updateTime": 1}])
+    assert state.get_order(1) is None
+    assert [o["orderId"] for o in state.open_orders()] == [2]
+
+
+def test_only_the_most_recent_finished_orders_are_kept():
+    state = AccountState(max_finished=3)
+    state.on_execution_report(report(100, "NEW", 1))
+    for order_id in range(5):
+        state.on_execution_report(report(order_id, "NEW", 1))
+        state.on_execution_report(report(order_id, "FILLED", 2))
+    assert sorted(state.orders) == [2, 3, 4, 100]
+    assert [o["orderId"] for o in state.open_orders()] == [100]
+
+
+def test_balances_ignore_older_snapshots():
+    state = AccountState()
+    state.on_account_position({"u": 5, "B": [{"a": "USDT", "f": "10", "l": "1"}]})
+    state.load_account({"updateTime": 3, "balances": [{"asset": "USDT", "free": "99", "locked": "0"}]})
+    assert state.balance("USDT") == {"free": 10.0, "locked": 1.0}
+    assert state.balance("BTC") == {"free": 0.0, "locked": 0.0}
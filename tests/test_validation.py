@@ -0,0 +1,107 @@
+# tests/test_validation.py
+import numpy as np
+import pytest
+
+import validation
+from validation import OrderValidationError, validate, validate_batch
+
+FILTERS = {
+    "BTCUSDT": {
+        "LOT_SIZE": {"filterType": "LOT_SIZE", "stepSize": "0.00001", "minQty": "0.00001", "maxQty": "9000"},
+        "PRICE_FILTER": {"filterType": "PRICE_FILTER", "tickSize": "0.01", "minPrice": "0.01", "maxPrice": "1000000"},
+        "NOTIONAL": {"filterType": "NOTIONAL", "minNotional": "5", "maxNotional": "9000000",
+                     "applyMinToMarket": True, "applyMaxToMarket": False},
+        "PERCENT_PRICE_BY_SIDE": {"filterType": "PERCENT_PRICE_BY_SIDE",
+                                  "bidMultiplierDown": "0.2", "bidMultiplierUp": "5",
+                                  "askMultiplierDown": "0.8", "askMultiplierUp": "1.2"},
+        "MAX_NUM_ORDERS": {"filterType": "MAX_NUM_ORDERS", "maxNumOrders": 3},
+    },
+    "XRPBTC": {
+        "LOT_SIZE": {"filterType": "LOT_SIZE", "stepSize": "1", "minQty": "1", "maxQty": "90000000"},
+        "PRICE_FILTER": {"filterType": "PRICE_FILTER", "tickSize": "0.00000001", "minPrice": "0.00000001",
+                         "maxPrice": "1000"},
+        "MIN_NOTIONAL": {"filterType": "MIN_NOTIONAL", "minNotional": "0.0001", "applyToMarket": True},
+        "PERCENT_PRICE": {"filterType": "PERCENT_PRICE", "multiplierDown": "0.2", "multiplierUp": "5"},
+    },
+}
+REF = {"BTCUSDT": 30_000.0, "XRPBTC": 0.00001}
+
+
+@pytest.fixture(autouse=True)
+def fake_filters(monkeypatch):
+    monkeypatch.setattr(validation, "SYMBOL_FILTERS", FILTERS)
+    monkeypatch.setattr(validation, "_VALIDATORS", {})
+
+
+def _random_orders(n, seed):
+    rng = np.random.default_rng(seed)
+    symbols = rng.choice(list(FILTERS), n)
+    ref = np.array([REF[s] for s in symbols])
+    # Prices around (and sometimes well outside) the reference; a quarter are market orders
+    prices = np.round(ref * rng.lognormal(0.0, 0.6, n), 8)
+    prices[rng.random(n) < 0.25] = np.nan
+    notional = rng.lognormal(np.log(20.0), 1.5, n)
+    qtys = np.round(np.where(symbols == "BTCUSDT", notional, notional / 30_000.0) / ref, 8)
+    sides = rng.choice(["BUY", "SELL"], n)
+    return symbols, qtys, prices, sides, ref
+
+
+def _one(symbol, qty, price, side, ref, open_orders=None):
+    try:
+        result = validate(symbol, qty, None if np.isnan(price) else price, side, ref, open_orders)
+    except OrderValidationError:
+        return None
+    return (result, None) if isinstance(result, str) else result
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_validate_order_by_order(seed):
+    symbols, qtys, prices, sides, ref = _random_orders(2000, seed)
+    batch = validate_batch(symbols, qtys, prices, sides, ref)
+    assert 0 < batch["rejected"].sum() < len(qtys)
+    for i in range(len(qtys)):
+        expected = _one(symbols[i], qtys[i], prices[i], sides[i], ref[i])
+        if expected is None:
+            assert batch["rejected"][i], (symbols[i], qtys[i], prices[i], sides[i])
+        else:
+            assert not batch["rejected"][i], (symbols[i], qtys[i], prices[i], sides[i], batch["reason"][i])
+            assert (batch["qty_str"][i], batch["price_str"][i]) == expected
+
+
+def test_quantization_matches_without_optional_checks():
+    symbols, qtys, prices, _, _ = _random_orders(2000, 99)
+    batch = validate_batch(symbols, qtys, prices)
+    for i in np.flatnonzero(~batch["rejected"]):
+        expected = _one(symbols[i], qtys[i], prices[i], None, None)
+        assert (batch["qty_str"][i], batch["price_str"][i]) == expected
+
+
+def test_max_num_orders_counts_accepted_orders_in_submission_order():
+    symbols = ["BTCUSDT", "XRPBTC", "BTCUSDT", "BTCUSDT", "BTCUSDT"]
+    qtys = [0.001, 100, 0.00001, 0.001, 0.001]     # the third is below min notional
+    prices = [30_000, 0.00001, 30_000, 30_000, 30_000]
+    batch = validate_batch(symbols, qtys, prices, open_orders={"BTCUSDT": 1})
+    assert batch["rejected"].tolist() == [False, False, True, False, True]
+    assert "MAX_NUM_ORDERS" in batch["reason"][4]
+    # Same outcome as validating one by one while counting what was accepted
+    open_count = 1
+    for i in (0, 3, 4):
+        accepted = _one(symbols[i], qtys[i], prices[i], None, None, open_count) is not None
+        assert accepted == (not batch["rejected"][i])
+        open_count += accepted
+
+
+@pytest.mark.parametrize("qty,price", [
+    (np.float64(0.01), np.float64(30000.5)),
+    (np.float32(0.01), np.float32(30000.5)),
+    (np.int64(2), np.int64(30000)),
+    (np.int32(2), 30000),
+])
+def test_numpy_scalars_validate_like_their_decimal_strings(qty, price):
+    expected = validate("BTCUSDT", str(qty), str(price))
+    assert validate("BTCUSDT", qty, price) == expected
+
+
+def test_float32_quantities_keep_their_own_precision():
+    # float(np.float32(0.01)) is 0.009999999776..., which would floor a whole step lower
+    assert validate("BTCUSDT", np.float32(0.01)) == "0.01000"
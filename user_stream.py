@@ -0,0 +1,285 @@
+# src/user_stream.py
+"""
+Live order and balance state from Binance's user data stream.
+
+UserDataStream creates a listen key (POST /v3/userDataStream), keeps it
+alive every 30 minutes (PUT), listens on <BASE_URL_WS>/ws/<listenKey> and
+applies executionReport / outboundAccountPosition / balanceUpdate events
+to an AccountState. On every (re)connect the state is re-seeded from
+/v3/account and /v3/openOrders, so nothing missed while disconnected is
+lost; after that, reads need no REST calls:
+
+    stream = client.start_user_stream()
+    stream.state.open_orders("BTCUSDT"), stream.state.balance("USDT")
+"""
+import json
+import time
+import random
+import threading
+from collections import OrderedDict
+
+import websocket
+
+from config import BASE_URL_WS
+from logger_config import logger
+
+KEEPALIVE_INTERVAL = 30 * 60
+FINAL_STATUSES = {"FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH"}
+MAX_FINISHED_ORDERS = 1000
+
+
+class AccountState:
+    """
+    Orders (REST /v3/order shape, keyed by orderId) and balances
+    ({"free", "locked"} floats per asset), updated from stream events.
+    Events older than what is already stored are ignored, so a REST
+    re-seed and the stream can race safely. Only the most recent
+    `max_finished` orders in a final status are kept.
+    """
+    def __init__(self, max_finished=MAX_FINISHED_ORDERS):
+        self.lock = threading.RLock()
+        self.orders = {}
+        self.max_finished = max_finished
+        self._finished = OrderedDict()  # orderId -> None, oldest first
+        self.balances = {}
+        self._balance_times = {}
+        self.listeners = []     # callables(order) run after each order update
+
+    # ---------------- Seeding from REST ----------------
+    def load_account(self, account):
+        with self.lock:
+            updated = account.get("updateTime", 0)
+            for b in account.get("balances", []):
+                if updated >= self._balance_times.get(b["asset"], 0):
+                    self.balances[b["asset"]] = {"free": float(b["free"]), "locked": float(b["locked"])}
+                    self._balance_times[b["asset"]] = updated
+
+    def load_open_orders(self, orders):
+        """Replace the open-order view with a REST /v3/openOrders result."""
+        with self.lock:
+            listed = {o["orderId"] for o in orders}
+            stored = [o for o in map(dict, orders) if self._store_order(o)]
+            # Anything we thought was open but the exchange no longer lists has closed
+            for order_id, order in list(self.orders.items()):
+                if order["status"] not in FINAL_STATUSES and order_id not in listed:
+                    del self.orders[order_id]
+        self._notify(stored)
+
+    def _store_order(self, order):
+        current = self.orders.get(order["orderId"])
+        if current is not None and order.get("updateTime", 0) < current.get("updateTime", 0):
+            return False
+        self.orders[order["orderId"]] = order
+        if order["status"] in FINAL_STATUSES:
+            self._finished[order["orderId"]] = None
+            self._finished.move_to_end(order["orderId"])
+            while len(self._finished) > self.max_finished:
+                self.orders.pop(self._finished.popitem(last=False)[0], None)
+        return True
+
+    # ---------------- Stream events ----------------
+    def on_execution_report(self, e):
+        order = {
+            "symbol": e["s"],
+            "orderId": e["i"],
+            "orderListId": e.get("g", -1),
+            # Cancels report the cancel request's id in "c" and the order's own in "C"
+            "clientOrderId": e["C"] if e.get("x") == "CANCELED" and e.get("C") else e["c"],
+            "price": e["p"],
+            "origQty": e["q"],
+            "executedQty": e["z"],
+            "cummulativeQuoteQty": e["Z"],
+            "status": e["X"],
+            "timeInForce": e["f"],
+            "type": e["o"],
+            "side": e["S"],
+            "stopPrice": e.get("P", "0.00000000"),
+            "time": e.get("O", e["T"]),
+            "updateTime": e["T"],
+            "lastExecutedQty": e["l"],
+            "lastExecutedPrice": e["L"],
+            "commission": e["n"],
+            "commissionAsset": e["N"],
+        }
+        with self.lock:
+            if not self._store_order(order):
+                return
+        self._notify([order])
+
+    def _notify(self, orders):
+        for listener in list(self.listeners):
+            for order in orders:
+                try:
+                    listener(order)
+                except Exception as exc:
+                    logger.error(f"Order listener failed: {exc}")
+
+    def on_account_position(self, e):
+        with self.lock:
+            for b in e["B"]:
+                if e["u"] >= self._balance_times.get(b["a"], 0):
+                    self.balances[b["a"]] = {"free": float(b["f"]), "locked": float(b["l"])}
+                    self._balance_times[b["a"]] = e["u"]
+
+    def on_balance_update(self, e):
+        # Deposits/withdrawals; the matching outboundAccountPosition carries the new totals
+        logger.info(f"Balance update: {e['a']} {e['d']}")
+
+    # ---------------- Reads ----------------
+    def open_orders(self, symbol=None):
+        with self.lock:
+            return [dict(o) for o in self.orders.values()
+                    if o["status"] not in FINAL_STATUSES and (symbol is None or o["symbol"] == symbol)]
+
+    def get_order(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+            return dict(order) if order is not None else None
+
+    def balance(self, asset):
+        with self.lock:
+            return dict(self.balances.get(asset, {"free": 0.0, "locked": 0.0}))
+
+    def balance_list(self):
+        """Balances in /v3/account "balances" shape."""
+        with self.lock:
+            return [{"asset": a, "free": b["free"], "locked": b["locked"]} for a, b in self.balances.items()]
+
+
+class UserDataStream:
+    """Listen-key lifecycle plus a reconnecting WebSocket feeding an AccountState."""
+    def __init__(self, client, state=None, url=None, keepalive_interval=KEEPALIVE_INTERVAL, max_backoff=30.0):
+        self.client = client
+        self.state = state or AccountState()
+        self.url = (url or BASE_URL_WS).rstrip("/")
+        self.keepalive_interval = keepalive_interval
+        self.max_backoff = max_backoff
+        self.listen_key = None
+        self.live = threading.Event()       # connected and seeded
+        self._ws = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def is_live(self):
+        return self.live.is_set()
+
+    def start(self):
+        if self._threads:
+            return self
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name="user-stream", daemon=True),
+            threading.Thread(target=self._keepalive_loop, name="user-stream-keepalive", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.live.clear()
+        if self._ws is not None:
+            self._ws.close()
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+        if self.listen_key:
+            try:
+                self.client.close_listen_key(self.listen_key)
+            except Exception as e:
+                logger.warning(f"Closing listen key failed: {e}")
+            self.listen_key = None
+
+    # ---------------- Listen key ----------------
+    def _keepalive_loop(self):
+        while not self._stop.wait(self.keepalive_interval):
+            key = self.listen_key
+            if key is None:
+                continue
+            try:
+                self.client.keepalive_listen_key(key)
+            except Exception as e:
+                # Expired/invalid key: drop the connection so _run opens a new one with a fresh key
+                logger.warning(f"Listen key keepalive failed, reconnecting: {e}")
+                self.listen_key = None
+                if self._ws is not None:
+                    self._ws.close()
+
+    # ---------------- Connection ----------------
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            opened = time.monotonic()
+            try:
+                if self.listen_key is None:
+                    self.listen_key = self.client.create_listen_key()["listenKey"]
+                self._ws = websocket.WebSocketApp(
+                    f"{self.url}/ws/{self.listen_key}", on_open=self._on_open, on_message=self._on_message,
+                    on_error=self._on_error, on_close=self._on_close,
+                )
+                self._ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                logger.error(f"User data stream failed: {e}")
+            self.live.clear()
+            if self._stop.is_set():
+                break
+            failures = 0 if time.monotonic() - opened > 60 else failures + 1
+            delay = random.uniform(0, min(self.max_backoff, 2 ** failures))
+            logger.warning(f"User data stream disconnected; reconnecting in {delay:.1f}s")
+            self._stop.wait(delay)
+
+    def _on_open(self, ws):
+        # Seed after connecting: anything that changes from here on arrives as an event
+        try:
+            self.state.load_account(self.client.get_account_balance())
+            self.state.load_open_orders(self.client.get_open_orders())
+        except Exception as e:
+            logger.error(f"User data stream seeding failed: {e}")
+            ws.close()
+            return
+        self.live.set()
+        logger.info("User data stream connected")
+
+    def _on_message(self, ws, message):
+        event = json.loads(message)
+        kind = event.get("e")
+        try:
+            if kind == "executionReport":
+                self.state.on_execution_report(event)
+            elif kind == "outboundAccountPosition":
+                self.state.on_account_position(event)
+            elif kind == "balanceUpdate":
+                self.state.on_balance_update(event)
+            elif kind == "listenKeyExpired":
+                logger.warning("Listen key expired; reconnecting")
+                self.listen_key = None
+                ws.close()
+        except Exception as e:
+            logger.error(f"User data event {kind} failed: {e}")
+
+    def _on_error(self, ws, error):
+        logger.warning(f"User data stream error: {error}")
+
+    def _on_close(self, ws, status, reason):
+        self.live.clear()
+
+
+# State fed by the shared stream; exists before the stream starts so listeners can attach early
+DEFAULT_ACCOUNT_STATE = AccountState()
+
+_shared_stream = None
+_shared_lock = threading.Lock()
+
+
+def shared_user_stream(client):
+    """The process-wide UserDataStream, created and started with `client` on first use."""
+    global _shared_stream
+    with _shared_lock:
+        if _shared_stream is None:
+            _shared_stream = UserDataStream(client, state=DEFAULT_ACCOUNT_STATE).start()
+        return _shared_stream
+
+
+def active_user_stream():
+    """The shared UserDataStream if one has been started, else None."""
+    return _shared_stream
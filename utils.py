@@ -1,23 +1,20 @@
 import json
-from functools import lru_cache
 from rich.prompt import Prompt
 from rich.console import Console
-from src.binance import BinanceClient  # Corrected import path
+from binance import BinanceClient
 
-@lru_cache(maxsize=1)
 def get_all_symbols(spot_only=False):
     """
     Fetches tradeable symbols from Binance.
     - spot_only=True => fetch Spot symbols
     - spot_only=False => fetch USDT perpetual futures symbols
-    Caches the result to avoid repeated API calls.
+    Reads the shared exchange-info cache, which refreshes itself once its TTL expires.
     """
     client = BinanceClient()
     try:
-        exchange_info = client.get_exchange_info()
         symbols_set = set()
 
-        for s in exchange_info.get('symbols', []):
+        for s in client.exchange_info.all_symbols():
             if spot_only:
                 # Spot symbols: just trading status
                 if s.get('status') == 'TRADING':
@@ -33,7 +30,7 @@ def get_all_symbols(spot_only=False):
         return symbols_set
 
     except Exception as e:
-        from src.logger_config import logger
+        from logger_config import logger
         logger.error(f"Could not fetch symbol list from Binance API: {e}")
         return set()
 
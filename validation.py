@@ -1,52 +1,354 @@
-import math
+from collections.abc import Mapping
+from numbers import Integral, Real
+from decimal import Decimal, ROUND_FLOOR, ROUND_CEILING, ROUND_HALF_UP
+import numpy as np
 from binance import BinanceClient
 
-client = BinanceClient()
-EXCHANGE_INFO = client.get_exchange_info()
+_client = None
+
+
+def exchange_info():
+    """Shared exchange-info cache; nothing is downloaded until a symbol is looked up."""
+    global _client
+    if _client is None:
+        _client = BinanceClient()
+    return _client.exchange_info
+
+
+class _SymbolFilters(Mapping):
+    """SYMBOL_FILTERS[symbol] -> {filterType: filter}, fetched per symbol on first access."""
+    def __getitem__(self, symbol):
+        return exchange_info().filters(symbol)
+
+    def __iter__(self):
+        return (s['symbol'] for s in exchange_info().all_symbols())
+
+    def __len__(self):
+        return len(exchange_info().all_symbols())
+
+
+# Symbol filters dictionary
+SYMBOL_FILTERS = _SymbolFilters()
+
+
+class OrderValidationError(ValueError):
+    """An order that no rounding can make acceptable to the symbol's filters."""
+
+
+def _decimals(*values):
+    """Decimal places needed to represent every value exactly."""
+    return max(max(0, -Decimal(v).normalize().as_tuple().exponent) for v in values)
+
+
+def _to_decimal(value):
+    """
+    Exact Decimal for a str/int/Decimal; floats go through their shortest
+    repr (0.1 -> '0.1'), NumPy floats at their own precision (float32 0.01
+    -> '0.01'), NumPy and other integers through int().
+    """
+    if isinstance(value, (Decimal, str)):
+        return Decimal(value)
+    if isinstance(value, np.floating):
+        return Decimal(str(value))
+    if isinstance(value, (Integral, np.integer)):
+        return Decimal(int(value))
+    if isinstance(value, Real):
+        return Decimal(repr(float(value)))
+    return Decimal(value)
+
+
+def _to_units(value, scale, rounding=ROUND_FLOOR):
+    """`value` as an integer count of 10**-scale units."""
+    return int(_to_decimal(value).scaleb(scale).to_integral_value(rounding))
+
+
+def _format_units(units, scale):
+    """Integer units back to a plain decimal string, e.g. (30000120, 3) -> '30000.120'."""
+    if scale == 0:
+        return str(units)
+    sign = "-" if units < 0 else ""
+    whole, frac = divmod(abs(units), 10 ** scale)
+    return f"{sign}{whole}.{frac:0{scale}d}"
+
+
+def _plain(units, scale):
+    """Units as a trimmed decimal string for messages, e.g. (5000, 3) -> '5'."""
+    return f"{Decimal(units).scaleb(-scale).normalize():f}"
+
+
+class SymbolValidator:
+    """
+    One symbol's filters compiled to integers: quantities are counted in
+    units of 10**-qty_scale and prices in 10**-price_scale, so step/tick
+    rounding and notional checks are exact integer arithmetic.
+    """
+    __slots__ = (
+        "symbol", "filters", "qty_scale", "step", "min_qty", "max_qty",
+        "price_scale", "tick", "min_price", "max_price",
+        "min_notional", "max_notional", "min_to_market", "max_to_market",
+        "percent", "max_num_orders",
+    )
+
+    def __init__(self, symbol, filters):
+        self.symbol = symbol
+        self.filters = filters
+
+        lot = filters.get('LOT_SIZE', {"stepSize": "0", "minQty": "0", "maxQty": "0"})
+        self.qty_scale = _decimals(lot['stepSize'], lot['minQty'], lot['maxQty'])
+        self.step = _to_units(lot['stepSize'], self.qty_scale)
+        self.min_qty = _to_units(lot['minQty'], self.qty_scale)
+        self.max_qty = _to_units(lot['maxQty'], self.qty_scale)
+
+        pf = filters.get('PRICE_FILTER', {"tickSize": "0", "minPrice": "0", "maxPrice": "0"})
+        self.price_scale = _decimals(pf['tickSize'], pf['minPrice'], pf['maxPrice'])
+        self.tick = _to_units(pf['tickSize'], self.price_scale)
+        self.min_price = _to_units(pf['minPrice'], self.price_scale)
+        self.max_price = _to_units(pf['maxPrice'], self.price_scale)
+
+        # Notional is qty * price, so it lives at qty_scale + price_scale
+        notional_scale = self.qty_scale + self.price_scale
+        self.min_notional = self.max_notional = 0
+        self.min_to_market = self.max_to_market = False
+        if 'NOTIONAL' in filters:
+            f = filters['NOTIONAL']
+            self.min_notional = _to_units(f.get('minNotional', "0"), notional_scale, ROUND_CEILING)
+            self.max_notional = _to_units(f.get('maxNotional', "0"), notional_scale)
+            self.min_to_market = bool(f.get('applyMinToMarket', True))
+            self.max_to_market = bool(f.get('applyMaxToMarket', False))
+        elif 'MIN_NOTIONAL' in filters:
+            f = filters['MIN_NOTIONAL']
+            self.min_notional = _to_units(f.get('minNotional', f.get('notional', "0")), notional_scale, ROUND_CEILING)
+            self.min_to_market = bool(f.get('applyToMarket', True))
+
+        # (BUY down, BUY up, SELL down, SELL up) multipliers of the average price
+        self.percent = None
+        if 'PERCENT_PRICE_BY_SIDE' in filters:
+            f = filters['PERCENT_PRICE_BY_SIDE']
+            self.percent = tuple(Decimal(f[k]) for k in ('bidMultiplierDown', 'bidMultiplierUp',
+                                                          'askMultiplierDown', 'askMultiplierUp'))
+        elif 'PERCENT_PRICE' in filters:
+            f = filters['PERCENT_PRICE']
+            down, up = Decimal(f['multiplierDown']), Decimal(f['multiplierUp'])
+            self.percent = (down, up, down, up)
+
+        self.max_num_orders = int(filters['MAX_NUM_ORDERS']['maxNumOrders']) if 'MAX_NUM_ORDERS' in filters else None
+
+    # ---------------- Quantization ----------------
+    def qty_units(self, qty):
+        """Quantity floored onto the LOT_SIZE grid (clamped up to minQty, as before)."""
+        units = _to_units(qty, self.qty_scale)
+        if self.step:
+            units = self.min_qty + (units - self.min_qty) // self.step * self.step
+        return max(units, self.min_qty)
+
+    def price_units(self, price):
+        """Price rounded to the nearest tick (clamped up to minPrice)."""
+        exact = _to_decimal(price).scaleb(self.price_scale)
+        if self.tick:
+            # PRICE_FILTER grid is absolute (price % tickSize == 0), unlike LOT_SIZE's (qty - minQty) % stepSize
+            units = int((exact / self.tick).to_integral_value(ROUND_HALF_UP)) * self.tick
+        else:
+            units = int(exact.to_integral_value(ROUND_HALF_UP))
+        return max(units, self.min_price)
+
+    def format_qty(self, units):
+        return _format_units(units, self.qty_scale)
+
+    def format_price(self, units):
+        return _format_units(units, self.price_scale)
+
+    # ---------------- Checks ----------------
+    def check(self, qty_units, price_units=None, side=None, ref_price=None, open_orders=None):
+        """Raise OrderValidationError if a quantized order would still be rejected."""
+        if self.max_qty and qty_units > self.max_qty:
+            raise OrderValidationError(f"{self.symbol}: quantity {self.format_qty(qty_units)} above maxQty {self.format_qty(self.max_qty)}")
+        if price_units is not None and self.max_price and price_units > self.max_price:
+            raise OrderValidationError(f"{self.symbol}: price {self.format_price(price_units)} above maxPrice {self.format_price(self.max_price)}")
+
+        # Market orders are checked against the reference (average) price, when one is known
+        is_market = price_units is None
+        if is_market and ref_price is not None:
+            price_units = _to_units(ref_price, self.price_scale)
+        if price_units is not None:
+            notional = qty_units * price_units
+            scale = self.qty_scale + self.price_scale
+            if self.min_notional and (not is_market or self.min_to_market) and notional < self.min_notional:
+                raise OrderValidationError(f"{self.symbol}: order notional too small: "
+                                           f"{_plain(notional, scale)} < {_plain(self.min_notional, scale)}")
+            if self.max_notional and (not is_market or self.max_to_market) and notional > self.max_notional:
+                raise OrderValidationError(f"{self.symbol}: order notional too large: "
+                                           f"{_plain(notional, scale)} > {_plain(self.max_notional, scale)}")
+
+        if not is_market and self.percent and side and ref_price is not None:
+            down, up = self.percent[:2] if side.upper() == "BUY" else self.percent[2:]
+            price = Decimal(price_units).scaleb(-self.price_scale)
+            ref = _to_decimal(ref_price)
+            if not ref * down <= price <= ref * up:
+                raise OrderValidationError(f"{self.symbol}: {side.upper()} price {price} outside "
+                                           f"[{ref * down:f}, {ref * up:f}] of average price {ref}")
+
+        if self.max_num_orders is not None and open_orders is not None and open_orders >= self.max_num_orders:
+            raise OrderValidationError(f"{self.symbol}: already {open_orders} open orders (MAX_NUM_ORDERS {self.max_num_orders})")
+
+    def validate(self, qty, price=None, side=None, ref_price=None, open_orders=None):
+        """
+        Quantize and check an order; returns request-ready strings:
+        qty for market orders, (qty, price) for limit orders.
+        """
+        qty_units = self.qty_units(qty)
+        price_units = self.price_units(price) if price is not None else None
+        self.check(qty_units, price_units, side, ref_price, open_orders)
+        if price_units is None:
+            return self.format_qty(qty_units)
+        return self.format_qty(qty_units), self.format_price(price_units)
+
+
+_VALIDATORS = {}
+
+
+def get_validator(symbol):
+    """Compiled SymbolValidator for `symbol`, rebuilt whenever its filters are refreshed."""
+    filters = SYMBOL_FILTERS[symbol]
+    validator = _VALIDATORS.get(symbol)
+    if validator is None or validator.filters is not filters:
+        validator = _VALIDATORS[symbol] = SymbolValidator(symbol, filters)
+    return validator
 
-# Build symbol filters dictionary
-SYMBOL_FILTERS = {
-    s['symbol']: {f['filterType']: f for f in s['filters']}
-    for s in EXCHANGE_INFO['symbols']
-}
 
 def adjust_qty(symbol, qty):
     """
     Adjust quantity according to the symbol's LOT_SIZE filter.
     """
-    lot = SYMBOL_FILTERS[symbol]['LOT_SIZE']
-    step = float(lot['stepSize'])
-    min_qty = float(lot['minQty'])
-    adj_qty = math.floor(qty / step) * step
-    return max(adj_qty, min_qty)  # Ensure minimum quantity
+    v = get_validator(symbol)
+    return float(v.format_qty(v.qty_units(qty)))
 
 def adjust_price(symbol, price):
     """
     Adjust price according to the symbol's PRICE_FILTER tick size.
     """
-    tick = SYMBOL_FILTERS[symbol]['PRICE_FILTER']
-    step = float(tick['tickSize'])
-    min_price = float(tick['minPrice'])
-    adj_price = round(price / step) * step
-    return max(adj_price, min_price)  # Ensure minimum price
+    v = get_validator(symbol)
+    return float(v.format_price(v.price_units(price)))
 
-def validate(symbol, qty, price=None):
+def validate(symbol, qty, price=None, side=None, ref_price=None, open_orders=None):
     """
     Validate and adjust quantity and price for Spot orders.
-    Returns:
+    `side`/`ref_price` enable the PERCENT_PRICE_BY_SIDE and market-notional
+    checks, `open_orders` (count on this symbol) the MAX_NUM_ORDERS check.
+    Returns exact decimal strings ready for the request:
         qty_adj for market orders
         (qty_adj, price_adj) for limit orders
+    Raises OrderValidationError if the order cannot be made valid.
     """
-    filters = SYMBOL_FILTERS[symbol]
-    qty_adj = adjust_qty(symbol, qty)
-
-    if price is not None:
-        price_adj = adjust_price(symbol, price)
-        # Optional: check min notional
-        if 'MIN_NOTIONAL' in filters:
-            min_notional = float(filters['MIN_NOTIONAL']['notional'])
-            notional = qty_adj * price_adj
-            assert notional >= min_notional, f"Order notional too small: {notional} < {min_notional}"
-        return qty_adj, price_adj
-
-    return qty_adj
+    return get_validator(symbol).validate(qty, price, side, ref_price, open_orders)
+
+
+def _scaled(values, scale):
+    """Float values as (float) counts of 10**-scale units, snapping float noise like 29999.999999999996."""
+    return np.round(values * 10.0 ** scale, 6)
+
+
+def validate_batch(symbols, qtys, prices=None, sides=None, ref_prices=None, open_orders=None):
+    """
+    validate() for many orders at once with NumPy. `symbols` may be one
+    symbol for all orders; `prices` NaN/None entries are market orders;
+    `sides`, `ref_prices` (scalar or per order) and `open_orders`
+    ({symbol: count}) enable the same optional checks as validate().
+    Orders over MAX_NUM_ORDERS are rejected in submission order.
+
+    Returns a dict of arrays, one entry per order:
+        qty, price          quantized floats (price NaN for market orders)
+        qty_str, price_str  request-ready strings (price_str None for market)
+        rejected            bool mask
+        reason              rejection message, or None
+    """
+    qtys = np.asarray(qtys, dtype=float)
+    n = len(qtys)
+    symbols = np.full(n, symbols, dtype=object) if isinstance(symbols, str) else np.asarray(symbols, dtype=object)
+    prices = np.full(n, np.nan) if prices is None else np.asarray(prices, dtype=float)
+    ref = np.full(n, np.nan) if ref_prices is None else np.broadcast_to(np.asarray(ref_prices, dtype=float), (n,))
+    is_buy = np.ones(n, dtype=bool) if sides is None else np.char.upper(np.asarray(sides, dtype=str)) == "BUY"
+    has_side = sides is not None
+    is_market = np.isnan(prices)
+
+    uniq, inv = np.unique(symbols.astype(str), return_inverse=True)
+    vals = [get_validator(s) for s in uniq]
+
+    def per_order(attr, dtype=float):
+        return np.array([getattr(v, attr) for v in vals], dtype=dtype)[inv]
+
+    qs, ps = per_order("qty_scale", np.int64), per_order("price_scale", np.int64)
+    step, min_qty, max_qty = per_order("step"), per_order("min_qty"), per_order("max_qty")
+    tick, min_price, max_price = per_order("tick"), per_order("min_price"), per_order("max_price")
+
+    # LOT_SIZE: floor onto minQty + k * stepSize, clamp up to minQty
+    q_units = np.floor(_scaled(qtys, qs))
+    q_units = np.where(step > 0, min_qty + np.floor((q_units - min_qty) / np.where(step > 0, step, 1)) * step, q_units)
+    q_units = np.maximum(q_units, min_qty)
+
+    # PRICE_FILTER: nearest tick on the absolute grid, clamp up to minPrice
+    p_units = _scaled(np.where(is_market, 0.0, prices), ps)
+    p_units = np.where(tick > 0, np.floor(p_units / np.where(tick > 0, tick, 1) + 0.5) * tick, np.floor(p_units + 0.5))
+    p_units = np.maximum(p_units, min_price)
+
+    qty = q_units / 10.0 ** qs
+    price = np.where(is_market, np.nan, p_units / 10.0 ** ps)
+
+    reason = np.full(n, None, dtype=object)
+
+    def reject(mask, message):
+        mask = mask & (reason == None)  # noqa: E711 - elementwise on an object array
+        if mask.any():
+            reason[mask] = [message(i) for i in np.flatnonzero(mask)]
+
+    reject((max_qty > 0) & (q_units > max_qty),
+           lambda i: f"{uniq[inv[i]]}: quantity {qty[i]} above maxQty {vals[inv[i]].format_qty(vals[inv[i]].max_qty)}")
+    reject(~is_market & (max_price > 0) & (p_units > max_price),
+           lambda i: f"{uniq[inv[i]]}: price {price[i]} above maxPrice {vals[inv[i]].format_price(vals[inv[i]].max_price)}")
+
+    # Notional (market orders against the reference price when one is known); small relative
+    # tolerance because the quantized values are exact decimals held in floats
+    scale_n = 10.0 ** (qs + ps)
+    min_notional, max_notional = per_order("min_notional") / scale_n, per_order("max_notional") / scale_n
+    min_mkt, max_mkt = per_order("min_to_market", bool), per_order("max_to_market", bool)
+    notional = qty * np.where(is_market, ref, price)
+    known = ~np.isnan(notional)
+    reject(known & (min_notional > 0) & (~is_market | min_mkt) & (notional < min_notional * (1 - 1e-12)),
+           lambda i: f"{uniq[inv[i]]}: order notional too small: {notional[i]:.8g} < {min_notional[i]:.8g}")
+    reject(known & (max_notional > 0) & (~is_market | max_mkt) & (notional > max_notional * (1 + 1e-12)),
+           lambda i: f"{uniq[inv[i]]}: order notional too large: {notional[i]:.8g} > {max_notional[i]:.8g}")
+
+    # PERCENT_PRICE_BY_SIDE / PERCENT_PRICE
+    if has_side and ref_prices is not None:
+        bands = np.array([[float(x) for x in v.percent] if v.percent else [0.0, np.inf, 0.0, np.inf] for v in vals])[inv]
+        down = np.where(is_buy, bands[:, 0], bands[:, 2]) * ref
+        up = np.where(is_buy, bands[:, 1], bands[:, 3]) * ref
+        reject(~is_market & ~np.isnan(ref) & ((price < down) | (price > up)),
+               lambda i: f"{uniq[inv[i]]}: {'BUY' if is_buy[i] else 'SELL'} price {price[i]} outside "
+                         f"[{down[i]:.8g}, {up[i]:.8g}] of average price {ref[i]:.8g}")
+
+    # MAX_NUM_ORDERS: count the still-accepted orders per symbol in submission order
+    if open_orders is not None:
+        limit = np.array([v.max_num_orders if v.max_num_orders is not None else np.iinfo(np.int64).max
+                          for v in vals], dtype=np.int64)
+        start = np.array([open_orders.get(s, 0) for s in uniq], dtype=np.int64)
+        accepted = reason == None  # noqa: E711
+        order = np.argsort(inv, kind="stable")
+        ranks = np.empty(n, dtype=np.int64)
+        counts = np.cumsum(accepted[order])
+        group_start = np.searchsorted(inv[order], np.arange(len(uniq)))
+        before = np.concatenate(([0], counts))[group_start]
+        ranks[order] = counts - before[inv[order]]
+        reject(accepted & (start[inv] + ranks > limit[inv]),
+               lambda i: f"{uniq[inv[i]]}: order would exceed MAX_NUM_ORDERS {vals[inv[i]].max_num_orders}")
+
+    rejected = reason != None  # noqa: E711
+    qty_str = np.array([f"{q:.{s}f}" for q, s in zip(qty, qs)], dtype=object)
+    price_str = np.array([None if m else f"{p:.{s}f}" for p, s, m in zip(price, ps, is_market)], dtype=object)
+    return {
+        "qty": qty,
+        "price": price,
+        "qty_str": qty_str,
+        "price_str": price_str,
+        "rejected": rejected,
+        "reason": reason,
+    }